@@ -1,6 +1,7 @@
 from common.a2a_server import create_app
-from .task_manager import run
-app = create_app(agent=type("Agent", (), {"execute": run}))
+from shared.schemas import ActivityResponse
+from .task_manager import run, stats
+app = create_app(agent=type("Agent", (), {"execute": run, "stats": stats}), response_model=ActivityResponse)
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, port=8003)
\ No newline at end of file
@@ -1,56 +1,106 @@
-from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 import json
+import logging
 from dotenv import load_dotenv
 import os
 
+from common import fx, log
+from common.llm import LLM_MODE, LazyLlmAgent
+from common.catalog import CATALOG_CURRENCY, load_catalog
+
+logger = log.get_logger(__name__)
+
 load_dotenv()
-if not os.getenv('OPENAI_API_KEY'):
-    raise ValueError("OPENAI_API_KEY não encontrada! Configure o arquivo .env")
 
 # agente de atividades + instruções do prompt do sistema que orienta o comportamento
-activities_agent = Agent(
+# (Agent/Runner do ADK só são criados no primeiro uso com LLM; as respostas mock não precisam de chave)
+activities_agent = LazyLlmAgent(
     name="activities_agent",
-    model=LiteLlm("openai/gpt-4o"),
     description="Sugere atividades interessantes para o usuário no destino.",
     instruction=(
         "Dado um destino, datas e orçamento, sugira 2-3 atividades turísticas ou culturais envolventes. "
         "Para cada atividade, forneça nome, descrição curta, estimativa de preço e duração em horas. "
-        "Responda em português brasileiro simples. Seja conciso e bem formatado. "
+        "Preços como números, com a moeda em 'moeda'. Responda em português brasileiro simples. Seja conciso e bem formatado. "
         "IMPORTANTE: Responda SEMPRE em formato JSON válido com a chave 'activities' contendo uma lista de objetos de atividade. "
-        "Exemplo: {\"activities\": [{\"nome\": \"Tour pela Torre Eiffel\", \"descricao\": \"Visita guiada\", \"preco\": \"USD 50\", \"duracao\": \"2h\"}]}"
-    )
-)
-
-# configuração do runner
-session_service = InMemorySessionService()
-runner = Runner(
-    agent=activities_agent,
+        "Exemplo: {\"activities\": [{\"nome\": \"Tour pela Torre Eiffel\", \"descricao\": \"Visita guiada\", \"preco\": 50, \"moeda\": \"USD\", \"duracao\": \"2h\"}]}"
+    ),
     app_name="activities_app",
-    session_service=session_service
+    user_id="user_activities",
+    session_id="session_activities",
 )
-USER_ID = "user_activities"
-SESSION_ID = "session_activities"
+
+# catálogo de atividades (data/activities.csv ou ACTIVITIES_CATALOG), indexado por destino e data
+catalog = load_catalog("ACTIVITIES_CATALOG", "activities.csv", ("destination",), list_columns=("inclui",))
+SORT_COLUMNS = {"price": "price", "duration": "duration_min"}
+MAX_RESULTS = int(os.getenv("ACTIVITIES_MAX_RESULTS", "4"))
+# Campos de preço (numéricos, na moeda indicada em "moeda")
+PRICE_FIELDS = ("preco",)
+
+
+def search_catalog(destination, start_date, end_date, request):
+    # None quando o destino não está no catálogo: o agente usa as ofertas padrão
+    if catalog is None or not catalog.has(destination):
+        return None
+    min_price, max_price = fx.price_limits(request, CATALOG_CURRENCY)
+    rows = catalog.search(
+        destination,
+        date_from=start_date,
+        date_to=end_date,
+        min_price=min_price,
+        max_price=max_price,
+        sort_by=SORT_COLUMNS.get(request.get('sort_by'), "price"),
+        limit=int(request.get('limit', MAX_RESULTS)),
+    )
+    activities = []
+    for offer in catalog.records(rows):
+        activity = {
+            "nome": offer.get("nome"),
+            "descricao": offer.get("descricao"),
+            "preco": offer['price'],
+            "duracao": offer.get("duracao"),
+            "categoria": offer.get("categoria"),
+            "horario": offer.get("horario"),
+            "inclui": offer.get("inclui", []),
+            "link_reserva": offer.get("link_reserva"),
+            "avaliacao": offer.get("avaliacao"),
+            "local_encontro": offer.get("local_encontro"),
+        }
+        if offer.get("promocao"):
+            activity["promocao"] = offer["promocao"]
+        activities.append(activity)
+    return activities
 
 # Execução da lógica, cria um prompt e invoca o modelo e analisa a saída
 async def execute(request):
     try:
-        print(f"🔄 Activities Agent - Recebendo request: {request}")
+        log.event(logger, logging.INFO, "Recebendo request", payload=request)
         
         destination = request.get('destination', 'Unknown destination')
         start_date = request.get('start_date', 'Unknown date')
         end_date = request.get('end_date', 'Unknown date')
         budget = request.get('budget', 0)
+        currency = request.get('currency')
+
+        if LLM_MODE:
+            # Modo LLM: sem resposta válida dentro do prazo, segue para o catálogo/mock
+            llm_activities = await activities_agent.ask_json(
+                f"Destino: {destination}. De {start_date} a {end_date}. Orçamento: USD {budget}.",
+                "activities",
+                user=request.get('user_id'),
+            )
+            if llm_activities is not None:
+                return {"activities": fx.rates.convert_offers(llm_activities, PRICE_FIELDS, currency, default=fx.BUDGET_CURRENCY)}
+
+        catalog_activities = search_catalog(destination, start_date, end_date, request)
+        if catalog_activities is not None:
+            log.event(logger, logging.INFO, "Retornando do catálogo", activities=len(catalog_activities))
+            return {"activities": fx.rates.convert_offers(catalog_activities, PRICE_FIELDS, currency, default=CATALOG_CURRENCY)}
         
         # Simula resposta de atividades melhoradas com links de reserva
         mock_activities = [
             {
                 "nome": "Tour pela Torre Eiffel",
                 "descricao": "Visita guiada com acesso aos andares superiores e vista panorâmica de Paris",
-                "preco": f"R$ {budget * 0.05 * 5.5:.0f}",
+                "preco": budget * 0.05,
                 "duracao": "3 horas",
                 "categoria": "Turismo Cultural",
                 "horario": "09:00 - 12:00",
@@ -62,7 +112,7 @@ async def execute(request):
             {
                 "nome": "Cruzeiro pelo Rio Sena com Jantar",
                 "descricao": "Passeio romântico ao pôr do sol com jantar gourmet e vista dos monumentos",
-                "preco": f"R$ {budget * 0.08 * 5.5:.0f}",
+                "preco": budget * 0.08,
                 "duracao": "2h30min",
                 "categoria": "Experiência Romântica",
                 "horario": "19:30 - 22:00",
@@ -74,7 +124,7 @@ async def execute(request):
             {
                 "nome": "Museu do Louvre - Ingresso com Audioguia",
                 "descricao": "Visita ao maior museu de arte do mundo com audioguia em português",
-                "preco": f"R$ {budget * 0.03 * 5.5:.0f}",
+                "preco": budget * 0.03,
                 "duracao": "4 horas",
                 "categoria": "Arte e Cultura",
                 "horario": "09:00 - 18:00 (flexível)",
@@ -86,7 +136,7 @@ async def execute(request):
             {
                 "nome": "Tour Gastronômico Montmartre",
                 "descricao": "Degustação de queijos, vinhos e doces franceses no charmoso bairro artístico",
-                "preco": f"R$ {budget * 0.06 * 5.5:.0f}",
+                "preco": budget * 0.06,
                 "duracao": "3h30min",
                 "categoria": "Gastronomia",
                 "horario": "14:00 - 17:30",
@@ -98,9 +148,9 @@ async def execute(request):
             }
         ]
         
-        print(f"✅ Activities Agent - Retornando: {mock_activities}")
-        return {"activities": mock_activities}
+        log.event(logger, logging.INFO, "Retornando ofertas padrão", activities=mock_activities)
+        return {"activities": fx.rates.convert_offers(mock_activities, PRICE_FIELDS, currency, default=fx.BUDGET_CURRENCY)}
         
     except Exception as e:
-        print(f"❌ Erro no Activities Agent: {e}")
+        logger.exception("Erro no Activities Agent")
         return {"activities": f"Erro: {str(e)}"}  
\ No newline at end of file
@@ -1,3 +1,7 @@
-from .agent import execute
+from .agent import execute, activities_agent
 async def run(payload):
-    return await execute(payload)
\ No newline at end of file
+    return await execute(payload)
+
+
+def stats():
+    return {"llm": activities_agent.stats()}
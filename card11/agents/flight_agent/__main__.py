@@ -1,7 +1,8 @@
 from common.a2a_server import create_app
-from .task_manager import run
+from shared.schemas import FlightResponse
+from .task_manager import run, stats
 
-app = create_app(agent=type("Agent", (), {"execute": run}))
+app = create_app(agent=type("Agent", (), {"execute": run, "stats": stats}), response_model=FlightResponse)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,50 +1,116 @@
-from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 import json
+import logging
 from dotenv import load_dotenv
 import os
 
+from common import fx, log
+from common.llm import LLM_MODE, LazyLlmAgent
+from common.catalog import CATALOG_CURRENCY, fill_template, load_catalog
+
+logger = log.get_logger(__name__)
+
 load_dotenv()
-if not os.getenv('OPENAI_API_KEY'):
-    raise ValueError("OPENAI_API_KEY não encontrada! Configure o arquivo .env")
 
 # agente de voos + instruções do prompt do sistema que orienta o comportamento
-flight_agent = Agent(
+# (Agent/Runner do ADK só são criados no primeiro uso com LLM; as respostas mock não precisam de chave)
+flight_agent = LazyLlmAgent(
     name="flight_agent",
-    model=LiteLlm("openai/gpt-4o"),
     description="Encontra opções de voos adequadas para o plano de viagem do usuário.",
     instruction=(
         "Dado uma origem, destino, data de ida, data de volta e orçamento, sugira 2-3 opções de voos. "
         "Para cada voo, forneça nome da companhia aérea, horário de partida, horário de chegada, duração e preço estimado. "
-        "Responda em português brasileiro simples. Seja conciso e bem formatado. "
+        "Preços como números, com a moeda em 'moeda'. Responda em português brasileiro simples. Seja conciso e bem formatado. "
         "IMPORTANTE: Responda SEMPRE em formato JSON válido com a chave 'flights' contendo uma lista de objetos de voo. "
-        "Exemplo: {\"flights\": [{\"companhia\": \"LATAM\", \"partida\": \"08:00\", \"chegada\": \"12:00\", \"duracao\": \"4h\", \"preco\": \"USD 500\"}]}"
-    )
-)
-
-# configuração do runner
-session_service = InMemorySessionService()
-runner = Runner(
-    agent=flight_agent,
+        "Exemplo: {\"flights\": [{\"companhia\": \"LATAM\", \"partida\": \"08:00\", \"chegada\": \"12:00\", \"duracao\": \"4h\", \"preco\": 500, \"moeda\": \"USD\"}]}"
+    ),
     app_name="flight_app",
-    session_service=session_service
+    user_id="user_flights",
+    session_id="session_flights",
 )
-USER_ID = "user_flights"
-SESSION_ID = "session_flights"
+
+# catálogo de voos (data/flights.csv ou FLIGHT_CATALOG), indexado por origem|destino e data
+catalog = load_catalog("FLIGHT_CATALOG", "flights.csv", ("origin", "destination"))
+SORT_COLUMNS = {"price": "price", "duration": "duration_min"}
+MAX_RESULTS = int(os.getenv("FLIGHT_MAX_RESULTS", "3"))
+# Campos de preço (numéricos, na moeda indicada em "moeda")
+PRICE_FIELDS = ("preco",)
+
+
+def _catalog_flights(tipo, origin, destination, date, request):
+    # nenhum trecho pode custar mais que o orçamento inteiro (convertido para a moeda do catálogo)
+    min_price, max_price = fx.price_limits(request, CATALOG_CURRENCY)
+    rows = catalog.search(
+        (origin, destination),
+        date_from=date,
+        date_to=date,
+        min_price=min_price,
+        max_price=max_price,
+        sort_by=SORT_COLUMNS.get(request.get('sort_by'), "price"),
+        limit=int(request.get('limit', MAX_RESULTS)),
+    )
+    day, yearmonth = (date.split('-')[2], f"{date.split('-')[1]}{date.split('-')[0]}") if date.count('-') == 2 else ("", "")
+    flights = []
+    for offer in catalog.records(rows):
+        flight = {
+            "tipo": tipo,
+            "companhia": offer.get("companhia"),
+            "partida": offer.get("partida"),
+            "chegada": offer.get("chegada"),
+            "duracao": offer.get("duracao"),
+            "preco": offer['price'],
+            "rota": f"{origin} → {destination}",
+            "link_compra": fill_template(
+                offer.get("link_compra", ""),
+                origin_encoded=origin.replace(" ", "%20"),
+                destination_encoded=destination.replace(" ", "%20"),
+                date=date,
+                day=day,
+                yearmonth=yearmonth,
+            ),
+            "codigo_voo": offer.get("codigo_voo"),
+            "classe": offer.get("classe"),
+        }
+        if offer.get("promocao"):
+            flight["promocao"] = offer["promocao"]
+        flights.append(flight)
+    return flights
+
+
+def search_catalog(origin, destination, start_date, end_date, request):
+    # None quando a rota não está no catálogo: o agente usa as ofertas padrão
+    if catalog is None or not (catalog.has((origin, destination)) or catalog.has((destination, origin))):
+        return None
+    return (
+        _catalog_flights("IDA", origin, destination, start_date, request)
+        + _catalog_flights("VOLTA", destination, origin, end_date, request)
+    )
 
 # Execução da lógica, cria um prompt e invoca o modelo e analisa a saída
 async def execute(request):
     try:
-        print(f"🔄 Flight Agent - Recebendo request: {request}")
+        log.event(logger, logging.INFO, "Recebendo request", payload=request)
         
         origin = request.get('origin', 'Unknown origin')
         destination = request.get('destination', 'Unknown destination')
         start_date = request.get('start_date', 'Unknown date')
         end_date = request.get('end_date', 'Unknown date')
         budget = request.get('budget', 0)
+        currency = request.get('currency')
+
+        if LLM_MODE:
+            # Modo LLM: sem resposta válida dentro do prazo, segue para o catálogo/mock
+            llm_flights = await flight_agent.ask_json(
+                f"Origem: {origin}. Destino: {destination}. Ida: {start_date}. Volta: {end_date}. Orçamento: USD {budget}.",
+                "flights",
+                user=request.get('user_id'),
+            )
+            if llm_flights is not None:
+                return {"flights": fx.rates.convert_offers(llm_flights, PRICE_FIELDS, currency, default=fx.BUDGET_CURRENCY)}
+
+        catalog_flights = search_catalog(origin, destination, start_date, end_date, request)
+        if catalog_flights is not None:
+            log.event(logger, logging.INFO, "Retornando do catálogo", flights=len(catalog_flights))
+            return {"flights": fx.rates.convert_offers(catalog_flights, PRICE_FIELDS, currency, default=CATALOG_CURRENCY)}
         
         # Simula resposta de voos com links diretos de compra e ida/volta
         origin_encoded = origin.replace(" ", "%20")
@@ -57,7 +123,7 @@ async def execute(request):
                 "partida": "08:00",
                 "chegada": "22:30", 
                 "duracao": "14h30m",
-                "preco": f"R$ {budget * 0.3 * 5.5:.0f}",
+                "preco": budget * 0.3,
                 "rota": f"{origin} → {destination}",
                 "link_compra": f"https://www.latam.com/pt_br/apps/personas?fecha1_dia={start_date.split('-')[2]}&fecha1_anomes={start_date.split('-')[1]}{start_date.split('-')[0]}&from_city1={origin_encoded}&to_city1={destination_encoded}&auAvailability=1&ida_vuelta=ida&tipo_pasajero1=ADT&cantidad_pasajeros=1&cantidad_ninos=0&cantidad_infantes=0",
                 "codigo_voo": "LA8084",
@@ -69,7 +135,7 @@ async def execute(request):
                 "partida": "14:20",
                 "chegada": "06:45+1",
                 "duracao": "16h25m", 
-                "preco": f"R$ {budget * 0.4 * 5.5:.0f}",
+                "preco": budget * 0.4,
                 "rota": f"{origin} → {destination}",
                 "link_compra": f"https://wwws.airfrance.com.br/search/open-dates?pax=1:0:0:0:0:0:0:0&cabinClass=ECONOMY&activeConnection=0&connections={origin_encoded}:{destination_encoded}:{start_date}",
                 "codigo_voo": "AF459",
@@ -81,7 +147,7 @@ async def execute(request):
                 "partida": "23:45",
                 "chegada": "18:20+1",
                 "duracao": "18h35m", 
-                "preco": f"R$ {budget * 0.25 * 5.5:.0f}",
+                "preco": budget * 0.25,
                 "rota": f"{origin} → {destination}",
                 "link_compra": f"https://www.voeazul.com.br/pt/informacoes/reservas?origin={origin_encoded}&destination={destination_encoded}&departureDate={start_date}&returnDate=&tripType=ONE_WAY&adults=1&children=0&infants=0",
                 "codigo_voo": "AD7894",
@@ -94,7 +160,7 @@ async def execute(request):
                 "partida": "10:15",
                 "chegada": "16:45",
                 "duracao": "12h30m",
-                "preco": f"R$ {budget * 0.28 * 5.5:.0f}",
+                "preco": budget * 0.28,
                 "rota": f"{destination} → {origin}",
                 "link_compra": f"https://www.latam.com/pt_br/apps/personas?fecha1_dia={end_date.split('-')[2]}&fecha1_anomes={end_date.split('-')[1]}{end_date.split('-')[0]}&from_city1={destination_encoded}&to_city1={origin_encoded}&auAvailability=1&ida_vuelta=ida&tipo_pasajero1=ADT&cantidad_pasajeros=1&cantidad_ninos=0&cantidad_infantes=0",
                 "codigo_voo": "LA8185",
@@ -106,7 +172,7 @@ async def execute(request):
                 "partida": "16:30",
                 "chegada": "09:20+1",
                 "duracao": "14h50m",
-                "preco": f"R$ {budget * 0.35 * 5.5:.0f}",
+                "preco": budget * 0.35,
                 "rota": f"{destination} → {origin}",
                 "link_compra": f"https://wwws.airfrance.com.br/search/open-dates?pax=1:0:0:0:0:0:0:0&cabinClass=ECONOMY&activeConnection=0&connections={destination_encoded}:{origin_encoded}:{end_date}",
                 "codigo_voo": "AF460",
@@ -118,7 +184,7 @@ async def execute(request):
                 "partida": "22:10", 
                 "chegada": "14:55+1",
                 "duracao": "16h45m",
-                "preco": f"R$ {budget * 0.22 * 5.5:.0f}",
+                "preco": budget * 0.22,
                 "rota": f"{destination} → {origin}",
                 "link_compra": f"https://www.voeazul.com.br/pt/informacoes/reservas?origin={destination_encoded}&destination={origin_encoded}&departureDate={end_date}&returnDate=&tripType=ONE_WAY&adults=1&children=0&infants=0",
                 "codigo_voo": "AD7895",
@@ -127,9 +193,9 @@ async def execute(request):
             }
         ]
         
-        print(f"✅ Flight Agent - Retornando: {mock_flights}")
-        return {"flights": mock_flights}
+        log.event(logger, logging.INFO, "Retornando ofertas padrão", flights=mock_flights)
+        return {"flights": fx.rates.convert_offers(mock_flights, PRICE_FIELDS, currency, default=fx.BUDGET_CURRENCY)}
         
     except Exception as e:
-        print(f"❌ Erro no Flight Agent: {e}")
+        logger.exception("Erro no Flight Agent")
         return {"flights": f"Erro: {str(e)}"}
@@ -1,4 +1,8 @@
-from .agent import execute
+from .agent import execute, flight_agent
 
 async def run(payload):
     return await execute(payload)
+
+
+def stats():
+    return {"llm": flight_agent.stats()}
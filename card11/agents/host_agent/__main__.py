@@ -1,6 +1,15 @@
 from common.a2a_server import create_app
-from .task_manager import run
-app = create_app(agent=type("Agent", (), {"execute": run}))
+from common.jobs import JobManager
+from shared.schemas import Plan
+from .task_manager import run, stream, stats, startup, shutdown, transport
+transport.preload()
+app = create_app(agent=type("Agent", (), {
+    "execute": run,
+    "stream": stream,
+    "stats": stats,
+    "startup": startup,
+    "shutdown": shutdown,
+}), response_model=Plan, jobs=JobManager.from_env(run, stream))
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, port=8000)
\ No newline at end of file
+    uvicorn.run(app, port=8000)
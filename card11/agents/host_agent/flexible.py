@@ -0,0 +1,80 @@
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from shared.schemas import parse_price
+
+# Maior janela aceita (± dias) em cada data; 3 -> até 7 x 7 combinações
+MAX_FLEX_DAYS = int(os.getenv("HOST_FLEX_MAX_DAYS", "3"))
+
+# Campos do modo flexível, removidos do payload repassado aos sub-agentes
+FLEX_FIELDS = ("flex_days", "flex_return_days")
+
+
+def window(payload):
+    """(± dias na ida, ± dias na volta) pedidos, ou None fora do modo flexível."""
+    departure = payload.get("flex_days")
+    returning = payload.get("flex_return_days", departure)
+    if not (departure or returning) or not payload.get("start_date") or not payload.get("end_date"):
+        return None
+    return min(int(departure or 0), MAX_FLEX_DAYS), min(int(returning or 0), MAX_FLEX_DAYS)
+
+
+def date_axes(start_date, end_date, departure_days, return_days):
+    start, end = date.fromisoformat(str(start_date)), date.fromisoformat(str(end_date))
+    departures = [start + timedelta(days=offset) for offset in range(-departure_days, departure_days + 1)]
+    returns = [end + timedelta(days=offset) for offset in range(-return_days, return_days + 1)]
+    return departures, returns
+
+
+def date_pairs(departures, returns):
+    # Só combinações em que a volta não é antes da ida
+    return [(i, j) for i, out in enumerate(departures) for j, back in enumerate(returns) if back >= out]
+
+
+def _cheapest(size, cells, prices):
+    best = np.full(size, np.inf)
+    if prices:
+        np.minimum.at(best, np.asarray(cells, dtype=np.intp), np.asarray(prices, dtype=np.float64))
+    return best
+
+
+def price_matrix(plans, shape):
+    """Menor total (voo de ida + voo de volta + hospedagem) de cada par de datas, na moeda do plano.
+
+    `plans` mapeia (i, j) -> plano daquele par; células sem plano ou sem
+    alguma das três ofertas ficam NaN. Atividades não entram (são opcionais).
+    """
+    rows, cols = shape
+    # célula achatada e preço de cada oferta, por componente do total
+    parts = {"IDA": ([], []), "VOLTA": ([], []), "stay": ([], [])}
+    for (i, j), result in plans.items():
+        cell = i * cols + j
+        flights = result.get("flights")
+        for flight in flights if isinstance(flights, list) else ():
+            price = parse_price(flight.get("preco"))
+            if price is not None and flight.get("tipo") in ("IDA", "VOLTA"):
+                parts[flight["tipo"]][0].append(cell)
+                parts[flight["tipo"]][1].append(price)
+        stays = result.get("stays")
+        for stay in stays if isinstance(stays, list) else ():
+            price = parse_price(stay.get("preco_total"))
+            if price is not None:
+                parts["stay"][0].append(cell)
+                parts["stay"][1].append(price)
+
+    total = sum(_cheapest(rows * cols, cells, prices) for cells, prices in parts.values())
+    total[~np.isfinite(total)] = np.nan
+    return total.reshape(rows, cols)
+
+
+def best_cell(matrix):
+    if np.all(np.isnan(matrix)):
+        return None
+    return tuple(int(index) for index in np.unravel_index(np.nanargmin(matrix), matrix.shape))
+
+
+def to_rows(matrix):
+    # JSON não tem NaN: células vazias viram null
+    return [[None if np.isnan(value) else round(float(value), 2) for value in row] for row in matrix]
@@ -0,0 +1,104 @@
+from shared.schemas import parse_price
+
+# Campos do payload que descrevem a viagem (substituídos em cada sub-consulta)
+TRIP_FIELDS = ("legs", "origin", "destination", "start_date", "end_date")
+
+
+def stops(legs):
+    """(cidade, check-in, check-out) entre um trecho e o seguinte; conexões no mesmo dia não viram parada."""
+    return [
+        (legs[i]["destination"], legs[i]["date"], legs[i + 1]["date"])
+        for i in range(len(legs) - 1)
+        if str(legs[i + 1]["date"]) > str(legs[i]["date"])
+    ]
+
+
+def subqueries(payload):
+    """[(lugar, seção, payload)]: voos de cada trecho e hospedagem/atividades de cada parada."""
+    extras = {key: value for key, value in payload.items() if key not in TRIP_FIELDS}
+    legs = payload["legs"]
+    queries = []
+    for i, leg in enumerate(legs):
+        # O flight_agent só conhece ida e volta: o trecho vai como ida e volta no mesmo dia
+        leg_payload = dict(extras, origin=leg["origin"], destination=leg["destination"], start_date=leg["date"], end_date=leg["date"])
+        queries.append((("leg", i), "flights", leg_payload))
+    for i, (city, check_in, check_out) in enumerate(stops(legs)):
+        stop_payload = dict(extras, destination=city, start_date=check_in, end_date=check_out)
+        queries.append((("stop", i), "stays", stop_payload))
+        queries.append((("stop", i), "activities", stop_payload))
+    return queries
+
+
+def _cheapest(offers, field):
+    prices = [parse_price(offer.get(field)) for offer in offers] if isinstance(offers, list) else []
+    prices = [price for price in prices if price is not None]
+    return min(prices) if prices else None
+
+
+def _worst(statuses):
+    # Status consolidado de uma seção: "ok" só se todas as sub-consultas foram ok
+    failed = [status for status in statuses if status["status"] != "ok"]
+    merged = dict(failed[0]) if failed else {"status": "ok"}
+    merged["elapsed_ms"] = max((status.get("elapsed_ms") or 0 for status in statuses), default=0)
+    if failed:
+        merged["failed"] = len(failed)
+    return merged
+
+
+def consolidate(payload, answers, unique):
+    """Junta as respostas das sub-consultas (`answers`: lugar/seção -> (valor, status)) num plano só.
+
+    As seções de topo (flights/stays/activities) trazem todas as ofertas
+    marcadas com o trecho/cidade; `itinerary` traz a visão por trecho e parada.
+    """
+    legs = payload["legs"]
+    leg_plans, stop_plans = [], []
+    flights, stays, activities = [], [], []
+    statuses = {"flights": [], "stays": [], "activities": []}
+
+    for i, leg in enumerate(legs):
+        value, status = answers[(("leg", i), "flights")]
+        offers = [flight for flight in value if flight.get("tipo") == "IDA"] if isinstance(value, list) else value
+        statuses["flights"].append(status)
+        if isinstance(offers, list):
+            flights.extend(dict(flight, trecho=i) for flight in offers)
+        leg_plans.append({
+            "origin": leg["origin"],
+            "destination": leg["destination"],
+            "date": leg["date"],
+            "flights": offers,
+            "status": status,
+            "cheapest": _cheapest(offers, "preco"),
+        })
+
+    for i, (city, check_in, check_out) in enumerate(stops(legs)):
+        stop = {"city": city, "check_in": check_in, "check_out": check_out, "sections": {}}
+        for section, target in (("stays", stays), ("activities", activities)):
+            value, status = answers[(("stop", i), section)]
+            statuses[section].append(status)
+            stop[section] = value
+            stop["sections"][section] = status
+            if isinstance(value, list):
+                target.extend(dict(offer, cidade=city) for offer in value)
+        stop["cheapest_stay"] = _cheapest(stop["stays"], "preco_total")
+        stop_plans.append(stop)
+
+    # Estimativa mais barata: menor voo de cada trecho + menor hospedagem de cada parada
+    parts = [leg["cheapest"] for leg in leg_plans] + [stop["cheapest_stay"] for stop in stop_plans]
+    total = round(sum(parts), 2) if parts and None not in parts else None
+    sections = {section: _worst(found) for section, found in statuses.items() if found}
+    return {
+        "flights": flights or "Nenhum voo retornado.",
+        "stays": stays or "Nenhuma hospedagem retornada.",
+        "activities": activities or "Nenhuma atividade encontrada.",
+        "bundles": [],
+        "sections": sections,
+        "partial": any(status["status"] != "ok" for status in sections.values()),
+        "itinerary": {
+            "legs": leg_plans,
+            "stops": stop_plans,
+            "total": total,
+            "subqueries": len(answers),
+            "unique_subqueries": unique,
+        },
+    }
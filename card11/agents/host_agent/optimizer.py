@@ -0,0 +1,183 @@
+import re
+
+import numpy as np
+
+from shared.schemas import parse_price
+
+# Peso da economia no score: cada 100% do orçamento poupado vale um item de nota máxima
+SAVINGS_WEIGHT = 1.0
+# Qualidade assumida quando a oferta não traz avaliação
+DEFAULT_QUALITY = 0.7
+# Resolução da mochila das atividades (número máximo de "unidades" de orçamento)
+KNAPSACK_RESOLUTION = 2000
+# Quantos candidatos de cada tipo sobrevivem à poda
+MAX_CANDIDATES = 64
+# Máximo de atividades por combinação
+MAX_ACTIVITIES = 4
+
+
+def parse_rating(value):
+    # "4.6/5 ⭐⭐⭐⭐⭐" -> 0.92
+    match = re.search(r"(\d+(?:[.,]\d+)?)\s*/\s*(\d+)", str(value or ""))
+    if not match:
+        return DEFAULT_QUALITY
+    return float(match.group(1).replace(",", ".")) / float(match.group(2))
+
+
+def parse_duration(value):
+    # "14h30m" / "2h30min" / "3 horas" -> minutos
+    text = str(value or "")
+    hours = re.search(r"(\d+)\s*h", text)
+    minutes = re.search(r"(\d+)\s*m", text)
+    total = (int(hours.group(1)) * 60 if hours else 0) + (int(minutes.group(1)) if minutes else 0)
+    return total or None
+
+
+def _prepare(offers, price_field, quality):
+    """Arrays de preço/qualidade das ofertas com preço válido."""
+    items, prices, qualities = [], [], []
+    for offer in offers:
+        price = parse_price(offer.get(price_field))
+        if price is None:
+            continue
+        items.append(offer)
+        prices.append(price)
+        qualities.append(quality(offer))
+    return items, np.array(prices, dtype=np.float64), np.array(qualities, dtype=np.float64)
+
+
+def _flight_qualities(flights):
+    # Voos mais curtos valem mais: duração mínima / duração
+    durations = np.array([parse_duration(f.get("duracao")) or np.nan for f in flights], dtype=np.float64)
+    if np.all(np.isnan(durations)):
+        return np.full(len(flights), DEFAULT_QUALITY)
+    return np.nan_to_num(np.nanmin(durations) / durations, nan=DEFAULT_QUALITY)
+
+
+def _prune(prices, qualities, limit=MAX_CANDIDATES):
+    """Fronteira de Pareto (mais barato OU melhor) limitada aos `limit` melhores."""
+    if prices.size == 0:
+        return np.empty(0, dtype=np.intp)
+    order = np.lexsort((-qualities, prices))
+    q = qualities[order]
+    best_before = np.maximum.accumulate(np.concatenate(([-np.inf], q[:-1])))
+    frontier = order[q > best_before]
+    if frontier.size > limit:
+        # Mantém os de melhor relação qualidade/preço
+        ratio = qualities[frontier] / np.maximum(prices[frontier], 1e-9)
+        frontier = frontier[np.argsort(-ratio, kind="stable")[:limit]]
+    return frontier
+
+
+def _activity_knapsack(prices, values, capacity_units, unit, max_items):
+    """Mochila 0/1 (com no máximo `max_items` itens) resolvida uma vez para todas as capacidades.
+
+    Devolve best[c] (maior valor com custo <= c unidades) e a matriz de decisão
+    usada para reconstruir quais atividades entram.
+    """
+    weights = np.ceil(prices / unit).astype(np.int64)
+    # best[k, c]: melhor valor com até k itens e custo <= c
+    best = np.zeros((max_items + 1, capacity_units + 1))
+    take = np.zeros((len(weights), max_items + 1, capacity_units + 1), dtype=bool)
+    for i, (weight, value) in enumerate(zip(weights, values)):
+        if weight > capacity_units or value <= 0:
+            continue
+        candidate = best[:-1, :capacity_units + 1 - weight] + value
+        improved = candidate > best[1:, weight:]
+        take[i, 1:, weight:] = improved
+        best[1:, weight:] = np.where(improved, candidate, best[1:, weight:])
+    return best[max_items], take, weights
+
+
+def _chosen_activities(take, weights, capacity):
+    chosen = []
+    items = take.shape[1] - 1
+    for i in range(len(weights) - 1, -1, -1):
+        if items > 0 and take[i, items, capacity]:
+            chosen.append(i)
+            capacity -= weights[i]
+            items -= 1
+    return chosen[::-1]
+
+
+def optimize(flights, stays, activities, budget, top_k=3, max_activities=MAX_ACTIVITIES):
+    """Melhores combinações ida + volta + hospedagem + atividades dentro do orçamento.
+
+    `budget` deve estar na mesma moeda dos preços. O score soma a qualidade de
+    cada item (avaliação ou duração do voo) com a fração do orçamento poupada;
+    as atividades saem de uma mochila 0/1 resolvida uma vez e consultada de
+    forma vetorizada para cada combinação.
+    """
+    if not budget or budget <= 0:
+        return []
+    flights = flights if isinstance(flights, list) else []
+    outbound = [f for f in flights if f.get("tipo") == "IDA"]
+    inbound = [f for f in flights if f.get("tipo") == "VOLTA"]
+    stays = stays if isinstance(stays, list) else []
+    activities = activities if isinstance(activities, list) else []
+
+    out_items, out_prices, _ = _prepare(outbound, "preco", lambda f: 0.0)
+    in_items, in_prices, _ = _prepare(inbound, "preco", lambda f: 0.0)
+    stay_items, stay_prices, stay_q = _prepare(stays, "preco_total", lambda s: parse_rating(s.get("avaliacao")))
+    act_items, act_prices, act_q = _prepare(activities, "preco", lambda a: parse_rating(a.get("avaliacao")))
+    if not (out_items and in_items and stay_items):
+        return []
+    out_q = _flight_qualities(out_items)
+    in_q = _flight_qualities(in_items)
+
+    # Poda: Pareto + nada que sozinho com os mais baratos dos outros estoure o orçamento
+    pools = []
+    cheapest = [out_prices.min(), in_prices.min(), stay_prices.min()]
+    for slot, (prices, qualities) in enumerate(((out_prices, out_q), (in_prices, in_q), (stay_prices, stay_q))):
+        others = sum(cheapest) - cheapest[slot]
+        keep = _prune(prices, qualities)
+        pools.append(keep[prices[keep] + others <= budget])
+    if any(pool.size == 0 for pool in pools):
+        return []
+    out_idx, in_idx, stay_idx = pools
+
+    # Custo e qualidade de todas as combinações base (broadcast 3D)
+    core_cost = (
+        out_prices[out_idx][:, None, None]
+        + in_prices[in_idx][None, :, None]
+        + stay_prices[stay_idx][None, None, :]
+    )
+    core_quality = (
+        out_q[out_idx][:, None, None]
+        + in_q[in_idx][None, :, None]
+        + stay_q[stay_idx][None, None, :]
+    )
+    feasible = core_cost <= budget
+    if not feasible.any():
+        return []
+
+    # Atividades: mochila única, consultada pela sobra de cada combinação
+    unit = max(budget / KNAPSACK_RESOLUTION, 1.0)
+    capacity_units = int(budget // unit)
+    act_value = act_q - SAVINGS_WEIGHT * act_prices / budget
+    best, take, weights = _activity_knapsack(act_prices, act_value, capacity_units, unit, max_activities)
+    remaining_units = np.clip(((budget - core_cost) // unit).astype(np.int64), 0, capacity_units)
+    score = core_quality + SAVINGS_WEIGHT * (budget - core_cost) / budget + best[remaining_units]
+    score = np.where(feasible, score, -np.inf)
+
+    flat = score.ravel()
+    k = min(top_k, int(feasible.sum()))
+    top = np.argpartition(-flat, k - 1)[:k]
+    top = top[np.argsort(-flat[top], kind="stable")]
+
+    bundles = []
+    for rank, position in enumerate(top, 1):
+        i, j, s = np.unravel_index(position, score.shape)
+        chosen = _chosen_activities(take, weights, int(remaining_units[i, j, s]))
+        total = float(core_cost[i, j, s] + act_prices[chosen].sum())
+        bundles.append({
+            "rank": rank,
+            "score": round(float(flat[position]), 4),
+            "total": round(total, 2),
+            "sobra": round(budget - total, 2),
+            "ida": out_items[out_idx[i]],
+            "volta": in_items[in_idx[j]],
+            "hospedagem": stay_items[stay_idx[s]],
+            "atividades": [act_items[c] for c in chosen],
+        })
+    return bundles
@@ -0,0 +1,287 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from common import log, metrics
+
+logger = log.get_logger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
+
+# Rotas fixas (JSON) e de quanto em quanto tempo (s) o agendador confere o cache
+PREWARM_FILE = os.getenv("HOST_PREWARM_FILE", os.path.join(DATA_DIR, "prewarm_routes.json"))
+PREWARM_INTERVAL = float(os.getenv("HOST_PREWARM_INTERVAL", "60"))
+# Recalcula quando faltar menos que isso (s) para o plano expirar
+PREWARM_MARGIN = float(os.getenv("HOST_PREWARM_MARGIN", "90"))
+# Consultas recentes mais pedidas que entram junto com as do arquivo (0 desliga)
+PREWARM_TOP = int(os.getenv("HOST_PREWARM_TOP", "20"))
+PREWARM_MIN_HITS = float(os.getenv("HOST_PREWARM_MIN_HITS", "3"))
+# Orçamento: recálculos simultâneos, fração de CPU e planos ao vivo a partir dos quais o aquecimento pausa
+PREWARM_CONCURRENCY = int(os.getenv("HOST_PREWARM_CONCURRENCY", "1"))
+PREWARM_CPU = float(os.getenv("HOST_PREWARM_CPU", "0.1"))
+PREWARM_MAX_LIVE = int(os.getenv("HOST_PREWARM_MAX_LIVE", "2"))
+
+PREWARM = metrics.REGISTRY.counter("host_prewarm_total", "Rotas conferidas pelo pré-aquecimento", ("outcome",))
+
+
+def next_weekday(today, weekday):
+    # Próxima ocorrência do dia da semana (0 = segunda), a partir de amanhã
+    return today + timedelta(days=(weekday - today.weekday() - 1) % 7 + 1)
+
+
+def route_payload(route, today=None):
+    """Payload de plano de uma rota do arquivo, com as datas relativas resolvidas para hoje.
+
+    Janela: "weekend" (próxima sexta a domingo), "start_in_days" + "nights",
+    ou start_date/end_date fixos. Os demais campos (budget, currency...) vão como estão.
+    """
+    today = today or date.today()
+    payload = {key: value for key, value in route.items() if key not in ("window", "start_in_days", "nights")}
+    if route.get("window") == "weekend":
+        start = next_weekday(today, 4)
+        payload.update(start_date=start.isoformat(), end_date=(start + timedelta(days=2)).isoformat())
+    elif "start_in_days" in route:
+        start = today + timedelta(days=int(route["start_in_days"]))
+        payload.update(start_date=start.isoformat(), end_date=(start + timedelta(days=int(route.get("nights", 3)))).isoformat())
+    return payload
+
+
+class QueryStats:
+    """Contagem das consultas recentes por chave de plano, com decaimento a cada ciclo."""
+
+    def __init__(self, maxsize=1000, decay=0.5):
+        self.maxsize = maxsize
+        self.decay = decay
+        self._counts = {}
+        self._payloads = {}
+
+    def __len__(self):
+        return len(self._counts)
+
+    def record(self, key, payload):
+        self._counts[key] = self._counts.get(key, 0.0) + 1
+        self._payloads[key] = payload
+        if len(self._counts) > self.maxsize:
+            # Descarta a menos pedida
+            coldest = min(self._counts, key=self._counts.get)
+            del self._counts[coldest], self._payloads[coldest]
+
+    def top(self, n, min_hits=1.0):
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)
+        return [self._payloads[key] for key, count in ranked[:n] if count >= min_hits]
+
+    def age(self):
+        # Consultas antigas perdem peso a cada ciclo e somem abaixo de 0.5
+        for key in list(self._counts):
+            self._counts[key] *= self.decay
+            if self._counts[key] < 0.5:
+                del self._counts[key], self._payloads[key]
+
+
+class CpuMeter:
+    """Aguarda `coro` somando o CPU gasto só nos trechos síncronos dele (entre um await e outro).
+
+    Enquanto `coro` está suspenso o event loop atende as requisições ao vivo, e
+    esse tempo não entra na conta. As chamadas aos sub-agentes rodam em tarefas
+    próprias (I/O) e também ficam de fora.
+    """
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.cpu = 0.0
+
+    def __await__(self):
+        send, message = self.coro.send, None
+        while True:
+            started = time.thread_time()
+            try:
+                future = send(message)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.cpu += time.thread_time() - started
+            try:
+                message, send = (yield future), self.coro.send
+            except BaseException as e:
+                message, send = e, self.coro.throw
+
+
+class Prewarmer:
+    """Recalcula em segundo plano os planos das rotas populares antes de expirarem.
+
+    `entry(payload)` devolve (chave no cache, função que calcula o plano). As
+    rotas vêm do arquivo `path` e das consultas mais pedidas (`queries`). O
+    trabalho respeita um orçamento: no máximo `concurrency` recálculos ao mesmo
+    tempo, pausa enquanto houver mais de `max_live` planos ao vivo em andamento
+    e dorme o suficiente para ficar abaixo de `cpu` (fração de um núcleo).
+    """
+
+    def __init__(
+        self,
+        entry,
+        cache,
+        path=PREWARM_FILE,
+        interval=PREWARM_INTERVAL,
+        margin=PREWARM_MARGIN,
+        top=PREWARM_TOP,
+        min_hits=PREWARM_MIN_HITS,
+        concurrency=PREWARM_CONCURRENCY,
+        cpu=PREWARM_CPU,
+        max_live=PREWARM_MAX_LIVE,
+    ):
+        self.entry = entry
+        self.cache = cache
+        self.path = path
+        self.interval = interval
+        self.margin = margin
+        self.top = top
+        self.min_hits = min_hits
+        self.concurrency = concurrency
+        self.cpu = cpu
+        self.max_live = max_live
+        self.queries = QueryStats()
+        self.live = 0
+        self._routes, self._mtime = [], None
+        self._task = None
+        self._slots = None
+        self.cycles = 0
+        self.outcomes = {"refreshed": 0, "fresh": 0, "partial": 0, "failed": 0, "deferred": 0}
+        self.cpu_seconds = 0.0
+        self.last_cycle_ms = None
+
+    @property
+    def enabled(self):
+        return self.interval > 0 and self.concurrency > 0 and self.cpu > 0
+
+    @contextmanager
+    def track_live(self):
+        # Envolve cada plano pedido por um usuário: o aquecimento cede a vez
+        self.live += 1
+        try:
+            yield
+        finally:
+            self.live -= 1
+
+    def record(self, payload):
+        if self.top > 0:
+            key, _ = self.entry(payload)
+            self.queries.record(key, payload)
+
+    def routes(self):
+        # Arquivo relido só quando o mtime muda; sem arquivo, só as consultas recentes
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return []
+        if mtime != self._mtime:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    self._routes = list(json.load(f))
+                self._mtime = mtime
+            except (OSError, ValueError) as e:
+                logger.warning("Não foi possível ler %s: %s", self.path, e)
+        return self._routes
+
+    def targets(self, today=None):
+        today = today or date.today()
+        payloads = [route_payload(route, today) for route in self.routes()]
+        payloads += self.queries.top(self.top, self.min_hits) if self.top > 0 else []
+        targets, seen = [], set()
+        for payload in payloads:
+            start = payload.get("start_date") or (payload.get("legs") or [{}])[0].get("date")
+            if start and str(start) < today.isoformat():
+                continue  # viagem que já passou
+            key, compute = self.entry(payload)
+            if key not in seen:
+                seen.add(key)
+                targets.append((key, compute))
+        return targets
+
+    async def _wait_for_quiet(self):
+        while self.live > self.max_live:
+            self.outcomes["deferred"] += 1
+            PREWARM.inc(outcome="deferred")
+            await asyncio.sleep(1.0)
+
+    async def refresh(self, key, compute):
+        remaining = self.cache.expires_in(key)
+        if remaining is not None and remaining > self.margin:
+            self.outcomes["fresh"] += 1
+            PREWARM.inc(outcome="fresh")
+            return "fresh"
+        async with self._slots:
+            await self._wait_for_quiet()
+            metered = None
+
+            def compute_metered():
+                nonlocal metered
+                metered = CpuMeter(compute())
+                return metered
+
+            try:
+                # Pelo single-flight do cache: um pedido ao vivo pela mesma chave espera este cálculo
+                # em vez de repetir o fan-out; só planos completos entram, como no caminho ao vivo
+                result = await self.cache.get_or_compute(
+                    key, compute_metered, cacheable=lambda r: not r.get("partial"), refresh=True
+                )
+            except Exception:
+                logger.exception("Falha ao pré-aquecer o plano %s", key)
+                outcome = "failed"
+            else:
+                outcome = "partial" if result.get("partial") else "refreshed"
+            # Se coalesceu com um cálculo ao vivo, nada rodou por conta do pré-aquecimento
+            used = metered.cpu if metered is not None else 0.0
+            self.cpu_seconds += used
+            self.outcomes[outcome] += 1
+            PREWARM.inc(outcome=outcome)
+            # Duty cycle: para cada segundo de CPU gasto, dorme (1 - cpu) / cpu
+            await asyncio.sleep(used * (1 - self.cpu) / self.cpu)
+        return outcome
+
+    async def run_once(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        targets = self.targets()
+        await asyncio.gather(*(self.refresh(key, compute) for key, compute in targets))
+        self.queries.age()
+        self.cycles += 1
+        self.last_cycle_ms = round((time.perf_counter() - started) * 1000, 1)
+        log.event(logger, logging.INFO, "Pré-aquecimento concluído", routes=len(targets), cycle_ms=self.last_cycle_ms)
+
+    async def _loop(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Falha no ciclo de pré-aquecimento")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "routes": len(self._routes),
+            "recent_queries": len(self.queries),
+            "cycles": self.cycles,
+            "last_cycle_ms": self.last_cycle_ms,
+            "live": self.live,
+            "cpu_s": round(self.cpu_seconds, 3),
+            **self.outcomes,
+        }
@@ -1,54 +1,497 @@
-from common.a2a_client import call_agent
-import traceback
+from common import fx, log, metrics
+from common.a2a_client import resilience
+from common.cache import TTLCache
+from common.resilience import CircuitOpenError, OverloadedError
+from common.transport import get_transport
+from . import flexible, itinerary, prewarm
+from .optimizer import optimize
+from collections import namedtuple
+import asyncio
+import os
+import logging
+import time
 
+logger = log.get_logger(__name__)
+
+# URLs padrão; com HOST_TRANSPORT=http o registro (agent.json / <AGENTE>_URLS) tem prioridade
 FLIGHT_URL = "http://localhost:8001/run"
 STAY_URL = "http://localhost:8002/run"
 ACTIVITIES_URL = "http://localhost:8003/run"
 
-async def run(payload):
+# Prazo individual de cada sub-agente e orçamento total da requisição (segundos)
+FLIGHT_DEADLINE = float(os.getenv("HOST_FLIGHT_DEADLINE", "20"))
+STAY_DEADLINE = float(os.getenv("HOST_STAY_DEADLINE", "20"))
+ACTIVITIES_DEADLINE = float(os.getenv("HOST_ACTIVITIES_DEADLINE", "20"))
+REQUEST_BUDGET = float(os.getenv("HOST_REQUEST_BUDGET", "30"))
+
+# Cache de planos: TTL (s), tamanho máximo (LRU) e faixa de orçamento usada na chave
+PLAN_CACHE_TTL = float(os.getenv("HOST_CACHE_TTL", "300"))
+PLAN_CACHE_SIZE = int(os.getenv("HOST_CACHE_SIZE", "1024"))
+BUDGET_BUCKET = float(os.getenv("HOST_BUDGET_BUCKET", "500"))
+
+plan_cache = TTLCache(maxsize=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL)
+
+# Última seção boa de cada agente, servida (marcada como "stale") quando o circuito dele está aberto
+SECTION_CACHE_TTL = float(os.getenv("HOST_SECTION_CACHE_TTL", "3600"))
+section_cache = TTLCache(maxsize=PLAN_CACHE_SIZE * 3, ttl=SECTION_CACHE_TTL)
+
+# Respostas de sub-consultas de roteiros com vários trechos (voo de um trecho, hotel de uma parada...):
+# consultas iguais, no mesmo roteiro ou em roteiros simultâneos, viram uma única chamada
+subquery_cache = TTLCache(maxsize=PLAN_CACHE_SIZE * 3, ttl=PLAN_CACHE_TTL)
+
+# Combinações ranqueadas devolvidas pelo otimizador
+TOP_BUNDLES = int(os.getenv("HOST_TOP_BUNDLES", "3"))
+
+# Modo flexível: pares de datas avaliados ao mesmo tempo e orçamento total da matriz (segundos)
+FLEX_CONCURRENCY = int(os.getenv("HOST_FLEX_CONCURRENCY", "4"))
+FLEX_BUDGET = float(os.getenv("HOST_FLEX_BUDGET", "60"))
+
+SECTION_LATENCY = metrics.REGISTRY.histogram(
+    "host_section_duration_seconds", "Tempo de cada seção do fan-out do host", ("section", "status")
+)
+
+# "http" (agentes em processos/máquinas separados) ou "inprocess" (mesmo processo)
+transport = get_transport(os.getenv("HOST_TRANSPORT", "http"))
+
+
+def _replicas(env_var):
+    # Réplicas extras do agente para failover/hedging: "http://host:8011/run,http://host:8021/run"
+    return tuple(url.strip() for url in os.getenv(env_var, "").split(",") if url.strip())
+
+
+# seção, nome do agente, url, chave na resposta do sub-agente, mensagem padrão, prazo, réplicas, campos de preço
+SubAgent = namedtuple("SubAgent", "section agent url key fallback deadline replicas price_fields")
+
+SUB_AGENTS = [
+    SubAgent("flights", "flight_agent", FLIGHT_URL, "flights", "Nenhum voo retornado.", FLIGHT_DEADLINE, _replicas("HOST_FLIGHT_REPLICAS"), ("preco",)),
+    SubAgent("stays", "stay_agent", STAY_URL, "stays", "Nenhuma hospedagem retornada.", STAY_DEADLINE, _replicas("HOST_STAY_REPLICAS"), ("preco_noite", "preco_total")),
+    SubAgent("activities", "activities_agent", ACTIVITIES_URL, "activities", "Nenhuma atividade encontrada.", ACTIVITIES_DEADLINE, _replicas("HOST_ACTIVITIES_REPLICAS"), ("preco",)),
+]
+
+
+AGENTS_BY_SECTION = {sub_agent.section: sub_agent for sub_agent in SUB_AGENTS}
+
+
+def plan_currency(payload):
+    return (payload.get("currency") or fx.DEFAULT_CURRENCY).upper()
+
+
+def _valid_section(value):
+    # Seção boa: lista de ofertas (dicts), possivelmente vazia
+    return isinstance(value, list) and all(isinstance(offer, dict) for offer in value)
+
+
+async def _call_section(sub_agent, deadline, payload):
+    section, key, fallback = sub_agent.section, sub_agent.key, sub_agent.fallback
+    cache_key = (section, plan_cache_key(payload))
+    started = time.perf_counter()
     try:
-        # Print what the host agent is sending
-        print("=" * 50)
-        print("📥 Host Agent - Payload recebido:", payload)
-        print("=" * 50)
-        
-        # Chama os agentes
-        print("🔄 Chamando Flight Agent...")
-        flights = await call_agent(FLIGHT_URL, payload)
-        print("✅ Flight Agent respondeu:", flights)
-        
-        print("🔄 Chamando Stay Agent...")
-        stay = await call_agent(STAY_URL, payload)
-        print("✅ Stay Agent respondeu:", stay)
-        
-        print("🔄 Chamando Activities Agent...")
-        activities = await call_agent(ACTIVITIES_URL, payload)
-        print("✅ Activities Agent respondeu:", activities)
-        
-        # Ensure all are dicts before access
-        flights = flights if isinstance(flights, dict) else {}
-        stay = stay if isinstance(stay, dict) else {}
-        activities = activities if isinstance(activities, dict) else {}
-        
-        result = {
-            "flights": flights.get("flights", "Nenhum voo retornado."),
-            "stay": stay.get("stays", "Nenhuma hospedagem retornada."),
-            "activities": activities.get("activities", "Nenhuma atividade encontrada.")
-        }
-        
-        print("=" * 50)
-        print("📤 Host Agent - Resultado final:", result)
-        print("=" * 50)
-        
-        return result
-        
+        # O transporte aplica o prazo (e conta o estouro no circuit breaker);
+        # o wait_for externo só protege transportes que o ignoram
+        response = await asyncio.wait_for(
+            transport.call(sub_agent.agent, sub_agent.url, payload, timeout=deadline, replicas=sub_agent.replicas),
+            timeout=deadline + 1,
+        )
+        response = response if isinstance(response, dict) else {}
+        value = response.get(key)
+        ok = _valid_section(value) and "error" not in response
+        if ok:
+            # Garante uma única moeda no plano (réplicas/LLM podem responder em outra);
+            # dentro do try: uma cotação que falhe derruba só esta seção
+            value = fx.rates.convert_offers(value, sub_agent.price_fields, plan_currency(payload))
+    except CircuitOpenError as e:
+        stale = section_cache.peek(cache_key)
+        status = {"status": "circuit_open", "error": str(e), "stale": stale is not None}
+        value = stale if stale is not None else fallback
+    except OverloadedError as e:
+        # Sub-agente cheio (503): não insiste antes do Retry-After, usa a última resposta boa
+        stale = section_cache.peek(cache_key)
+        status = {"status": "overloaded", "error": str(e), "retry_after": e.retry_after, "stale": stale is not None}
+        value = stale if stale is not None else fallback
+    except asyncio.TimeoutError:
+        status = {"status": "timeout", "error": f"Sem resposta em {deadline:g}s"}
+        value = fallback
     except Exception as e:
-        print("=" * 50)
-        print("❌ ERRO no Host Agent:")
-        print(f"Tipo: {type(e).__name__}")
-        print(f"Mensagem: {str(e)}")
-        print("Traceback completo:")
-        traceback.print_exc()
-        print("=" * 50)
+        status = {"status": "error", "error": f"{type(e).__name__}: {e}"}
+        value = fallback
+    else:
+        if ok:
+            status = {"status": "ok"}
+            section_cache.set(cache_key, value)
+        else:
+            # Sub-agentes reportam falhas como texto na própria seção ({"flights": "Erro: ..."}):
+            # não entram no section_cache e deixam o plano parcial
+            error = response.get("error") or (value if isinstance(value, str) else "Resposta sem a seção esperada")
+            status = {"status": "error", "error": str(error)}
+            value = fallback
+    elapsed = time.perf_counter() - started
+    status["elapsed_ms"] = round(elapsed * 1000, 1)
+    SECTION_LATENCY.observe(elapsed, section=section, status=status["status"])
+    metrics.record_stage(section, elapsed, observe=False)
+    return section, value, status
+
+
+async def iter_sections(payload, budget=REQUEST_BUDGET):
+    """Dispara os sub-agentes em paralelo e entrega cada seção assim que fica pronta.
+
+    Seções que estouram o orçamento total são canceladas e entregues com
+    status "timeout", para que o chamador sempre receba as três.
+    """
+    tasks = {
+        asyncio.create_task(_call_section(sub_agent, min(sub_agent.deadline, budget), payload)): sub_agent
+        for sub_agent in SUB_AGENTS
+    }
+    loop = asyncio.get_running_loop()
+    ends_at = loop.time() + budget
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(ends_at - loop.time(), 0),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+    for task in pending:
+        sub_agent = tasks[task]
+        yield sub_agent.section, sub_agent.fallback, {"status": "timeout", "error": f"Orçamento de {budget:g}s esgotado"}
+
+
+def plan_cache_key(payload):
+    # Normaliza a requisição: cidades sem caixa/espaços extras e orçamento agrupado em faixas.
+    # O cache guarda só as seções; bundles e sobra saem do orçamento exato (rank) a cada pedido
+    budget = float(payload.get("budget") or 0)
+    return (
+        " ".join(str(payload.get("origin") or "").lower().split()),
+        " ".join(str(payload.get("destination") or "").lower().split()),
+        str(payload.get("start_date") or ""),
+        str(payload.get("end_date") or ""),
+        int(budget // BUDGET_BUCKET) if BUDGET_BUCKET > 0 else budget,
+        plan_currency(payload),
+    )
+
+
+def stats():
+    return {
+        "plan_cache": plan_cache.stats(),
+        "section_cache": section_cache.stats(),
+        "subquery_cache": subquery_cache.stats(),
+        "transport": transport.name,
+        "registry": transport.stats(),
+        "log": log.stats(),
+        "resilience": resilience.snapshot(),
+        "fx": fx.rates.snapshot(),
+        "prewarm": prewarmer.snapshot(),
+    }
+
+
+async def rank(result, payload):
+    """Cópia do plano com as combinações (bundles) calculadas para o orçamento exato do payload."""
+    # Otimização é CPU: roda fora do event loop
+    with metrics.stage("optimize"):
+        bundles = await asyncio.to_thread(
+            optimize,
+            result["flights"],
+            result["stays"],
+            result["activities"],
+            fx.rates.convert(float(payload.get("budget") or 0), fx.BUDGET_CURRENCY, plan_currency(payload)),
+            TOP_BUNDLES,
+        )
+    return dict(result, bundles=bundles)
+
+
+async def _assemble(result, sections, payload):
+    # Mantém a ordem fixa das seções, independente de quem respondeu primeiro
+    result = {sub_agent.section: result[sub_agent.section] for sub_agent in SUB_AGENTS}
+    result["moeda"] = plan_currency(payload)
+    result["sections"] = sections
+    result["partial"] = any(s["status"] != "ok" for s in sections.values())
+    return result
+
+
+async def plan(payload):
+    # Chama os agentes em paralelo; cada seção traz seu próprio status (sem bundles: ver rank)
+    result = {}
+    sections = {}
+    async for section, value, status in iter_sections(payload):
+        log.event(
+            logger,
+            logging.INFO if status["status"] == "ok" else logging.WARNING,
+            "Seção recebida",
+            section=section,
+            status=status["status"],
+            elapsed_ms=status.get("elapsed_ms"),
+        )
+        result[section] = value
+        sections[section] = status
+    return await _assemble(result, sections, payload)
+
+
+async def cached_plan(payload):
+    # Requisições idênticas e simultâneas compartilham um único fan-out;
+    # planos parciais não entram no cache
+    return await plan_cache.get_or_compute(
+        plan_cache_key(payload),
+        lambda: plan(payload),
+        cacheable=lambda r: not r["partial"],
+    )
+
+
+async def flexible_plan(payload, window):
+    """Seções do melhor par de datas da janela ±, com a matriz de menor total por par de datas.
+
+    Cada par é um plano normal (cache e single-flight inclusos), então pares
+    já consultados em buscas anteriores não repetem o fan-out.
+    """
+    departures, returns = flexible.date_axes(payload["start_date"], payload["end_date"], *window)
+    base = {key: value for key, value in payload.items() if key not in flexible.FLEX_FIELDS}
+    slots = asyncio.Semaphore(FLEX_CONCURRENCY)
+
+    async def evaluate(i, j):
+        async with slots:
+            cell = dict(base, start_date=departures[i].isoformat(), end_date=returns[j].isoformat())
+            return (i, j), await cached_plan(cell)
+
+    tasks = [asyncio.create_task(evaluate(i, j)) for i, j in flexible.date_pairs(departures, returns)]
+    done, pending = await asyncio.wait(tasks, timeout=FLEX_BUDGET) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+    plans = dict(task.result() for task in done if task.exception() is None)
+
+    matrix = flexible.price_matrix(plans, (len(departures), len(returns)))
+    best = flexible.best_cell(matrix)
+    # Sem nenhum total calculável, vale o plano das datas originais
+    result = dict(plans[best] if best is not None else await cached_plan(base))
+    result["flex"] = {
+        "departure_dates": [day.isoformat() for day in departures],
+        "return_dates": [day.isoformat() for day in returns],
+        "totals": flexible.to_rows(matrix),
+        "best": {
+            "start_date": departures[best[0]].isoformat(),
+            "end_date": returns[best[1]].isoformat(),
+            "total": round(float(matrix[best]), 2),
+        } if best is not None else None,
+        "evaluated": len(plans),
+        "pairs": len(tasks),
+        "moeda": plan_currency(payload),
+    }
+    result["partial"] = result["partial"] or len(plans) < len(tasks)
+    log.event(logger, logging.INFO, "Matriz de datas", evaluated=len(plans), pairs=len(tasks), best=result["flex"]["best"])
+    return result
+
+
+def flexible_cache_key(payload, window):
+    return ("flex",) + plan_cache_key(payload) + window
+
+
+async def cached_flexible_plan(payload, window):
+    return await plan_cache.get_or_compute(
+        flexible_cache_key(payload, window),
+        lambda: flexible_plan(payload, window),
+        cacheable=lambda r: not r["partial"],
+    )
+
+
+async def _subquery(section, payload, budget):
+    sub_agent = AGENTS_BY_SECTION[section]
+    return await subquery_cache.get_or_compute(
+        (section,) + plan_cache_key(payload),
+        lambda: _call_section(sub_agent, min(sub_agent.deadline, budget), payload),
+        cacheable=lambda answer: answer[2]["status"] == "ok",
+    )
+
+
+async def itinerary_plan(payload, budget=REQUEST_BUDGET):
+    """Roteiro com vários trechos: todas as sub-consultas em paralelo, sem repetir as iguais.
+
+    A latência fica próxima à da sub-consulta mais lenta (limitada pelo
+    orçamento total), não à soma dos trechos.
+    """
+    queries = itinerary.subqueries(payload)
+    keys = {(place, section): (section,) + plan_cache_key(sub_payload) for place, section, sub_payload in queries}
+    unique = {}
+    for place, section, sub_payload in queries:
+        unique.setdefault(keys[(place, section)], (section, sub_payload))
+    tasks = {key: asyncio.create_task(_subquery(section, sub_payload, budget)) for key, (section, sub_payload) in unique.items()}
+    done, pending = await asyncio.wait(tasks.values(), timeout=budget) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+
+    answers = {}
+    for (place, section), key in keys.items():
+        task = tasks[key]
+        if task not in done:
+            status = {"status": "timeout", "error": f"Orçamento de {budget:g}s esgotado"}
+        elif isinstance(task.exception(), asyncio.TimeoutError):
+            status = {"status": "timeout", "error": str(task.exception()) or "Sem resposta"}
+        elif task.exception() is not None:
+            # Mesmo formato do _call_section: conexão, 5xx e bugs não se passam por timeout
+            status = {"status": "error", "error": f"{type(task.exception()).__name__}: {task.exception()}"}
+        else:
+            answers[(place, section)] = task.result()[1:]
+            continue
+        answers[(place, section)] = (AGENTS_BY_SECTION[section].fallback, status)
+
+    result = itinerary.consolidate(payload, answers, len(unique))
+    result["moeda"] = result["itinerary"]["moeda"] = plan_currency(payload)
+    log.event(
+        logger,
+        logging.INFO,
+        "Roteiro montado",
+        legs=len(payload["legs"]),
+        subqueries=len(queries),
+        unique=len(unique),
+        partial=result["partial"],
+    )
+    return result
+
+
+def itinerary_cache_key(payload):
+    legs = tuple(
+        (plan_cache_key({"origin": leg["origin"], "destination": leg["destination"]})[:2], str(leg["date"]))
+        for leg in payload["legs"]
+    )
+    return ("legs", legs) + plan_cache_key({**payload, "origin": None, "destination": None})
+
+
+async def cached_itinerary_plan(payload):
+    return await plan_cache.get_or_compute(
+        itinerary_cache_key(payload),
+        lambda: itinerary_plan(payload),
+        cacheable=lambda r: not r["partial"],
+    )
+
+
+def plan_entry(payload):
+    """(chave no plan_cache, função que calcula o plano) conforme o modo do payload."""
+    if payload.get("legs"):
+        return itinerary_cache_key(payload), lambda: itinerary_plan(payload)
+    window = flexible.window(payload)
+    if window is not None:
+        return flexible_cache_key(payload, window), lambda: flexible_plan(payload, window)
+    return plan_cache_key(payload), lambda: plan(payload)
+
+
+# Recalcula as rotas populares (arquivo + consultas recentes) antes de expirarem no plan_cache
+prewarmer = prewarm.Prewarmer(plan_entry, plan_cache)
+
+
+async def startup():
+    await transport.start()
+    await prewarmer.start()
+
+
+async def shutdown():
+    await prewarmer.stop()
+    await transport.stop()
+
+
+async def stream(payload):
+    prewarmer.record(payload)
+    with prewarmer.track_live():
+        async for event in _stream(payload):
+            yield event
+
+
+async def _stream(payload):
+    # Eventos para /run/stream: uma seção por vez e um resumo no final
+    if payload.get("legs"):
+        # Vários trechos: seções consolidadas e o roteiro por trecho/parada
+        result = await cached_itinerary_plan(payload)
+        for section, status in result["sections"].items():
+            yield {"event": "section", "section": section, "data": result[section], "status": status}
+        yield {"event": "itinerary", "data": result["itinerary"]}
+        yield {"event": "summary", "sections": result["sections"], "partial": result["partial"], "moeda": result["moeda"]}
+        return
+
+    window = flexible.window(payload)
+    if window is not None:
+        # Modo flexível: as seções são as do melhor par de datas, seguidas da matriz
+        result = await rank(await cached_flexible_plan(payload, window), payload)
+        for event in _plan_events(result):
+            yield event
+        yield {"event": "matrix", "data": result["flex"]}
+        yield {"event": "summary", "sections": result["sections"], "partial": result["partial"], "moeda": result["moeda"]}
+        return
+
+    key = plan_cache_key(payload)
+    cached = plan_cache.get(key)
+    if cached is not None:
+        log.event(logger, logging.INFO, "Plano servido do cache")
+        cached = await rank(cached, payload)
+        for event in _plan_events(cached):
+            yield event
+        yield {"event": "summary", "sections": cached["sections"], "partial": cached["partial"], "moeda": cached["moeda"], "cached": True}
+        return
+
+    # Single-flight junto com o /run e o pré-aquecimento: se o mesmo plano já está sendo
+    # calculado, espera por ele em vez de repetir o fan-out
+    future = plan_cache.begin(key)
+    if future is None:
+        log.event(logger, logging.INFO, "Plano já em cálculo, aguardando")
+        result = await rank(await cached_plan(payload), payload)
+        for event in _plan_events(result):
+            yield event
+        yield {"event": "summary", "sections": result["sections"], "partial": result["partial"], "moeda": result["moeda"]}
+        return
+
+    sections = {}
+    result = {}
+    try:
+        async for section, value, status in iter_sections(payload):
+            result[section] = value
+            sections[section] = status
+            log.event(logger, logging.DEBUG, "Enviando seção", section=section, status=status["status"])
+            yield {"event": "section", "section": section, "data": value, "status": status}
+        result = await _assemble(result, sections, payload)
+    except BaseException as e:
+        # Inclusive o cliente desconectando (GeneratorExit): quem esperava calcula de novo
+        plan_cache.settle(key, future, error=e)
         raise
+    plan_cache.settle(key, future, result, cacheable=lambda r: not r["partial"])
+    result = await rank(result, payload)
+    yield {"event": "bundles", "data": result["bundles"]}
+    yield {"event": "summary", "sections": sections, "partial": result["partial"], "moeda": result["moeda"]}
+
+
+def _plan_events(result):
+    # Seções na ordem fixa e as combinações ranqueadas de um plano já pronto
+    for sub_agent in SUB_AGENTS:
+        section = sub_agent.section
+        yield {"event": "section", "section": section, "data": result[section], "status": result["sections"][section]}
+    yield {"event": "bundles", "data": result["bundles"]}
 
+
+async def run(payload):
+    try:
+        log.event(logger, logging.INFO, "Payload recebido", payload=payload)
+        prewarmer.record(payload)
+
+        window = flexible.window(payload)
+        with prewarmer.track_live():
+            if payload.get("legs"):
+                result = await cached_itinerary_plan(payload)
+            elif window is not None:
+                result = await rank(await cached_flexible_plan(payload, window), payload)
+            else:
+                result = await rank(await cached_plan(payload), payload)
+
+        log.event(
+            logger,
+            logging.INFO,
+            "Resultado final",
+            partial=result["partial"],
+            bundles=len(result["bundles"]),
+            sections={section: status["status"] for section, status in result["sections"].items()},
+        )
+        return result
+
+    except Exception:
+        logger.exception("Erro no Host Agent")
+        raise
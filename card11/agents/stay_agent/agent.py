@@ -1,49 +1,100 @@
-from google.adk.agents import Agent
-from google.adk.models.lite_llm import LiteLlm
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
 import json
+import logging
 from dotenv import load_dotenv
 import os
 
+from common import fx, log
+from common.llm import LLM_MODE, LazyLlmAgent
+from common.catalog import CATALOG_CURRENCY, load_catalog, to_day
+
+logger = log.get_logger(__name__)
+
 load_dotenv()
-if not os.getenv('OPENAI_API_KEY'):
-    raise ValueError("OPENAI_API_KEY não encontrada! Configure o arquivo .env")
 
 # agente de hospedagem + instruções do prompt do sistema que orienta o comportamento
-stay_agent = Agent(
+# (Agent/Runner do ADK só são criados no primeiro uso com LLM; as respostas mock não precisam de chave)
+stay_agent = LazyLlmAgent(
     name="stay_agent",
-    model=LiteLlm("openai/gpt-4o"),
     description="Sugere opções de acomodação adequadas para a viagem do usuário.",
     instruction=(
         "Dado um destino, data de check-in, data de check-out e orçamento, sugira 2-3 opções de hospedagem. "
         "Para cada opção, forneça nome do hotel/propriedade, localização, tipo de quarto, preço por noite e preço total. "
-        "Responda em português brasileiro simples. Seja conciso e bem formatado. "
+        "Preços como números, com a moeda em 'moeda'. Responda em português brasileiro simples. Seja conciso e bem formatado. "
         "IMPORTANTE: Responda SEMPRE em formato JSON válido com a chave 'stays' contendo uma lista de objetos de hospedagem. "
-        "Exemplo: {\"stays\": [{\"nome\": \"Hotel Exemplo\", \"localizacao\": \"Centro\", \"tipo_quarto\": \"Standard\", \"preco_noite\": \"USD 80\", \"preco_total\": \"USD 240\"}]}"
-    )
-)
-
-# configuração do runner
-session_service = InMemorySessionService()
-runner = Runner(
-    agent=stay_agent,
+        "Exemplo: {\"stays\": [{\"nome\": \"Hotel Exemplo\", \"localizacao\": \"Centro\", \"tipo_quarto\": \"Standard\", \"preco_noite\": 80, \"preco_total\": 240, \"moeda\": \"USD\"}]}"
+    ),
     app_name="stay_app",
-    session_service=session_service
+    user_id="user_stays",
+    session_id="session_stays",
 )
-USER_ID = "user_stays"
-SESSION_ID = "session_stays"
+
+# catálogo de hospedagens (data/stays.csv ou STAY_CATALOG), indexado por destino e data; price = diária
+catalog = load_catalog("STAY_CATALOG", "stays.csv", ("destination",), list_columns=("comodidades",))
+MAX_RESULTS = int(os.getenv("STAY_MAX_RESULTS", "3"))
+# Campos de preço (numéricos, na moeda indicada em "moeda")
+PRICE_FIELDS = ("preco_noite", "preco_total")
+
+
+def search_catalog(destination, start_date, end_date, request):
+    # None quando o destino não está no catálogo: o agente usa as ofertas padrão
+    if catalog is None or not catalog.has(destination):
+        return None
+    check_in, check_out = to_day(start_date), to_day(end_date)
+    nights = max(check_out - check_in, 1) if check_in is not None and check_out is not None else 1
+    # a estadia inteira não pode passar do orçamento (convertido para a moeda do catálogo)
+    min_price, max_total = fx.price_limits(request, CATALOG_CURRENCY)
+    rows = catalog.search(
+        destination,
+        date_from=start_date,
+        date_to=start_date,
+        min_price=min_price,
+        max_price=max_total / nights if max_total else None,
+        sort_by="price",
+        limit=int(request.get('limit', MAX_RESULTS)),
+    )
+    stays = []
+    for offer in catalog.records(rows):
+        stay = {
+            "nome": offer.get("nome"),
+            "localizacao": offer.get("localizacao"),
+            "tipo_quarto": offer.get("tipo_quarto"),
+            "preco_noite": offer['price'],
+            "preco_total": offer['price'] * nights,
+            "avaliacao": offer.get("avaliacao"),
+            "link_reserva": offer.get("link_reserva"),
+            "comodidades": offer.get("comodidades", []),
+            "cancelamento": offer.get("cancelamento"),
+        }
+        if offer.get("promocao"):
+            stay["promocao"] = offer["promocao"]
+        stays.append(stay)
+    return stays
 
 # Execução da lógica, cria um prompt e invoca o modelo e analisa a saída
 async def execute(request):
     try:
-        print(f"🔄 Stay Agent - Recebendo request: {request}")
+        log.event(logger, logging.INFO, "Recebendo request", payload=request)
         
         destination = request.get('destination', 'Unknown destination')
         start_date = request.get('start_date', 'Unknown date')
         end_date = request.get('end_date', 'Unknown date')
         budget = request.get('budget', 0)
+        currency = request.get('currency')
+
+        if LLM_MODE:
+            # Modo LLM: sem resposta válida dentro do prazo, segue para o catálogo/mock
+            llm_stays = await stay_agent.ask_json(
+                f"Destino: {destination}. Check-in: {start_date}. Check-out: {end_date}. Orçamento: USD {budget}.",
+                "stays",
+                user=request.get('user_id'),
+            )
+            if llm_stays is not None:
+                return {"stays": fx.rates.convert_offers(llm_stays, PRICE_FIELDS, currency, default=fx.BUDGET_CURRENCY)}
+
+        catalog_stays = search_catalog(destination, start_date, end_date, request)
+        if catalog_stays is not None:
+            log.event(logger, logging.INFO, "Retornando do catálogo", stays=len(catalog_stays))
+            return {"stays": fx.rates.convert_offers(catalog_stays, PRICE_FIELDS, currency, default=CATALOG_CURRENCY)}
         
         # Simula resposta de hospedagens com links de reserva em Real
         mock_stays = [
@@ -51,8 +102,8 @@ async def execute(request):
                 "nome": "Hotel Mercure Paris Centre",
                 "localizacao": "Centro de Paris - Châtelet",
                 "tipo_quarto": "Standard Double",
-                "preco_noite": f"R$ {budget * 0.15 * 5.5:.0f}",
-                "preco_total": f"R$ {budget * 0.6 * 5.5:.0f}",
+                "preco_noite": budget * 0.15,
+                "preco_total": budget * 0.6,
                 "avaliacao": "4.2/5 ⭐⭐⭐⭐",
                 "link_reserva": "https://www.booking.com/hotel/fr/mercure-paris-centre.pt-br.html?aid=356980&label=gog235jc-1DCAsonQFCCm1lcmN1cmUtcGFyaXNIM1gDbKEBiAEBmAEJuAEXyAEP2AED6AEB-AECiAIBqAIDuAKvyY-0BsACAdICJGZkOGExNDY4LTdhOWMtNDVmNy04YWM5LTAzMzRmNjc2OGQ5OdgCBOACAQ&sid=d8ff18e2b5b9ff2e69b8d5a0cbf72df0",
                 "comodidades": ["Wi-Fi gratuito", "Academia", "Restaurante", "Room Service"],
@@ -62,8 +113,8 @@ async def execute(request):
                 "nome": "Ibis Budget Paris Louvre",
                 "localizacao": "Próximo ao Louvre - 1º Arrondissement", 
                 "tipo_quarto": "Economy Room",
-                "preco_noite": f"R$ {budget * 0.08 * 5.5:.0f}",
-                "preco_total": f"R$ {budget * 0.35 * 5.5:.0f}",
+                "preco_noite": budget * 0.08,
+                "preco_total": budget * 0.35,
                 "avaliacao": "3.8/5 ⭐⭐⭐",
                 "link_reserva": "https://www.booking.com/hotel/fr/ibis-budget-paris-porte-de-montmartre.pt-br.html?aid=356980&label=gog235jc-1DCAsonQFCDGliaXMtYnVkZ2V0SAtYA2yhAYgBAZgBCbgBF8gBD9gBA-gBAagCBbgCr8mPtAbAAgHSAiRmZDhhMTQ2OC03YTljLTQ1ZjctOGFjOS0wMzM0ZjY3NjhkOTXYAgTgAgE&sid=d8ff18e2b5b9ff2e69b8d5a0cbf72df0",
                 "comodidades": ["Wi-Fi gratuito", "Ar condicionado", "Recepção 24h"],
@@ -74,8 +125,8 @@ async def execute(request):
                 "nome": "Hotel des Grands Boulevards",
                 "localizacao": "Grands Boulevards - 2º Arrondissement",
                 "tipo_quarto": "Superior Room",
-                "preco_noite": f"R$ {budget * 0.25 * 5.5:.0f}",
-                "preco_total": f"R$ {budget * 0.8 * 5.5:.0f}",
+                "preco_noite": budget * 0.25,
+                "preco_total": budget * 0.8,
                 "avaliacao": "4.6/5 ⭐⭐⭐⭐⭐",
                 "link_reserva": "https://www.booking.com/hotel/fr/des-grands-boulevards.pt-br.html?aid=356980&label=gog235jc-1DCAsonQFCFGRlcy1ncmFuZHMtYm91bGV2YXJkcxgESDNYA2yhAYgBAZgBCbgBF8gBD9gBA-gBAagCBbgCr8mPtAbAAgHSAiRmZDhhMTQ2OC03YTljLTQ1ZjctOGFjOS0wMzM0ZjY3NjhkOTXYAgTgAgE&sid=d8ff18e2b5b9ff2e69b8d5a0cbf72df0",
                 "comodidades": ["Wi-Fi gratuito", "Spa", "Bar", "Restaurante gourmet", "Terraço"],
@@ -84,9 +135,9 @@ async def execute(request):
             }
         ]
         
-        print(f"✅ Stay Agent - Retornando: {mock_stays}")
-        return {"stays": mock_stays}
+        log.event(logger, logging.INFO, "Retornando ofertas padrão", stays=mock_stays)
+        return {"stays": fx.rates.convert_offers(mock_stays, PRICE_FIELDS, currency, default=fx.BUDGET_CURRENCY)}
         
     except Exception as e:
-        print(f"❌ Erro no Stay Agent: {e}")
+        logger.exception("Erro no Stay Agent")
         return {"stays": f"Erro: {str(e)}"}
@@ -1,4 +1,8 @@
-from .agent import execute
+from .agent import execute, stay_agent
 
 async def run(payload):
     return await execute(payload)
+
+
+def stats():
+    return {"llm": stay_agent.stats()}
@@ -0,0 +1,68 @@
+# Micro-benchmark: cliente A2A por chamada (legado) vs. cliente compartilhado com pool
+# Uso (dentro de card11/): python -m benchmarks.bench_a2a_client --requests 2000 --concurrency 50
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks._server import BackgroundServer
+from common.a2a_client import A2AClient
+from common.a2a_server import create_app
+
+PAYLOAD = {
+    "origin": "São Paulo",
+    "destination": "Paris",
+    "start_date": "2025-01-15",
+    "end_date": "2025-01-22",
+    "budget": 1000,
+}
+
+
+async def echo(payload):
+    return {"flights": [payload]}
+
+
+async def per_call_client(url, payload):
+    # Comportamento anterior de call_agent: um AsyncClient novo por chamada
+    async with httpx.AsyncClient() as client:
+        response = await client.post(url, json=payload, timeout=60.0)
+        response.raise_for_status()
+        return response.json()
+
+
+async def drive(call, url, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call(url, PAYLOAD)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main(total, concurrency):
+    with BackgroundServer(create_app(agent=type("Agent", (), {"execute": echo}))) as server:
+        url = f"{server.url}/run"
+
+        legacy = await drive(per_call_client, url, total, concurrency)
+
+        async with A2AClient(max_connections_per_host=concurrency) as client:
+            pooled = await drive(client.post, url, total, concurrency)
+
+    print("=" * 50)
+    print(f"📊 {total} requisições, concorrência {concurrency}")
+    print(f"   Cliente por chamada : {legacy:8.1f} req/s")
+    print(f"   Cliente com pool    : {pooled:8.1f} req/s")
+    print(f"   Ganho               : {pooled / legacy:8.2f}x")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,101 @@
+# Benchmark do controle de admissão: agente lento sob sobrecarga, com e sem limite de concorrência
+# Uso (dentro de card11/): python -m benchmarks.bench_admission --requests 1200 --concurrency 400 --capacity 8
+#
+# O agente simula um recurso com capacidade fixa (ex.: cota do LLM): só `capacity`
+# execuções andam ao mesmo tempo, cada uma levando `service` segundos. Sem admissão
+# o excesso se acumula dentro do agente até o cliente desistir; com admissão ele
+# espera numa fila curta ou recebe 503 + Retry-After na hora, e o cliente tenta
+# de novo depois do Retry-After enquanto ainda houver prazo.
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from benchmarks._server import BackgroundServer
+from common.a2a_client import A2AClient
+from common.a2a_server import create_app
+from common.admission import AdmissionController
+from common.resilience import OverloadedError
+
+PAYLOAD = {"origin": "São Paulo", "destination": "Paris", "start_date": "2025-01-15", "end_date": "2025-01-22"}
+
+
+def slow_agent(capacity, service):
+    slots = None
+
+    async def execute(payload):
+        nonlocal slots
+        slots = slots or asyncio.Semaphore(capacity)
+        async with slots:
+            await asyncio.sleep(service)
+        return {"flights": []}
+
+    return type("Agent", (), {"execute": staticmethod(execute)})
+
+
+async def drive(url, total, concurrency, timeout):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, outcomes = [], {"ok": 0, "503": 0, "timeout": 0}
+
+    async def one(client):
+        async with semaphore:
+            started = time.perf_counter()
+            while True:
+                remaining = timeout - (time.perf_counter() - started)
+                try:
+                    await asyncio.wait_for(client.post(url, PAYLOAD, timeout=remaining), remaining)
+                except OverloadedError as e:
+                    # Cliente bem-comportado: espera o Retry-After e tenta de novo dentro do prazo
+                    if e.retry_after >= timeout - (time.perf_counter() - started):
+                        outcomes["503"] += 1
+                        break
+                    await asyncio.sleep(e.retry_after)
+                    continue
+                except Exception:
+                    outcomes["timeout"] += 1
+                else:
+                    outcomes["ok"] += 1
+                    latencies.append(time.perf_counter() - started)
+                break
+
+    async with A2AClient(max_connections=concurrency, max_connections_per_host=concurrency) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    # Latência só das que deram certo: o que o usuário de fato espera por uma resposta
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if latencies else (float("nan"),) * 2
+    return outcomes, p50, p99, outcomes["ok"] / elapsed
+
+
+def run(admission, args):
+    agent = slow_agent(args.capacity, args.service)
+    with BackgroundServer(create_app(agent=agent, admission=admission)) as server:
+        return asyncio.run(drive(f"{server.url}/run", args.requests, args.concurrency, args.timeout))
+
+
+def main(args):
+    scenarios = {
+        "sem limite": AdmissionController(max_concurrency=0),
+        "com admissão": AdmissionController(
+            max_concurrency=args.capacity, max_queue=args.capacity * 2, max_wait=args.timeout / 2
+        ),
+    }
+    print("=" * 80)
+    print(f"📊 {args.requests} requisições, {args.concurrency} clientes, capacidade {args.capacity} x {args.service * 1000:.0f} ms,"
+          f" timeout {args.timeout:g}s")
+    print(f"{'cenário':>14}{'ok':>7}{'503':>7}{'timeout':>9}{'p50 ok ms':>11}{'p99 ok ms':>11}{'ok/s':>9}")
+    for name, admission in scenarios.items():
+        outcomes, p50, p99, goodput = run(admission, args)
+        print(f"{name:>14}{outcomes['ok']:>7}{outcomes['503']:>7}{outcomes['timeout']:>9}{p50:>11.0f}{p99:>11.0f}{goodput:>9.1f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1200)
+    parser.add_argument("--concurrency", type=int, default=400)
+    parser.add_argument("--capacity", type=int, default=8, help="execuções simultâneas que o agente aguenta")
+    parser.add_argument("--service", type=float, default=0.05, help="segundos por execução")
+    parser.add_argument("--timeout", type=float, default=2.0, help="prazo total do cliente por requisição (s)")
+    main(parser.parse_args())
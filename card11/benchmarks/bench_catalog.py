@@ -0,0 +1,72 @@
+# Benchmark do catálogo colunar: construção do índice e latência de busca sobre 100k+ ofertas
+# Uso (dentro de card11/): python -m benchmarks.bench_catalog --offers 200000 --queries 5000
+import argparse
+import time
+
+import numpy as np
+
+from common.catalog import OfferCatalog
+
+CITIES = [
+    "São Paulo", "Rio de Janeiro", "Paris", "Lisboa", "Londres", "Roma", "Madri", "Nova York",
+    "Buenos Aires", "Santiago", "Tóquio", "Berlim", "Amsterdã", "Miami", "Cancún", "Orlando",
+]
+
+
+def synthetic_flights(count, seed=42):
+    rng = np.random.default_rng(seed)
+    origins = rng.integers(0, len(CITIES), count)
+    destinations = (origins + rng.integers(1, len(CITIES), count)) % len(CITIES)
+    days = np.datetime64("2025-01-01") + rng.integers(0, 365, count)
+    return {
+        "origin": [CITIES[i] for i in origins],
+        "destination": [CITIES[i] for i in destinations],
+        "date": [str(day) for day in days],
+        "companhia": rng.choice(["LATAM", "Air France", "Azul", "TAP", "Iberia"], count).tolist(),
+        "codigo_voo": [f"XX{i}" for i in range(count)],
+        "price": np.round(rng.uniform(400, 9000, count)).tolist(),
+        "duration_min": rng.integers(60, 1500, count).tolist(),
+    }
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q))
+
+
+def main(count, queries):
+    columns = synthetic_flights(count)
+    started = time.perf_counter()
+    catalog = OfferCatalog(columns, ("origin", "destination"))
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rng = np.random.default_rng(7)
+    search_us, full_us, hits = [], [], 0
+    for _ in range(queries):
+        origin, destination = rng.choice(len(CITIES), 2, replace=False)
+        day = str(np.datetime64("2025-01-01") + rng.integers(0, 358))
+        end = str(np.datetime64(day) + 7)
+        budget = float(rng.uniform(1000, 8000))
+        key = (CITIES[origin], CITIES[destination])
+
+        started = time.perf_counter()
+        rows = catalog.search(key, date_from=day, date_to=end, max_price=budget, sort_by="price", limit=10)
+        search_us.append((time.perf_counter() - started) * 1e6)
+        catalog.records(rows)
+        full_us.append((time.perf_counter() - started) * 1e6)
+        hits += len(rows)
+
+    print("=" * 60)
+    print(f"📚 {len(catalog)} ofertas em {len(catalog.keys())} rotas (índice em {build_ms:.0f} ms)")
+    print(f"🔎 {queries} buscas (janela de 7 dias, teto de preço, top 10 por preço)")
+    print(f"   busca         p50 {percentile(search_us, 50):7.1f} µs   p99 {percentile(search_us, 99):7.1f} µs")
+    print(f"   busca + dicts p50 {percentile(full_us, 50):7.1f} µs   p99 {percentile(full_us, 99):7.1f} µs")
+    print(f"   média de {hits / queries:.1f} ofertas por busca")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--offers", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.offers, args.queries)
@@ -0,0 +1,73 @@
+# Benchmark do modo de datas flexíveis: matriz ± N dias contra refazer a busca data a data
+# Uso (dentro de card11/): python -m benchmarks.bench_flexible --days 1 2 3 --agent-delay 0.2
+#
+# Usa o transporte em processo com um atraso artificial por chamada de sub-agente,
+# simulando a latência de rede/LLM sem depender de nada no ar.
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("HOST_TRANSPORT", "inprocess")
+os.environ.setdefault("LOG_SAMPLE_INFO", "0")
+
+from agents.host_agent import flexible, task_manager  # noqa: E402
+
+PAYLOAD = {
+    "origin": "São Paulo",
+    "destination": "Paris",
+    "start_date": "2025-01-15",
+    "end_date": "2025-01-22",
+    "budget": 1000,
+}
+
+
+def add_delay(seconds):
+    call = task_manager.transport.call
+
+    async def slow_call(*args, **kwargs):
+        await asyncio.sleep(seconds)
+        return await call(*args, **kwargs)
+
+    task_manager.transport.call = slow_call
+
+
+async def sequential(payload, window):
+    # O que o usuário fazia antes: uma busca completa por par de datas, uma depois da outra
+    departures, returns = flexible.date_axes(payload["start_date"], payload["end_date"], *window)
+    for i, j in flexible.date_pairs(departures, returns):
+        await task_manager.plan(dict(payload, start_date=departures[i].isoformat(), end_date=returns[j].isoformat()))
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    await coro
+    return (time.perf_counter() - started) * 1000
+
+
+async def main(days_list, delay):
+    add_delay(delay)
+    print("=" * 72)
+    print(f"{'± dias':>7}{'pares':>7}{'sequencial ms':>16}{'matriz fria ms':>16}{'matriz quente ms':>18}")
+    for days in days_list:
+        window = (days, days)
+        departures, returns = flexible.date_axes(PAYLOAD["start_date"], PAYLOAD["end_date"], *window)
+        pairs = len(flexible.date_pairs(departures, returns))
+        task_manager.plan_cache.clear()
+        before = await timed(sequential(PAYLOAD, window))
+        task_manager.plan_cache.clear()
+        cold = await timed(task_manager.flexible_plan(PAYLOAD, window))
+        # Janela deslocada em um dia: a maior parte dos pares já está em cache
+        shifted = dict(PAYLOAD, start_date="2025-01-16", end_date="2025-01-23")
+        warm = await timed(task_manager.flexible_plan(shifted, window))
+        print(f"{days:>7}{pairs:>7}{before:>16.1f}{cold:>16.1f}{warm:>18.1f}")
+    print(f"   atraso por sub-agente {delay * 1000:.0f} ms, {task_manager.FLEX_CONCURRENCY} pares em paralelo")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--agent-delay", type=float, default=0.2, help="segundos por chamada de sub-agente")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.agent_delay))
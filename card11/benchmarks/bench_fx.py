@@ -0,0 +1,45 @@
+# Benchmark da conversão de moeda: lista inteira de ofertas de uma vez contra oferta por oferta
+# Uso (dentro de card11/): python -m benchmarks.bench_fx --offers 10 100 1000 --repeat 200
+import argparse
+import timeit
+
+from benchmarks.bench_serialization import make_offers
+from common import fx
+from shared.schemas import parse_price
+
+
+def per_offer(offers, target):
+    # Forma antiga: reparse do texto e multiplicação item a item
+    converted = []
+    for offer in offers:
+        amount, currency = fx.split_price(offer["preco"], "BRL")
+        converted.append(dict(offer, preco=round(amount * fx.rates.rate(currency, target), 2), moeda=target))
+    return converted
+
+
+def legacy_text(offers):
+    # Só o reparse de "R$ 1650" que o host fazia antes de cada ordenação/orçamento
+    return [parse_price(offer["preco"]) for offer in offers]
+
+
+def main(offer_counts, repeat):
+    print("=" * 72)
+    print(f"{'ofertas':>8}{'texto -> número µs':>22}{'por oferta µs':>16}{'lista vetorizada µs':>22}")
+    for count in offer_counts:
+        offers = make_offers(count)["flights"]
+        numeric = [dict(offer, preco=1650.0 + i, moeda="BRL") for i, offer in enumerate(offers)]
+        parse = timeit.timeit(lambda: legacy_text(offers), number=repeat) / repeat * 1e6
+        loop = timeit.timeit(lambda: per_offer(numeric, "EUR"), number=repeat) / repeat * 1e6
+        vector = timeit.timeit(
+            lambda: fx.rates.convert_offers(numeric, ("preco",), "EUR"), number=repeat
+        ) / repeat * 1e6
+        print(f"{count:>8}{parse:>22.1f}{loop:>16.1f}{vector:>22.1f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--offers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.offers, args.repeat)
@@ -0,0 +1,58 @@
+# Benchmark de roteiros com vários trechos: uma chamada multi-trecho contra uma chamada de host por trecho
+# Uso (dentro de card11/): python -m benchmarks.bench_itinerary --cities 3 5 --agent-delay 0.2
+#
+# Transporte em processo com atraso artificial por chamada de sub-agente (ver bench_flexible).
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+from benchmarks.bench_flexible import add_delay, timed
+from agents.host_agent import task_manager
+
+CITIES = ("São Paulo", "Lisboa", "Paris", "Roma", "Madri", "Londres", "Berlim")
+
+
+def make_legs(stops):
+    # São Paulo → cidade 1 → ... → cidade N → São Paulo, quatro noites em cada cidade
+    route = [CITIES[0]] + list(CITIES[1:stops + 1]) + [CITIES[0]]
+    start = date(2025, 3, 1)
+    return [
+        {"origin": a, "destination": b, "date": (start + timedelta(days=4 * i)).isoformat()}
+        for i, (a, b) in enumerate(zip(route, route[1:]))
+    ]
+
+
+async def per_leg(legs, budget):
+    # Como o cliente fazia: um plano de ida e volta por trecho, um depois do outro
+    for leg, following in zip(legs, legs[1:] + [legs[-1]]):
+        await task_manager.plan({
+            "origin": leg["origin"], "destination": leg["destination"],
+            "start_date": leg["date"], "end_date": following["date"], "budget": budget,
+        })
+
+
+async def main(stops_list, delay):
+    add_delay(delay)
+    # Aquecimento: imports e caches de catálogo fora da medição
+    await per_leg(make_legs(1), 3000)
+    print("=" * 72)
+    print(f"{'cidades':>8}{'trechos':>9}{'sub-consultas':>15}{'por trecho ms':>16}{'multi-trecho ms':>18}")
+    for stops in stops_list:
+        legs = make_legs(stops)
+        payload = {"budget": 3000, "legs": legs}
+        task_manager.plan_cache.clear()
+        task_manager.subquery_cache.clear()
+        before = await timed(per_leg(legs, payload["budget"]))
+        task_manager.subquery_cache.clear()
+        after = await timed(task_manager.itinerary_plan(payload))
+        print(f"{stops:>8}{len(legs):>9}{len(legs) + 2 * stops:>15}{before:>16.1f}{after:>18.1f}")
+    print(f"   atraso por sub-agente {delay * 1000:.0f} ms")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cities", type=int, nargs="+", default=[2, 3, 5])
+    parser.add_argument("--agent-delay", type=float, default=0.2, help="segundos por chamada de sub-agente")
+    args = parser.parse_args()
+    asyncio.run(main([min(n, len(CITIES) - 1) for n in args.cities], args.agent_delay))
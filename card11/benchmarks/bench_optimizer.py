@@ -0,0 +1,69 @@
+# Benchmark do otimizador de combinações do host com centenas de candidatos por agente
+# Uso (dentro de card11/): python -m benchmarks.bench_optimizer --candidates 300 --runs 50
+import argparse
+import time
+
+import numpy as np
+
+from agents.host_agent.optimizer import optimize
+
+
+def synthetic_offers(count, seed=1):
+    rng = np.random.default_rng(seed)
+
+    def flights(tipo):
+        return [
+            {
+                "tipo": tipo,
+                "companhia": f"Cia {i}",
+                "duracao": f"{rng.integers(10, 30)}h{rng.integers(0, 60)}m",
+                "preco": f"R$ {rng.uniform(900, 6000):.0f}",
+            }
+            for i in range(count)
+        ]
+
+    stays = [
+        {
+            "nome": f"Hotel {i}",
+            "preco_total": f"R$ {rng.uniform(800, 12000):.0f}",
+            "avaliacao": f"{rng.uniform(2.5, 5):.1f}/5",
+        }
+        for i in range(count)
+    ]
+    activities = [
+        {
+            "nome": f"Atividade {i}",
+            "preco": f"R$ {rng.uniform(50, 1500):.0f}",
+            "avaliacao": f"{rng.uniform(3, 5):.1f}/5",
+        }
+        for i in range(count)
+    ]
+    return flights("IDA") + flights("VOLTA"), stays, activities
+
+
+def main(candidates, runs, budget):
+    flights, stays, activities = synthetic_offers(candidates)
+    optimize(flights, stays, activities, budget)  # aquecimento
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        bundles = optimize(flights, stays, activities, budget, top_k=5)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print("=" * 60)
+    print(f"🧮 {candidates} voos de ida, {candidates} de volta, {candidates} hospedagens, {candidates} atividades")
+    print(f"   orçamento R$ {budget:.0f}, {runs} execuções")
+    print(f"   p50 {np.percentile(timings, 50):.1f} ms   p95 {np.percentile(timings, 95):.1f} ms")
+    best = bundles[0] if bundles else None
+    if best:
+        print(f"   melhor: total R$ {best['total']:.0f}, {len(best['atividades'])} atividades, score {best['score']}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--budget", type=float, default=25000)
+    args = parser.parse_args()
+    main(args.candidates, args.runs, args.budget)
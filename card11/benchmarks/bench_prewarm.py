@@ -0,0 +1,56 @@
+# Benchmark do pré-aquecimento: primeira consulta de cada rota popular com o cache frio e depois de um ciclo
+# Uso (dentro de card11/): python -m benchmarks.bench_prewarm --routes 5 20 --agent-delay 0.2
+#
+# Transporte em processo com atraso artificial por chamada de sub-agente (ver bench_flexible).
+import argparse
+import asyncio
+
+from benchmarks.bench_flexible import add_delay, timed
+from agents.host_agent import task_manager
+from agents.host_agent.prewarm import Prewarmer, route_payload
+
+
+def make_routes(count):
+    # Mesma rota em janelas diferentes (o catálogo só tem São Paulo ↔ Paris)
+    return [
+        {"origin": "São Paulo", "destination": "Paris", "start_in_days": 7 + i, "nights": 5, "budget": 3000}
+        for i in range(count)
+    ]
+
+
+async def first_users(routes):
+    # Um usuário por rota, um depois do outro: latência média da primeira consulta (ms)
+    total = 0.0
+    for route in routes:
+        total += await timed(task_manager.run(route_payload(route)))
+    return total / len(routes)
+
+
+async def main(route_counts, delay, concurrency, cpu):
+    add_delay(delay)
+    await first_users(make_routes(1))
+    print("=" * 78)
+    print(f"{'rotas':>6}{'frio ms':>10}{'pré-aquecido ms':>17}{'ciclo ms':>11}{'CPU do ciclo s':>16}")
+    for count in route_counts:
+        routes = make_routes(count)
+        task_manager.plan_cache.clear()
+        cold = await first_users(routes)
+
+        task_manager.plan_cache.clear()
+        prewarmer = Prewarmer(task_manager.plan_entry, task_manager.plan_cache, path="", top=0, concurrency=concurrency, cpu=cpu)
+        prewarmer.routes = lambda: routes
+        await prewarmer.run_once()
+        warm = await first_users(routes)
+        print(f"{count:>6}{cold:>10.1f}{warm:>17.2f}{prewarmer.last_cycle_ms:>11.0f}{prewarmer.cpu_seconds:>16.3f}")
+    print(f"   atraso por sub-agente {delay * 1000:.0f} ms, {concurrency} recálculo(s) por vez, CPU {cpu:.0%}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--routes", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--agent-delay", type=float, default=0.2, help="segundos por chamada de sub-agente")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--cpu", type=float, default=0.25, help="fração de um núcleo para o pré-aquecimento")
+    args = parser.parse_args()
+    asyncio.run(main(args.routes, args.agent_delay, args.concurrency, args.cpu))
@@ -0,0 +1,89 @@
+# Benchmark dos schemas: validação do payload e serialização da resposta por requisição
+# Uso (dentro de card11/): python -m benchmarks.bench_schemas --offers 10 100 --repeat 2000
+#
+# Payload: "antes" é o modelo antigo (str e .dict()), "depois" o TravelRequest validado pelo pydantic-core.
+# Resposta: "antes" é o encoder orjson (common/serialization) que já estava no /run; "depois" é o caminho
+# padrão (o mesmo encoder, sem revalidar) e "debug" é A2A_VALIDATE_RESPONSES=true (validação + to_json).
+import argparse
+import timeit
+import warnings
+from typing import Optional
+
+from pydantic import BaseModel
+
+from benchmarks.bench_serialization import make_offers
+from common import serialization
+from common.a2a_server import parse_payload, typed_result
+from shared.schemas import FlightResponse, TravelRequest
+
+PAYLOAD = {
+    "origin": "São Paulo",
+    "destination": "Paris",
+    "start_date": "2025-01-15",
+    "end_date": "2025-01-22",
+    "budget": 1000,
+}
+
+
+class LegacyPayload(BaseModel):
+    # Modelo antigo do a2a_server
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    budget: Optional[float] = None
+
+
+def legacy_parse(data):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return LegacyPayload(**data).dict()
+
+
+def orjson_encode(result):
+    return serialization.dumps(result, serialization.JSON)
+
+
+def default_encode(result):
+    # Caminho padrão do /run: typed_result devolve o dict e o encoder é o mesmo de antes
+    return orjson_encode(typed_result(FlightResponse, result))
+
+
+def validated_encode(result):
+    model = typed_result(FlightResponse, result, validate=True)
+    return type(model).__pydantic_serializer__.to_json(model, exclude_unset=True)
+
+
+def timed(fn, arg, repeat):
+    return timeit.timeit(lambda: fn(arg), number=repeat) / repeat * 1e6
+
+
+def main(offer_counts, repeat):
+    print("=" * 72)
+    print(f"📝 payload da requisição ({repeat} repetições)")
+    before = timed(legacy_parse, PAYLOAD, repeat)
+    after = timed(lambda data: parse_payload(data, TravelRequest), PAYLOAD, repeat)
+    print(f"   antes  LegacyPayload(**d).dict()       {before:8.1f} µs")
+    print(f"   depois TravelRequest.model_validate    {after:8.1f} µs  (datas e números validados)")
+
+    for count in offer_counts:
+        result = make_offers(count)
+        print("=" * 72)
+        print(f"📦 resposta com {count} ofertas")
+        rows = [
+            ("antes  encoder orjson (serialization)", orjson_encode),
+            ("depois padrão, sem revalidar", default_encode),
+            ("debug  validação + to_json (pydantic-core)", validated_encode),
+        ]
+        for name, encode in rows:
+            size = len(encode(result))
+            print(f"   {name:<44}{timed(encode, result, max(repeat // count, 20)):10.1f} µs {size:>9} bytes")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--offers", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.offers, args.repeat)
@@ -0,0 +1,74 @@
+# Benchmark de serialização: tamanho e tempo de encode/decode de respostas com muitas ofertas
+# Uso (dentro de card11/): python -m benchmarks.bench_serialization --offers 100 500 --repeat 200
+import argparse
+import json
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+
+from common import serialization
+
+
+def make_offers(count):
+    # Mesmo formato dos voos devolvidos pelo flight_agent
+    return {
+        "flights": [
+            {
+                "tipo": "IDA" if i % 2 == 0 else "VOLTA",
+                "companhia": ("LATAM", "Air France", "Azul")[i % 3],
+                "partida": "08:00",
+                "chegada": "22:30",
+                "duracao": "14h30m",
+                "preco": f"R$ {1650 + i:.0f}",
+                "rota": "São Paulo → Paris",
+                "link_compra": f"https://www.latam.com/pt_br/apps/personas?fecha1_dia=15&fecha1_anomes=012025&from_city1=S%C3%A3o%20Paulo&to_city1=Paris&offer={i}",
+                "codigo_voo": f"LA{8000 + i}",
+                "classe": "Econômica",
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def codecs():
+    # (nome, encode, decode)
+    yield (
+        "FastAPI padrão (jsonable_encoder + json)",
+        lambda obj: json.dumps(jsonable_encoder(obj), ensure_ascii=False).encode("utf-8"),
+        json.loads,
+    )
+    yield ("json (stdlib)", lambda obj: json.dumps(obj, ensure_ascii=False).encode("utf-8"), json.loads)
+    if serialization.orjson is not None:
+        yield (
+            "orjson",
+            lambda obj: serialization.dumps(obj, serialization.JSON),
+            lambda data: serialization.loads(data, serialization.JSON),
+        )
+    if serialization.msgpack is not None:
+        yield (
+            "MessagePack",
+            lambda obj: serialization.dumps(obj, serialization.MSGPACK),
+            lambda data: serialization.loads(data, serialization.MSGPACK),
+        )
+
+
+def main(offer_counts, repeat):
+    for count in offer_counts:
+        payload = make_offers(count)
+        print("=" * 72)
+        print(f"📦 {count} ofertas")
+        print(f"{'formato':<42}{'bytes':>10}{'encode µs':>10}{'decode µs':>10}")
+        for name, encode, decode in codecs():
+            data = encode(payload)
+            enc = timeit.timeit(lambda: encode(payload), number=repeat) / repeat * 1e6
+            dec = timeit.timeit(lambda: decode(data), number=repeat) / repeat * 1e6
+            print(f"{name:<42}{len(data):>10}{enc:>10.1f}{dec:>10.1f}")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--offers", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.offers, args.repeat)
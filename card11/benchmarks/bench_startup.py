@@ -0,0 +1,84 @@
+# Benchmark de cold start: import do agente + primeira requisição, cada rodada num processo novo
+# Uso (dentro de card11/): python -m benchmarks.bench_startup --runs 5 --output resultados/startup.json
+#
+# O host roda com HOST_TRANSPORT=inprocess, então a primeira requisição também paga o import
+# dos sub-agentes, sem depender de nada no ar.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+AGENTS = ("host_agent", "flight_agent", "stay_agent", "activities_agent")
+CARD11_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em cada processo filho; imprime uma linha JSON com os tempos
+PROBE = """
+import asyncio, importlib, json, sys, time
+started = time.perf_counter()
+app = importlib.import_module(f"agents.{sys.argv[1]}.__main__").app
+imported = time.perf_counter()
+
+import httpx
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent") as client:
+        response = await client.post("/run", json={
+            "origin": "São Paulo", "destination": "Paris",
+            "start_date": "2025-01-15", "end_date": "2025-01-22", "budget": 1000,
+        })
+        response.raise_for_status()
+
+asyncio.run(first_request())
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (done - imported) * 1000,
+    "llm_stack_loaded": "google.adk" in sys.modules,
+}))
+"""
+
+
+def probe(agent_name):
+    env = dict(os.environ, HOST_TRANSPORT="inprocess", LOG_SAMPLE_INFO="0")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, agent_name],
+        cwd=CARD11_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs, output):
+    report = {}
+    print("=" * 72)
+    for agent_name in AGENTS:
+        samples = [probe(agent_name) for _ in range(runs)]
+        imports = [s["import_ms"] for s in samples]
+        firsts = [s["first_request_ms"] for s in samples]
+        report[agent_name] = {
+            "import_ms": round(statistics.median(imports), 1),
+            "first_request_ms": round(statistics.median(firsts), 1),
+            "total_ms": round(statistics.median(i + f for i, f in zip(imports, firsts)), 1),
+            "llm_stack_loaded": any(s["llm_stack_loaded"] for s in samples),
+        }
+        r = report[agent_name]
+        print(
+            f"🚀 {agent_name:<17} import {r['import_ms']:7.1f} ms  1ª requisição {r['first_request_ms']:7.1f} ms  "
+            f"total {r['total_ms']:7.1f} ms  google.adk carregado: {'sim' if r['llm_stack_loaded'] else 'não'}"
+        )
+    print(f"   mediana de {runs} processo(s) novo(s) por agente")
+    print("=" * 72)
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"runs": runs, "agents": report}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="arquivo JSON com os tempos")
+    args = parser.parse_args()
+    main(args.runs, args.output)
@@ -0,0 +1,80 @@
+# Benchmark lado a lado: transporte HTTP (loopback) vs. em processo para o fan-out do host
+# Uso (dentro de card11/): python -m benchmarks.bench_transport --requests 300 --concurrency 20
+import argparse
+import asyncio
+import statistics
+import time
+from contextlib import ExitStack
+
+from benchmarks._server import BackgroundServer
+from common.a2a_client import close_client, open_client
+from common.a2a_server import create_app
+from common.transport import IN_PROCESS_AGENTS, HttpTransport, InProcessTransport
+
+PAYLOAD = {
+    "origin": "São Paulo",
+    "destination": "Paris",
+    "start_date": "2025-01-15",
+    "end_date": "2025-01-22",
+    "budget": 1000,
+}
+
+
+async def fan_out(transport, urls):
+    return await asyncio.gather(*(transport.call(name, url, PAYLOAD) for name, url in urls.items()))
+
+
+async def drive(transport, urls, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await fan_out(transport, urls)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    await fan_out(transport, urls)  # aquecimento
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "plans_per_s": total / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+async def main(total, concurrency):
+    in_process = InProcessTransport()
+    in_process.preload()
+
+    with ExitStack() as stack:
+        urls = {}
+        for name in IN_PROCESS_AGENTS:
+            app = create_app(agent=type("Agent", (), {"execute": in_process.resolve(name)}))
+            server = stack.enter_context(BackgroundServer(app))
+            urls[name] = f"{server.url}/run"
+
+        await open_client()
+        try:
+            http = await drive(HttpTransport(), urls, total, concurrency)
+        finally:
+            await close_client()
+        local = await drive(in_process, urls, total, concurrency)
+
+    print("=" * 60)
+    print(f"📊 {total} fan-outs (3 agentes cada), concorrência {concurrency}")
+    print(f"{'transporte':<14}{'planos/s':>12}{'p50 ms':>12}{'p95 ms':>12}")
+    for name, result in (("http", http), ("inprocess", local)):
+        print(f"{name:<14}{result['plans_per_s']:>12.1f}{result['p50_ms']:>12.2f}{result['p95_ms']:>12.2f}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,105 @@
+# Benchmark de vazão do supervisor: o mesmo agente com 1..N workers
+# Uso (dentro de card11/): python -m benchmarks.bench_workers --max-workers 4 --requests 400 --concurrency 32
+#
+# O agente de teste roda o otimizador do host a cada requisição (trabalho de CPU),
+# que é o caso em que um único worker limita a vazão a um núcleo.
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from agents.host_agent.optimizer import optimize
+from benchmarks._server import free_port
+from benchmarks.bench_optimizer import synthetic_offers
+from common.a2a_server import create_app
+from common.supervisor import Supervisor, Service
+
+CANDIDATES = int(os.getenv("BENCH_WORKERS_CANDIDATES", "120"))
+FLIGHTS, STAYS, ACTIVITIES = synthetic_offers(CANDIDATES)
+
+
+async def run(payload):
+    bundles = optimize(FLIGHTS, STAYS, ACTIVITIES, payload.get("budget") or 25000)
+    return {"bundles": len(bundles)}
+
+
+app = create_app(agent=type("Agent", (), {"execute": run}))
+
+
+async def wait_ready(url, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url + "/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} não respondeu em {timeout:.0f}s")
+
+
+async def drive(url, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(url + "/run", json={"budget": 25000})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        await asyncio.gather(*(one() for _ in range(concurrency)))  # aquecimento
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "req_per_s": total / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def measure(workers, total, concurrency):
+    port = free_port()
+    supervisor = Supervisor([Service("bench", app, port, workers)], log_level="warning")
+    supervisor.start()
+    try:
+        url = f"http://127.0.0.1:{port}"
+        asyncio.run(wait_ready(url))
+        return asyncio.run(drive(url, total, concurrency))
+    finally:
+        supervisor.stop()
+
+
+def main(max_workers, total, concurrency):
+    print("=" * 60)
+    print(f"⚙️  {total} requisições, concorrência {concurrency}, {os.cpu_count()} CPU(s)")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        result = measure(workers, total, concurrency)
+        baseline = baseline or result["req_per_s"]
+        print(
+            f"   {workers} worker(s): {result['req_per_s']:7.1f} req/s  "
+            f"p50 {result['p50_ms']:6.1f} ms  p95 {result['p95_ms']:6.1f} ms  "
+            f"({result['req_per_s'] / baseline:.2f}x)"
+        )
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    main(args.max_workers, args.requests, args.concurrency)
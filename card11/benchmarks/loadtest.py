@@ -0,0 +1,244 @@
+# Gerador de carga assíncrono para o host e os sub-agentes, com relatório em JSON
+# Uso (dentro de card11/):
+#   python -m benchmarks.loadtest --offline --duration 30 --concurrency 50 --output resultados/hoje.json
+#   python -m benchmarks.loadtest --mix host_agent=8,flight_agent=1,stay_agent=1 --compare resultados/ontem.json
+#
+# --offline sobe host e sub-agentes (ofertas mock/catálogo local) neste processo, em portas livres,
+# sem depender de nada externo; sem ele, usa as URLs dos cartões agent.json (ou <AGENTE>_URLS).
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from contextlib import ExitStack
+from datetime import date, timedelta
+
+import httpx
+import numpy as np
+
+from benchmarks._server import BackgroundServer, free_port
+
+AGENTS = ("host_agent", "flight_agent", "stay_agent", "activities_agent")
+ROUTES = (
+    ("São Paulo", "Paris"),
+    ("Sao Paulo", "paris"),
+    ("Rio de Janeiro", "Lisboa"),
+    ("São Paulo", "Nova York"),
+)
+
+
+def parse_mix(value):
+    # "host_agent=8,flight_agent=1" -> {"host_agent": 8.0, "flight_agent": 1.0}
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name not in AGENTS:
+            raise SystemExit(f"Agente desconhecido no --mix: {name} (opções: {', '.join(AGENTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def make_payload(rng):
+    origin, destination = rng.choice(ROUTES)
+    start = date(2025, 1, 1) + timedelta(days=rng.randrange(0, 180))
+    return {
+        "origin": origin,
+        "destination": destination,
+        "start_date": start.isoformat(),
+        "end_date": (start + timedelta(days=rng.randrange(3, 15))).isoformat(),
+        "budget": rng.choice((800, 1000, 1500, 2500, 4000)),
+    }
+
+
+def start_offline_mesh(stack):
+    """Sobe os quatro agentes em threads, com o host apontando para os sub-agentes locais."""
+    ports = {name: free_port() for name in AGENTS}
+    for name in AGENTS[1:]:
+        os.environ[f"{name.upper()}_URLS"] = f"http://127.0.0.1:{ports[name]}/run"
+    os.environ.setdefault("HOST_TRANSPORT", "http")
+    os.environ.setdefault("LOG_SAMPLE_INFO", "0")
+
+    import importlib
+
+    urls = {}
+    for name in AGENTS:
+        app = importlib.import_module(f"agents.{name}.__main__").app
+        server = stack.enter_context(BackgroundServer(app, ports[name]))
+        urls[name] = server.url + "/run"
+    return urls
+
+
+def card_urls():
+    from common.registry import AgentRegistry
+
+    registry = AgentRegistry.from_env()
+    return {name: registry.replicas(name)[0].url for name in AGENTS if registry.replicas(name)}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.partial = 0
+
+    def add(self, target, seconds, ok):
+        self.latencies.setdefault(target, []).append(seconds)
+        if not ok:
+            self.errors[target] = self.errors.get(target, 0) + 1
+
+
+def _is_error(target, response):
+    if response.status_code != 200:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return True
+    return not isinstance(body, dict) or "error" in body
+
+
+async def drive(urls, mix, concurrency, duration, total, seed, timeout):
+    rng = random.Random(seed)
+    targets = [name for name in mix if name in urls]
+    if not targets:
+        raise SystemExit("Nenhum agente do --mix tem URL conhecida")
+    weights = [mix[name] for name in targets]
+    recorder = Recorder()
+    issued = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        loop = asyncio.get_running_loop()
+        ends_at = loop.time() + duration if duration else None
+
+        async def user():
+            nonlocal issued
+            while (ends_at is None or loop.time() < ends_at) and (total is None or issued < total):
+                issued += 1
+                target = rng.choices(targets, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await client.post(urls[target], json=make_payload(rng))
+                    ok = not _is_error(target, response)
+                    if ok and target == "host_agent" and response.json().get("partial"):
+                        recorder.partial += 1
+                except httpx.HTTPError:
+                    ok = False
+                recorder.add(target, time.perf_counter() - started, ok)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return recorder, elapsed
+
+
+def summarize(latencies, errors, elapsed):
+    values = np.array(latencies) * 1000
+    return {
+        "requests": int(values.size),
+        "errors": errors,
+        "error_rate": round(errors / values.size, 4) if values.size else 0.0,
+        "throughput_rps": round(values.size / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(float(values.mean()), 2),
+            "p50": round(float(np.percentile(values, 50)), 2),
+            "p95": round(float(np.percentile(values, 95)), 2),
+            "p99": round(float(np.percentile(values, 99)), 2),
+            "max": round(float(values.max()), 2),
+        } if values.size else {},
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(recorder, elapsed, config):
+    every = [value for values in recorder.latencies.values() for value in values]
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "config": config,
+        "elapsed_s": round(elapsed, 3),
+        "overall": summarize(every, sum(recorder.errors.values()), elapsed),
+        "targets": {
+            target: summarize(values, recorder.errors.get(target, 0), elapsed)
+            for target, values in sorted(recorder.latencies.items())
+        },
+    }
+    if "host_agent" in recorder.latencies:
+        report["targets"]["host_agent"]["partial_plans"] = recorder.partial
+    return report
+
+
+def print_report(report, previous=None):
+    print("=" * 72)
+    print(f"📈 {report['elapsed_s']:.1f}s, concorrência {report['config']['concurrency']}, revisão {report['revision']}")
+    rows = [("overall", report["overall"])] + list(report["targets"].items())
+    for name, stats in rows:
+        latency = stats["latency_ms"]
+        if not latency:
+            continue
+        line = (
+            f"   {name:<17} {stats['throughput_rps']:8.1f} req/s  p50 {latency['p50']:7.1f}  "
+            f"p95 {latency['p95']:7.1f}  p99 {latency['p99']:7.1f} ms  erros {stats['error_rate']:.2%}"
+        )
+        old = (previous or {}).get("targets", {}).get(name) if name != "overall" else (previous or {}).get("overall")
+        if old and old.get("latency_ms"):
+            line += (
+                f"  (Δ {stats['throughput_rps'] - old['throughput_rps']:+.1f} req/s, "
+                f"p99 {latency['p99'] - old['latency_ms']['p99']:+.1f} ms)"
+            )
+        print(line)
+    print("=" * 72)
+
+
+def main(args):
+    mix = parse_mix(args.mix)
+    config = {
+        "mix": mix,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "requests": args.requests,
+        "offline": args.offline,
+        "seed": args.seed,
+    }
+    with ExitStack() as stack:
+        urls = start_offline_mesh(stack) if args.offline else card_urls()
+        config["urls"] = urls
+        recorder, elapsed = asyncio.run(
+            drive(urls, mix, args.concurrency, args.duration, args.requests, args.seed, args.timeout)
+        )
+
+    report = build_report(recorder, elapsed, config)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(report, previous)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Relatório salvo em {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mix", default="host_agent=1")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=15.0, help="segundos (0 = usar --requests)")
+    parser.add_argument("--requests", type=int, default=None, help="total de requisições")
+    parser.add_argument("--offline", action="store_true", help="sobe os agentes mock neste processo")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="arquivo JSON do relatório")
+    parser.add_argument("--compare", help="relatório anterior para comparar")
+    main(parser.parse_args())
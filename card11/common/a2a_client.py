@@ -1,7 +1,231 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlsplit
+
 import httpx
-async def call_agent(url, payload):
+
+from common import log, metrics, serialization
+from common.resilience import OverloadedError, ResilientCaller
+
+try:
+    import h2  # noqa: F401  (habilita HTTP/2 no httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class A2AClient:
+    """Cliente HTTP compartilhado para chamadas entre agentes.
+
+    Mantém um pool de conexões keep-alive, limita conexões simultâneas por
+    destino (host:porta) e separa timeout de conexão e de leitura.
+    """
+
+    def __init__(
+        self,
+        max_connections=100,
+        max_keepalive_connections=20,
+        max_connections_per_host=20,
+        keepalive_expiry=30.0,
+        connect_timeout=5.0,
+        read_timeout=60.0,
+        http2=False,
+        wire_format=serialization.JSON,
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2 and HTTP2_AVAILABLE
+        # MessagePack só é usado se a biblioteca estiver instalada
+        wire_format = serialization.normalize(wire_format)
+        self.wire_format = wire_format if wire_format in serialization.supported_types() else serialization.JSON
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._client = None
+        self._host_slots = {}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_connections=int(os.getenv("A2A_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("A2A_MAX_KEEPALIVE", "20")),
+            max_connections_per_host=int(os.getenv("A2A_MAX_PER_HOST", "20")),
+            keepalive_expiry=float(os.getenv("A2A_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.getenv("A2A_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("A2A_READ_TIMEOUT", "60")),
+            http2=os.getenv("A2A_HTTP2", "false").lower() == "true",
+            wire_format=os.getenv("A2A_WIRE_FORMAT", serialization.JSON),
+        )
+
+    @property
+    def is_open(self):
+        return self._client is not None and not self._client.is_closed
+
+    async def open(self):
+        if not self.is_open:
+            self._client = httpx.AsyncClient(
+                limits=self._limits,
+                timeout=self._timeout,
+                http2=self.http2,
+            )
+        return self
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._host_slots.clear()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _slot(self, url):
+        # Um semáforo por destino evita que um único agente consuma o pool inteiro
+        target = urlsplit(url).netloc
+        slot = self._host_slots.get(target)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_slots[target] = slot
+        return slot
+
+    async def post(self, url, payload, timeout=None):
+        if not self.is_open:
+            await self.open()
+        headers = {
+            "Content-Type": self.wire_format,
+            # JSON continua aceito caso o agente de destino não fale MessagePack
+            "Accept": f"{self.wire_format}, {serialization.JSON};q=0.5",
+        }
+        rid = log.request_id.get()
+        if rid:
+            # Mesmo request ID nos logs do host e dos sub-agentes
+            headers[log.REQUEST_ID_HEADER] = rid
+        async with self._slot(url):
+            response = await self._client.post(
+                url,
+                content=serialization.dumps(payload, self.wire_format),
+                headers=headers,
+                timeout=timeout if timeout is not None else self._timeout,
+            )
+        _raise_for_status(response)
+        return _finish(response)
+
+
+def _raise_for_status(response):
+    # 503 vindo da admissão do servidor (common/admission.py): respeita o Retry-After
+    if response.status_code == 503:
+        try:
+            retry_after = float(response.headers.get("retry-after", "1"))
+        except ValueError:
+            retry_after = 1.0
+        raise OverloadedError(response.url.netloc.decode("ascii"), retry_after)
+    response.raise_for_status()
+
+
+def decode_response(response):
+    return serialization.loads(response.content, response.headers.get("content-type"))
+
+
+def _finish(response):
+    # Etapas do sub-agente (Server-Timing) entram no breakdown da requisição atual
+    metrics.merge_remote(response.url.netloc.decode("ascii"), response.headers.get("server-timing"))
+    with metrics.stage("a2a_decode"):
+        return decode_response(response)
+
+
+_shared_client = None
+# Breakers, latência por destino e hedging valem para todas as chamadas do processo
+resilience = ResilientCaller.from_env()
+
+
+def get_client():
+    return _shared_client
+
+
+async def open_client(client=None):
+    # Chamado no lifespan do FastAPI (ver common/a2a_server.create_app)
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = client or A2AClient.from_env()
+    await _shared_client.open()
+    return _shared_client
+
+
+async def close_client():
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.close()
+        _shared_client = None
+
+
+async def _send(url, payload, timeout=None):
+    client = get_client()
+    if client is not None:
+        return await client.post(url, payload, timeout=timeout)
+
+    # Sem cliente compartilhado (ex.: scripts avulsos): conexão descartável
+    rid = log.request_id.get()
+    headers = {log.REQUEST_ID_HEADER: rid} if rid else None
     async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, timeout=60.0)
-        response.raise_for_status()
-        return response.json()
-# Requisição assíncrona que permite que qualquer agente invoque outro agente
\ No newline at end of file
+        response = await client.post(url, json=payload, headers=headers, timeout=timeout or 60.0)
+        _raise_for_status(response)
+        return _finish(response)
+
+
+async def _post(url, payload, timeout=None):
+    # Latência e chamadas em andamento por destino (host:porta)
+    target = urlsplit(url).netloc
+    outcome = "error"
+    started = time.perf_counter()
+    try:
+        with metrics.DOWNSTREAM_IN_FLIGHT.track(target=target):
+            result = await _send(url, payload, timeout=timeout)
+        outcome = "ok"
+        return result
+    except OverloadedError:
+        outcome = "overloaded"
+        raise
+    except asyncio.CancelledError:
+        # Ex.: perdedor de um hedge ou prazo do host
+        outcome = "cancelled"
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.DOWNSTREAM_LATENCY.observe(elapsed, target=target, outcome=outcome)
+        metrics.record_stage(f"a2a.{target}", elapsed, observe=False)
+
+
+async def call_agent(url, payload, timeout=None, replicas=()):
+    # Requisição assíncrona que permite que qualquer agente invoque outro agente.
+    # Falha rápido (CircuitOpenError) se o destino estiver com o circuito aberto,
+    # ou (OverloadedError) se todos os destinos pediram para esperar (503 + Retry-After);
+    # `replicas` habilita failover e hedging para outras instâncias do mesmo agente
+    return await resilience.call(
+        url,
+        lambda target: _post(target, payload, timeout=timeout),
+        replicas=replicas,
+        timeout=timeout,
+    )
+
+
+async def call_agent_batch(url, payloads, chunk_size=None, timeout=None):
+    # url aponta para o /run/batch do agente; devolve um item por payload, na ordem de entrada
+    payloads = list(payloads)
+    if not chunk_size or len(payloads) <= chunk_size:
+        response = await call_agent(url, payloads, timeout=timeout)
+        return response["results"]
+
+    chunks = [payloads[i:i + chunk_size] for i in range(0, len(payloads), chunk_size)]
+    responses = await asyncio.gather(*(call_agent(url, chunk, timeout=timeout) for chunk in chunks))
+    results = []
+    for offset, response in zip(range(0, len(payloads), chunk_size), responses):
+        for item in response["results"]:
+            item["index"] += offset
+            results.append(item)
+    return results
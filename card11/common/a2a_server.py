@@ -1,35 +1,295 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Any, Dict
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.routing import Match
+from typing import Any, Dict, List
+import asyncio
+import os
+import time
 import uvicorn
 
-class PayloadModel(BaseModel):
-    origin: str = None
-    destination: str = None
-    start_date: str = None
-    end_date: str = None
-    budget: float = None
-    
-    class Config:
-        extra = "allow"  # Permite campos adicionais
-
-def create_app(agent):
-    app = FastAPI(title="Travel Agent API")
-    
+from common import log, metrics, serialization
+from common.a2a_client import open_client, close_client
+from common.admission import AdmissionController, AdmissionMiddleware, Overloaded
+from common.jobs import JobQueueFull
+from shared.schemas import TravelRequest
+
+logger = log.get_logger(__name__)
+
+# Limites do endpoint /run/batch
+MAX_BATCH_SIZE = int(os.getenv("A2A_MAX_BATCH_SIZE", "1000"))
+BATCH_CONCURRENCY = int(os.getenv("A2A_BATCH_CONCURRENCY", "16"))
+
+# Revalidar a resposta do próprio agente no response_model custa bem mais que serializar com orjson:
+# fica só para depuração (os agentes já devolvem preços numéricos via common/fx)
+VALIDATE_RESPONSES = os.getenv("A2A_VALIDATE_RESPONSES", "false").lower() == "true"
+
+# Modelo de entrada padrão (campos extras continuam aceitos); o nome antigo fica como alias
+PayloadModel = TravelRequest
+
+async def read_body(request: Request):
+    # Decodifica JSON ou MessagePack conforme o Content-Type da requisição
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        return serialization.loads(body, request.headers.get("content-type"))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Corpo inválido: {e}")
+
+def parse_payload(data, model=TravelRequest):
+    if not isinstance(data, dict):
+        raise RequestValidationError([{"type": "dict_type", "loc": ("body",), "msg": "Esperado um objeto", "input": data}])
+    try:
+        # Valida os tipos e devolve um dict para os agentes (datas normalizadas como "AAAA-MM-DD")
+        return model.model_validate(data).model_dump(mode="json", exclude_unset=True)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+def typed_result(model, result, validate=None):
+    """Resposta do agente validada no modelo (só com A2A_VALIDATE_RESPONSES), ou o próprio dict.
+
+    Fora do modo de depuração, ou sem modelo, ou se não bater (ex.: erro), devolve o dict como veio.
+    """
+    validate = VALIDATE_RESPONSES if validate is None else validate
+    if not validate or model is None or not isinstance(result, dict) or "error" in result:
+        return result
+    try:
+        return model.model_validate(result)
+    except ValidationError as e:
+        logger.warning("Resposta fora do modelo %s (%d erros); enviando sem tipo", model.__name__, e.error_count())
+        return result
+
+def encode_response(request: Request, content, status_code=200):
+    # Formato de resposta negociado pelo header Accept (orjson/MessagePack)
+    content_type = serialization.negotiate(request.headers.get("accept"))
+    if isinstance(content, BaseModel) and content_type == serialization.JSON:
+        # Modelos tipados: JSON direto do serializador compilado do pydantic-core
+        body = type(content).__pydantic_serializer__.to_json(content, exclude_unset=True)
+    else:
+        body = serialization.dumps(content, content_type)
+    return Response(body, status_code=status_code, media_type=content_type)
+
+class RequestIdMiddleware:
+    """Lê (ou gera) o X-Request-ID, deixa no contexto da requisição e devolve no header da resposta."""
+
+    def __init__(self, app):
+        self.app = app
+        self.header = log.REQUEST_ID_HEADER.lower().encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        incoming = dict(scope["headers"]).get(self.header)
+        rid = incoming.decode("latin-1") if incoming else log.new_request_id()
+        token = log.request_id.set(rid)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append((self.header, rid.encode("latin-1")))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            log.request_id.reset(token)
+
+class MetricsMiddleware:
+    """Latência, contagem e requisições em andamento por rota, e o header Server-Timing.
+
+    O Server-Timing traz o tempo de cada etapa (parse, execute, encode e as
+    chamadas a sub-agentes, com as etapas deles como `<host:porta>.<etapa>`).
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._routes = {}
+
+    def _route(self, scope):
+        # Rótulo pelo template da rota; caminhos desconhecidos viram "other" (cardinalidade fixa)
+        path = scope["path"]
+        route = self._routes.get(path)
+        if route is None:
+            route = "other"
+            for candidate in scope["app"].router.routes:
+                match, _ = candidate.matches(scope)
+                if match == Match.FULL:
+                    route = candidate.path
+                    break
+            if len(self._routes) < 1000:
+                self._routes[path] = route
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route = self._route(scope)
+        stages, token = metrics.begin_stages()
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                timing = metrics.server_timing(stages, time.perf_counter() - started)
+                message.setdefault("headers", []).append((b"server-timing", timing.encode("latin-1")))
+            await send(message)
+
+        try:
+            with metrics.IN_FLIGHT.track(route=route):
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - started, route=route)
+            metrics.REQUESTS.inc(route=route, status=status["code"])
+            metrics.end_stages(token)
+
+def create_app(agent, request_model=TravelRequest, response_model=None, admission=None, jobs=None):
+    """App FastAPI do agente; `response_model` (ex.: shared.schemas.FlightResponse) tipa as respostas do /run.
+
+    `admission` limita as execuções simultâneas (padrão: AdmissionController.from_env()).
+    `jobs` (opcional, ex.: JobManager.from_env(run, stream) no host) habilita `POST /jobs` e
+    `GET /jobs/{id}`; os jobs ocupam vagas do mesmo `admission` do /run.
+    """
+    log.setup_logging()
+    admission = admission or AdmissionController.from_env()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # Cliente A2A compartilhado (pool keep-alive) vive junto com a aplicação
+        await open_client()
+        if hasattr(agent, "startup"):
+            # Tarefas de fundo do agente (ex.: health check das réplicas no host)
+            await agent.startup()
+        if jobs is not None:
+            await jobs.start(admission)
+        yield
+        if jobs is not None:
+            await jobs.stop()
+        if hasattr(agent, "shutdown"):
+            await agent.shutdown()
+        await close_client()
+
+    app = FastAPI(title="Travel Agent API", lifespan=lifespan)
+    # Mais interno: recusas (503) também entram nas métricas e levam o request ID
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+    app.add_middleware(MetricsMiddleware)
+    # Adicionado por último = mais externo: o request ID já existe quando as métricas começam
+    app.add_middleware(RequestIdMiddleware)
+
     @app.get("/")
     async def health_check():
-        return {"status": "online", "agent": "travel_agent"}
-    
+        health = {"status": "online", "agent": "travel_agent", "admission": admission.snapshot()}
+        if jobs is not None:
+            health["jobs"] = jobs.snapshot()
+        if hasattr(agent, "stats"):
+            # Contadores do agente (ex.: acertos/falhas/remoções do cache de planos do host)
+            health["stats"] = agent.stats()
+        return health
+
+    @app.get("/metrics")
+    async def metrics_endpoint():
+        # Formato texto do Prometheus; cada worker expõe os próprios números
+        return PlainTextResponse(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
     @app.post("/run")
-    async def run(payload: PayloadModel):
+    async def run(request: Request):
+        with metrics.stage("parse"):
+            payload_dict = parse_payload(await read_body(request), request_model)
         try:
-            # Converte para dict para compatibilidade
-            payload_dict = payload.dict(exclude_unset=True)
-            result = await agent.execute(payload_dict)
-            return result
+            with metrics.stage("execute"):
+                result = await agent.execute(payload_dict)
         except Exception as e:
-            return {"error": str(e), "type": type(e).__name__}
-    
+            logger.exception("Falha no /run")
+            result = {"error": str(e), "type": type(e).__name__}
+        with metrics.stage("validate"):
+            result = typed_result(response_model, result)
+        with metrics.stage("encode"):
+            return encode_response(request, result)
+
+    # Compartilhado entre todos os lotes para limitar a carga total do agente
+    batch_slots = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    @app.post("/run/batch")
+    async def run_batch(request: Request):
+        with metrics.stage("parse"):
+            payloads = await read_body(request)
+        if not isinstance(payloads, list):
+            raise RequestValidationError([{"type": "list_type", "loc": ("body",), "msg": "Esperada uma lista de payloads", "input": payloads}])
+        if len(payloads) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=413, detail=f"Lote acima do limite de {MAX_BATCH_SIZE} itens")
+
+        async def run_item(index, payload):
+            async with batch_slots:
+                # Cada item ocupa uma vaga da admissão, como um /run: o lote não fura o limite de concorrência
+                admitted_at = None
+                try:
+                    if admission.enabled:
+                        admitted_at = await admission.acquire()
+                    result = await agent.execute(parse_payload(payload, request_model))
+                    return {"index": index, "ok": True, "result": typed_result(response_model, result)}
+                except Overloaded as e:
+                    return {"index": index, "ok": False, "error": str(e), "type": "Overloaded", "retry_after": e.retry_after}
+                except Exception as e:
+                    logger.warning("Falha no item %d do lote: %s", index, e)
+                    return {"index": index, "ok": False, "error": str(e), "type": type(e).__name__}
+                finally:
+                    if admitted_at is not None:
+                        admission.release(admitted_at)
+
+        # gather preserva a ordem de entrada
+        with metrics.stage("execute"):
+            results = await asyncio.gather(*(run_item(i, p) for i, p in enumerate(payloads)))
+        with metrics.stage("encode"):
+            return encode_response(request, {"results": results})
+
+    @app.post("/run/stream")
+    async def run_stream(request: Request):
+        # NDJSON: um evento JSON por linha, enviado assim que fica pronto.
+        # O Server-Timing sai antes do corpo, então só traz o parse
+        with metrics.stage("parse"):
+            payload_dict = parse_payload(await read_body(request), request_model)
+
+        async def events():
+            try:
+                if hasattr(agent, "stream"):
+                    async for event in agent.stream(payload_dict):
+                        yield serialization.dumps_line(event)
+                else:
+                    # Agentes sem streaming respondem com um único evento
+                    result = await agent.execute(payload_dict)
+                    yield serialization.dumps_line({"event": "result", "data": result})
+            except Exception as e:
+                logger.exception("Falha no /run/stream")
+                yield serialization.dumps_line({"event": "error", "error": str(e), "type": type(e).__name__})
+
+        return StreamingResponse(events(), media_type=serialization.NDJSON)
+
+    if jobs is not None and jobs.enabled:
+        @app.post("/jobs")
+        async def submit_job(request: Request):
+            # Devolve o ID na hora; o plano roda num worker e é consultado em GET /jobs/{id}
+            with metrics.stage("parse"):
+                payload_dict = parse_payload(await read_body(request), request_model)
+            try:
+                job = jobs.submit(payload_dict)
+            except JobQueueFull as e:
+                response = encode_response(request, {"error": str(e), "type": "JobQueueFull", "retry_after": e.retry_after}, 503)
+                response.headers["Retry-After"] = str(e.retry_after)
+                return response
+            response = encode_response(request, job, 202)
+            response.headers["Location"] = f"/jobs/{job['id']}"
+            return response
+
+        @app.get("/jobs/{job_id}")
+        async def get_job(request: Request, job_id: str):
+            # Status e seções já prontas; jobs terminados somem depois de A2A_JOB_TTL
+            job = jobs.get(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail="Job não encontrado ou expirado")
+            return encode_response(request, job)
+
     return app
 
-# a função create_app(agent) generaliza a rota para todos os agentes
\ No newline at end of file
+# a função create_app(agent) generaliza a rota para todos os agentes
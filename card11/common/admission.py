@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import math
+import os
+import time
+
+from common import log, metrics, serialization
+
+logger = log.get_logger(__name__)
+
+
+class Overloaded(Exception):
+    """Requisição recusada na admissão (fila cheia ou espera acima do limite)."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Servidor sobrecarregado ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Limita as execuções simultâneas do agente e segura o excesso numa fila curta.
+
+    Até `max_concurrency` requisições executam ao mesmo tempo; outras
+    `max_queue` esperam no máximo `max_wait` segundos por uma vaga. O resto
+    recebe 503 na hora, com um Retry-After estimado pela fila e pelo tempo
+    médio de execução, em vez de acumular até todo mundo estourar o timeout.
+    """
+
+    def __init__(self, max_concurrency=64, max_queue=128, max_wait=5.0, retry_after=1.0, max_retry_after=30.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        self._slots = None
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        # Média móvel do tempo de execução (s), usada no Retry-After
+        self._service_time = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_concurrency=int(os.getenv("A2A_MAX_CONCURRENCY", "64")),
+            max_queue=int(os.getenv("A2A_MAX_QUEUE", "128")),
+            max_wait=float(os.getenv("A2A_QUEUE_TIMEOUT", "5")),
+            retry_after=float(os.getenv("A2A_RETRY_AFTER", "1")),
+        )
+
+    @property
+    def enabled(self):
+        return self.max_concurrency > 0
+
+    def _semaphore(self):
+        # Criado no primeiro uso, dentro do event loop do worker
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    def retry_after_seconds(self):
+        # Tempo para a fila atual andar, com piso no valor configurado
+        estimate = self.retry_after
+        if self._service_time is not None:
+            estimate = max(estimate, (self.waiting + 1) * self._service_time / self.max_concurrency)
+        return min(math.ceil(estimate), math.ceil(self.max_retry_after))
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        metrics.ADMISSION_REJECTED.inc(reason=reason)
+        raise Overloaded(reason, self.retry_after_seconds())
+
+    async def acquire(self):
+        slots = self._semaphore()
+        if not slots.locked():
+            # Vaga livre e ninguém na fila: entra direto
+            await slots.acquire()
+            return self._admit()
+        if self.waiting >= self.max_queue:
+            self._reject("queue_full")
+        started = time.perf_counter()
+        self.waiting += 1
+        metrics.ADMISSION_QUEUE.inc()
+        # Sem wait_for: se o prazo (ou um cancelamento) chegar junto com a vaga, a vaga é devolvida
+        acquire = asyncio.ensure_future(slots.acquire())
+        admitted = False
+        try:
+            await asyncio.wait((acquire,), timeout=self.max_wait)
+            admitted = acquire.done()
+        finally:
+            # cancel() falha quando o acquire já terminou: a vaga veio e precisa voltar
+            if not admitted and not acquire.cancel():
+                slots.release()
+            self.waiting -= 1
+            metrics.ADMISSION_QUEUE.dec()
+            metrics.ADMISSION_WAIT.observe(time.perf_counter() - started)
+        if not admitted:
+            self._reject("timeout")
+        return self._admit()
+
+    def _admit(self):
+        self.active += 1
+        self.admitted += 1
+        metrics.ADMISSION_ACTIVE.inc()
+        return time.perf_counter()
+
+    def release(self, admitted_at):
+        elapsed = time.perf_counter() - admitted_at
+        self._service_time = elapsed if self._service_time is None else 0.9 * self._service_time + 0.1 * elapsed
+        self.active -= 1
+        metrics.ADMISSION_ACTIVE.dec()
+        self._slots.release()
+
+    def snapshot(self):
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "max_wait_s": self.max_wait,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "service_time_ms": round(self._service_time * 1000, 1) if self._service_time is not None else None,
+        }
+
+
+class AdmissionMiddleware:
+    """Aplica o AdmissionController às rotas de execução (`/run`, `/run/stream`...).
+
+    A vaga fica presa até o fim da resposta, inclusive do corpo em streaming.
+    Health check e /metrics nunca passam pela fila. Rotas em `exclude` (o
+    `/run/batch`, que ocupa uma vaga por item) cuidam da própria admissão.
+    """
+
+    def __init__(self, app, controller, prefixes=("/run",), exclude=("/run/batch",)):
+        self.app = app
+        self.controller = controller
+        self.prefixes = tuple(prefixes)
+        self.exclude = tuple(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not self.controller.enabled
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(self.prefixes)
+            or scope["path"] in self.exclude
+        ):
+            return await self.app(scope, receive, send)
+        try:
+            admitted_at = await self.controller.acquire()
+        except Overloaded as e:
+            log.event(logger, logging.DEBUG, "Requisição recusada na admissão", reason=e.reason, retry_after=e.retry_after)
+            return await self._overloaded(scope, send, e)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(admitted_at)
+
+    async def _overloaded(self, scope, send, error):
+        accept = dict(scope["headers"]).get(b"accept", b"").decode("latin-1")
+        content_type = serialization.negotiate(accept)
+        body = serialization.dumps(
+            {"error": str(error), "type": "Overloaded", "reason": error.reason, "retry_after": error.retry_after},
+            content_type,
+        )
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(error.retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Cache LRU com expiração por TTL e coalescência de chamadas (single-flight).
+
+    Várias requisições concorrentes pela mesma chave aguardam uma única
+    execução de `compute`; erros não são guardados no cache.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # chave -> (expira_em, valor)
+        self._inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.peek(key) is not None
+
+    def peek(self, key):
+        # Consulta sem alterar contadores nem a ordem LRU
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[1]
+
+    def expires_in(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry[0] - self._clock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self._entries[key]
+            self.expirations += 1
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        self._entries[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_compute(self, key, compute, cacheable=None, refresh=False):
+        # refresh=True recalcula mesmo com valor válido (ex.: pré-aquecimento), ainda com single-flight
+        value = None if refresh else self.get(key)
+        if value is not None:
+            return value
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Quem calculava foi cancelado: tenta de novo
+                return await self.get_or_compute(key, compute, cacheable, refresh)
+
+        future = self.begin(key)
+        try:
+            value = await compute()
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, value, cacheable)
+        return value
+
+    def begin(self, key):
+        # Abre o cálculo da chave fora de get_or_compute (ex.: seção a seção no streaming): quem
+        # chamar get_or_compute enquanto isso aguarda este resultado. None se já há um em andamento
+        if key in self._inflight:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def settle(self, key, future, value=None, cacheable=None, error=None):
+        # Fecha o cálculo aberto por begin: guarda o valor (se cacheable) e acorda quem esperava.
+        # Cancelamento (ou o fechamento de um stream) cancela o future: quem esperava tenta de novo
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if future.done():
+            return
+        if isinstance(error, Exception):
+            future.set_exception(error)
+            # Evita o aviso "exception was never retrieved" quando ninguém aguardava
+            future.exception()
+        elif error is not None:
+            future.cancel()
+        else:
+            if cacheable is None or cacheable(value):
+                self.set(key, value)
+            future.set_result(value)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        }
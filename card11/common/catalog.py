@@ -0,0 +1,249 @@
+import csv
+import json
+import os
+import unicodedata
+
+import numpy as np
+
+# Ofertas sem data ficam disponíveis em qualquer dia; na ordenação vão para o fim
+ANY_DATE = np.iinfo(np.int64).max
+DEFAULT_NUMERIC_COLUMNS = ("price", "duration_min")
+# Moeda da coluna price dos CSVs
+CATALOG_CURRENCY = os.getenv("CATALOG_CURRENCY", "BRL").upper()
+
+
+def _fold(value):
+    text = unicodedata.normalize("NFKD", " ".join(str(value or "").lower().split()))
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def normalize_key(*values):
+    # "  São  Paulo", "são paulo" e "sao paulo" caem na mesma chave
+    return "|".join(_fold(value) for value in values)
+
+
+def to_day(value):
+    """Converte 'AAAA-MM-DD' (ou date) em dias desde 1970; None se inválido."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(np.datetime64(str(value)[:10], "D").astype(np.int64))
+    except ValueError:
+        return None
+
+
+class OfferCatalog:
+    """Catálogo colunar de ofertas em arrays NumPy.
+
+    As linhas são indexadas pela chave (ex.: origem|destino ou destino) e, dentro
+    de cada chave, ordenadas por data, de modo que uma busca só toca as linhas
+    da própria chave: faixa de datas por busca binária, filtro de preço e
+    ordenação vetorizados.
+    """
+
+    def __init__(self, columns, key_columns, date_column="date", numeric_columns=DEFAULT_NUMERIC_COLUMNS):
+        self.key_columns = tuple(key_columns)
+        self.date_column = date_column
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Todas as colunas do catálogo precisam ter o mesmo tamanho")
+        self.size = lengths.pop() if lengths else 0
+
+        self._columns = {}
+        for name, values in columns.items():
+            if name in numeric_columns:
+                self._columns[name] = np.array(
+                    [np.nan if value in (None, "") else float(value) for value in values],
+                    dtype=np.float64,
+                )
+            else:
+                array = np.empty(self.size, dtype=object)
+                array[:] = list(values)
+                self._columns[name] = array
+
+        self._days = self._parse_days(columns.get(date_column, [None] * self.size))
+        self._build_index()
+
+    def _parse_days(self, values):
+        try:
+            # Caminho vetorizado; vazio/None vira NaT ("qualquer data")
+            dates = np.array([str(v)[:10] if v else "NaT" for v in values], dtype="datetime64[D]")
+        except ValueError:
+            dates = np.array([np.datetime64("NaT") if day is None else day for day in map(to_day, values)], dtype="datetime64[D]")
+        days = dates.astype(np.int64)
+        days[np.isnat(dates)] = ANY_DATE
+        return days
+
+    def _build_index(self):
+        # Normaliza cada combinação distinta uma única vez
+        memo = {}
+        keys = []
+        empty = np.empty(self.size, dtype=object)
+        for row in zip(*(self._columns.get(c, empty) for c in self.key_columns)):
+            key = memo.get(row)
+            if key is None:
+                key = memo[row] = normalize_key(*row)
+            keys.append(key)
+        uniques, codes = np.unique(np.array(keys, dtype=str), return_inverse=True)
+        # Ordena por chave e, dentro da chave, por data
+        order = np.lexsort((self._days, codes))
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        self._index = {
+            key: order[bounds[i]:bounds[i + 1]]
+            for i, key in enumerate(uniques.tolist())
+        }
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    def keys(self):
+        return self._index.keys()
+
+    def has(self, key):
+        return (normalize_key(*key) if isinstance(key, tuple) else normalize_key(key)) in self._index
+
+    def column(self, name):
+        return self._columns[name]
+
+    def search(
+        self,
+        key,
+        date_from=None,
+        date_to=None,
+        min_price=None,
+        max_price=None,
+        sort_by="price",
+        descending=False,
+        limit=None,
+    ):
+        """Devolve as posições das ofertas da chave, filtradas e ordenadas."""
+        rows = self._index.get(normalize_key(*key) if isinstance(key, tuple) else normalize_key(key))
+        if rows is None:
+            return np.empty(0, dtype=np.intp)
+
+        day_from, day_to = to_day(date_from), to_day(date_to)
+        if day_from is not None or day_to is not None:
+            days = self._days[rows]
+            lo = np.searchsorted(days, day_from, "left") if day_from is not None else 0
+            hi = np.searchsorted(days, day_to, "right") if day_to is not None else np.searchsorted(days, ANY_DATE, "left")
+            any_day = np.searchsorted(days, ANY_DATE, "left")
+            rows = np.concatenate((rows[lo:min(hi, any_day)], rows[any_day:]))
+
+        if (min_price is not None or max_price is not None) and "price" in self._columns:
+            prices = self._columns["price"][rows]
+            mask = ~np.isnan(prices)
+            if min_price is not None:
+                mask &= prices >= min_price
+            if max_price is not None:
+                mask &= prices <= max_price
+            rows = rows[mask]
+
+        if sort_by and rows.size:
+            values = self._columns[sort_by][rows]
+            numeric = values.dtype.kind == "f"
+            if not numeric:
+                values = values.astype(str)
+            elif descending:
+                values = -values
+            if numeric and limit is not None and limit < rows.size:
+                # Só os k melhores precisam de ordenação completa
+                top = np.argpartition(values, limit - 1)[:limit]
+                rows = rows[top[np.argsort(values[top], kind="stable")]]
+            else:
+                order = np.argsort(values, kind="stable")
+                rows = rows[order[::-1] if descending and not numeric else order]
+        if limit is not None:
+            rows = rows[:limit]
+        return rows
+
+    def records(self, rows):
+        """Materializa as linhas em dicts (apenas para o resultado final)."""
+        records = []
+        for row in rows:
+            record = {}
+            for name, column in self._columns.items():
+                value = column[row]
+                if isinstance(value, np.floating):
+                    if np.isnan(value):
+                        continue
+                    value = float(value)
+                elif value is None or (isinstance(value, (str, list)) and not value):
+                    continue
+                record[name] = value
+            records.append(record)
+        return records
+
+    def find(self, key, **filters):
+        return self.records(self.search(key, **filters))
+
+    @classmethod
+    def from_records(cls, records, key_columns, list_columns=(), **kwargs):
+        names = []
+        for record in records:
+            for name in record:
+                if name not in names:
+                    names.append(name)
+        columns = {name: [record.get(name) for record in records] for name in names}
+        for name in list_columns:
+            if name in columns:
+                columns[name] = [
+                    value if isinstance(value, list) else [item for item in str(value or "").split("|") if item]
+                    for value in columns[name]
+                ]
+        return cls(columns, key_columns, **kwargs)
+
+    @classmethod
+    def from_csv(cls, path, key_columns, **kwargs):
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls.from_records(list(csv.DictReader(f)), key_columns, **kwargs)
+
+    @classmethod
+    def from_json(cls, path, key_columns, **kwargs):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("offers", [])
+        return cls.from_records(data, key_columns, **kwargs)
+
+    @classmethod
+    def from_parquet(cls, path, key_columns, **kwargs):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Leitura de Parquet requer o pacote pyarrow")
+        table = pq.read_table(path).to_pydict()
+        records = [dict(zip(table, values)) for values in zip(*table.values())]
+        return cls.from_records(records, key_columns, **kwargs)
+
+    @classmethod
+    def load(cls, path, key_columns, **kwargs):
+        loaders = {".csv": cls.from_csv, ".json": cls.from_json, ".parquet": cls.from_parquet}
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix not in loaders:
+            raise ValueError(f"Formato de catálogo não suportado: {suffix}")
+        return loaders[suffix](path, key_columns, **kwargs)
+
+
+def fill_template(template, **fields):
+    # Preenche "{campo}" sem interpretar outras chaves do texto (ex.: links com JSON)
+    for name, value in fields.items():
+        template = template.replace("{" + name + "}", str(value))
+    return template
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def load_catalog(env_var, filename, key_columns, **kwargs):
+    """Carrega o catálogo indicado pela variável de ambiente (ou data/<filename>).
+
+    Devolve None se o arquivo não existir, para o agente usar suas ofertas padrão.
+    """
+    path = os.getenv(env_var, os.path.join(DATA_DIR, filename))
+    if not os.path.exists(path):
+        return None
+    return OfferCatalog.load(path, key_columns, **kwargs)
@@ -0,0 +1,183 @@
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from common import log
+from shared.schemas import parse_price
+
+logger = log.get_logger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# Moeda em que os agentes devolvem as ofertas (o payload pode pedir outra em "currency")
+DEFAULT_CURRENCY = os.getenv("OFFER_CURRENCY", "BRL").upper()
+# Moeda do campo "budget" do payload
+BUDGET_CURRENCY = os.getenv("BUDGET_CURRENCY", "USD").upper()
+# Tabela de câmbio e de quanto em quanto tempo (s) o arquivo é conferido de novo
+FX_RATES_FILE = os.getenv("FX_RATES_FILE", os.path.join(DATA_DIR, "fx_rates.json"))
+FX_TTL = float(os.getenv("FX_TTL", "3600"))
+
+# Prefixos de texto livre (LLM, dados antigos): "R$ 1.650", "USD 500", "€ 80"
+SYMBOLS = {"R$": "BRL", "US$": "USD", "$": "USD", "€": "EUR", "£": "GBP"}
+_CODE = re.compile(r"\b([A-Z]{3})\b")
+
+
+class FxTable:
+    """Cotações lidas de um JSON local ({"base": "USD", "rates": {"BRL": 5.5, ...}}).
+
+    `rates[X]` é quanto 1 unidade da moeda base vale em X. O arquivo é relido
+    quando o TTL vence e o mtime mudou; se a leitura falhar, a última tabela
+    boa continua valendo.
+    """
+
+    def __init__(self, path, ttl=3600.0, clock=time.monotonic):
+        self.path = path
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._checked = None
+        self._mtime = None
+        self.base = "USD"
+        self.rates = {"USD": 1.0}
+        self.reloads = 0
+        self.failures = 0
+        self._refresh(force=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(FX_RATES_FILE, FX_TTL)
+
+    def _refresh(self, force=False):
+        now = self._clock()
+        if not force and self._checked is not None and now - self._checked < self.ttl:
+            return
+        with self._lock:
+            if not force and self._checked is not None and now - self._checked < self.ttl:
+                return
+            self._checked = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._mtime:
+                    return
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                base = str(data.get("base", "USD")).upper()
+                rates = {str(code).upper(): float(rate) for code, rate in data["rates"].items()}
+                rates[base] = 1.0
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                self.failures += 1
+                logger.warning("Tabela de câmbio %s não carregada (%s); mantendo a anterior", self.path, e)
+                return
+            self.base, self.rates, self._mtime = base, rates, mtime
+            self.reloads += 1
+
+    def known(self, code):
+        """True se a moeda está na tabela carregada."""
+        self._refresh()
+        return (code or "").upper() in self.rates
+
+    def rate(self, source, target):
+        """Fator de `source` para `target`; KeyError se alguma moeda não estiver na tabela."""
+        self._refresh()
+        source, target = (source or DEFAULT_CURRENCY).upper(), (target or DEFAULT_CURRENCY).upper()
+        if source == target:
+            return 1.0
+        return self.rates[target] / self.rates[source]
+
+    def convert(self, amount, source, target):
+        return None if amount is None else float(amount) * self.rate(source, target)
+
+    def convert_many(self, amounts, currencies, target):
+        """Converte um array de valores (cada um na sua moeda) para `target` de uma vez."""
+        self._refresh()
+        factors = {code: self.rate(code, target) for code in set(currencies)}
+        if len(factors) == 1:
+            return np.asarray(amounts, dtype=np.float64) * next(iter(factors.values()))
+        codes = list(factors)
+        index = {code: i for i, code in enumerate(codes)}
+        lookup = np.array([factors[code] for code in codes], dtype=np.float64)
+        positions = np.fromiter((index[code] for code in currencies), dtype=np.intp, count=len(currencies))
+        return np.asarray(amounts, dtype=np.float64) * lookup[positions]
+
+    def convert_offers(self, offers, fields, target, default=None):
+        """Cópia das ofertas com os campos de preço numéricos em `target` e "moeda" = `target`.
+
+        Cada oferta pode vir na própria moeda ("moeda") ou com texto como
+        "USD 500"; sem indicação, vale `default`. Preços ilegíveis viram None.
+        """
+        self._refresh()
+        target = (target or DEFAULT_CURRENCY).upper()
+        known = self.rates
+        offers = [dict(offer) for offer in offers]
+        slots, amounts, currencies = [], [], []
+        for index, offer in enumerate(offers):
+            source = (offer.get("moeda") or default or target).upper()
+            for field in fields:
+                value = offer.get(field)
+                if value is None:
+                    continue
+                if isinstance(value, (int, float)):
+                    amount, currency = value, source
+                else:
+                    amount, currency = split_price(value, source)
+                    currency = (currency or target).upper()
+                if amount is None or currency not in known:
+                    offer[field] = None
+                    continue
+                slots.append((index, field))
+                amounts.append(amount)
+                currencies.append(currency)
+            offer["moeda"] = target
+        if slots:
+            converted = np.round(self.convert_many(amounts, currencies, target), 2).tolist()
+            for (index, field), value in zip(slots, converted):
+                offers[index][field] = value
+        return offers
+
+    def snapshot(self):
+        return {
+            "base": self.base,
+            "currencies": sorted(self.rates),
+            "path": self.path,
+            "reloads": self.reloads,
+            "failures": self.failures,
+        }
+
+
+def split_price(value, default=None):
+    """1650 -> (1650.0, default); "USD 500" -> (500.0, "USD"); "R$ 1.650" -> (1650.0, "BRL")."""
+    if isinstance(value, (int, float)) or value is None:
+        return (None if value is None else float(value)), default
+    text = str(value).strip()
+    currency = default
+    for symbol, code in SYMBOLS.items():
+        if text.startswith(symbol):
+            currency = code
+            break
+    else:
+        match = _CODE.search(text.upper())
+        if match:
+            currency = match.group(1)
+    return parse_price(text), currency
+
+
+def price_limits(request, currency):
+    """(min_price, max_price) do payload na moeda `currency`; sem max_price, vale o orçamento inteiro.
+
+    min/max vêm na moeda da resposta ("currency" do payload); o orçamento, em BUDGET_CURRENCY.
+    """
+    requested = request.get("currency") or DEFAULT_CURRENCY
+    budget = request.get("budget") or 0
+    low = rates.convert(request.get("min_price"), requested, currency)
+    if request.get("max_price"):
+        high = rates.convert(request["max_price"], requested, currency)
+    else:
+        high = rates.convert(budget, BUDGET_CURRENCY, currency) if budget else None
+    return low, high
+
+
+rates = FxTable.from_env()
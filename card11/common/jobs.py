@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+from common import log, metrics
+from common.admission import Overloaded
+from common.cache import TTLCache
+
+logger = log.get_logger(__name__)
+
+# Eventos do /run/stream cujo campo no resultado tem outro nome
+EVENT_FIELDS = {"matrix": "flex"}
+
+
+class JobQueueFull(Exception):
+    """Fila de jobs cheia: o cliente deve tentar de novo mais tarde."""
+
+    def __init__(self, retry_after):
+        super().__init__("Fila de jobs cheia")
+        self.retry_after = retry_after
+
+
+def apply_event(result, event):
+    """Acumula um evento do stream do agente no resultado parcial do job."""
+    kind = event.get("event")
+    if kind == "result":
+        result.update(event["data"] if isinstance(event.get("data"), dict) else {"data": event.get("data")})
+    elif kind == "section":
+        result[event["section"]] = event["data"]
+        result.setdefault("sections", {})[event["section"]] = event["status"]
+    elif kind == "summary":
+        # Campos de topo do plano (sections, partial, moeda...)
+        result.update({key: value for key, value in event.items() if key != "event"})
+    elif kind == "error":
+        result["error"] = event.get("error")
+    elif "data" in event:
+        result[EVENT_FIELDS.get(kind, kind)] = event["data"]
+
+
+class JobManager:
+    """Executa planos longos fora da requisição HTTP.
+
+    `submit` enfileira e devolve o job na hora; `workers` tarefas consomem a
+    fila (no máximo `max_queue` jobs esperando). Se o agente tem `stream`, o
+    job vai guardando cada seção assim que fica pronta, então `get` já mostra
+    o resultado parcial. Jobs terminados ficam disponíveis por `ttl` segundos.
+
+    Com `admission` (ver create_app), cada job ocupa uma vaga do mesmo
+    AdmissionController do /run antes de executar; se a admissão recusar, o
+    job continua na vez dele e tenta de novo depois do Retry-After.
+    """
+
+    def __init__(self, execute, stream=None, workers=4, max_queue=256, ttl=600.0, max_finished=10000):
+        self.execute = execute
+        self.stream = stream
+        self.workers = workers
+        self.max_queue = max_queue
+        self._queue = None
+        self._tasks = []
+        self._active = {}
+        self._finished = TTLCache(maxsize=max_finished, ttl=ttl)
+        self.submitted = 0
+        self.rejected = 0
+        self.admission = None
+        # Média móvel do tempo de execução (s), usada no Retry-After
+        self._run_time = None
+
+    @classmethod
+    def from_env(cls, execute, stream=None):
+        return cls(
+            execute,
+            stream,
+            workers=int(os.getenv("A2A_JOB_WORKERS", "4")),
+            max_queue=int(os.getenv("A2A_JOB_QUEUE", "256")),
+            ttl=float(os.getenv("A2A_JOB_TTL", "600")),
+        )
+
+    @property
+    def enabled(self):
+        return self.workers > 0
+
+    async def start(self, admission=None):
+        # Dentro do event loop do worker do uvicorn (lifespan)
+        if self._tasks or not self.enabled:
+            return
+        self.admission = admission
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        if self._queue is None:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Jobs que ainda esperavam na fila não vão mais rodar
+        metrics.JOB_QUEUE.dec(self._queue.qsize())
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        for job in list(self._active.values()):
+            self._finish(job, "cancelled", 0.0)
+
+    def retry_after_seconds(self):
+        # Tempo para a fila atual andar, com piso de 1 s
+        if self._run_time is None:
+            return 1
+        return max(1, min(60, round(self._queue.qsize() * self._run_time / self.workers)))
+
+    def submit(self, payload):
+        if self._queue is None:
+            raise RuntimeError("JobManager não iniciado")
+        if self._queue.qsize() >= self.max_queue:
+            self.rejected += 1
+            metrics.JOBS.inc(status="rejected")
+            raise JobQueueFull(self.retry_after_seconds())
+        job = {
+            "id": uuid.uuid4().hex,
+            "status": "queued",
+            "created_at": time.time(),
+            "result": {},
+            "_payload": payload,
+            "_queued": time.perf_counter(),
+            "_request_id": log.request_id.get(),
+        }
+        self._active[job["id"]] = job
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        metrics.JOB_QUEUE.inc()
+        return self.view(job)
+
+    def get(self, job_id):
+        job = self._active.get(job_id) or self._finished.get(job_id)
+        return self.view(job) if job is not None else None
+
+    def view(self, job):
+        # Só os campos públicos; os internos começam com "_"
+        return {key: value for key, value in job.items() if not key.startswith("_")}
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            metrics.JOB_QUEUE.dec()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _admit(self):
+        # Mesma vaga do /run: jobs não passam por cima do limite de concorrência
+        while True:
+            try:
+                return await self.admission.acquire()
+            except Overloaded as e:
+                await asyncio.sleep(e.retry_after)
+
+    async def _run(self, job):
+        token = log.request_id.set(job["_request_id"] or log.new_request_id())
+        admitted_at = await self._admit() if self.admission is not None and self.admission.enabled else None
+        waited = time.perf_counter() - job["_queued"]
+        metrics.JOB_WAIT.observe(waited)
+        job.update(status="running", started_at=time.time(), wait_ms=round(waited * 1000, 1))
+        started = time.perf_counter()
+        status = "cancelled"
+        try:
+            with metrics.JOBS_RUNNING.track():
+                if self.stream is not None:
+                    async for event in self.stream(job["_payload"]):
+                        apply_event(job["result"], event)
+                else:
+                    job["result"] = await self.execute(job["_payload"])
+            status = "error" if "error" in job["result"] else "done"
+        except Exception as e:
+            logger.exception("Falha no job %s", job["id"])
+            status = "error"
+            job["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            # CancelledError (desligamento) sai daqui como "cancelled"
+            if admitted_at is not None:
+                self.admission.release(admitted_at)
+            elapsed = time.perf_counter() - started
+            self._run_time = elapsed if self._run_time is None else 0.9 * self._run_time + 0.1 * elapsed
+            self._finish(job, status, elapsed)
+            log.request_id.reset(token)
+
+    def _finish(self, job, status, elapsed):
+        job.update(status=status, finished_at=time.time(), run_ms=round(elapsed * 1000, 1))
+        metrics.JOB_RUN.observe(elapsed, status=status)
+        metrics.JOBS.inc(status=status)
+        # Terminado: sai da lista ativa e expira por TTL
+        job.pop("_payload", None)
+        self._finished.set(job["id"], job)
+        self._active.pop(job["id"], None)
+        log.event(logger, logging.INFO, "Job finalizado", job=job["id"], status=status, run_ms=job["run_ms"])
+
+    def snapshot(self):
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(job["status"] == "running" for job in self._active.values()),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "finished": len(self._finished),
+            "evicted": self._finished.expirations + self._finished.evictions,
+            "run_time_ms": round(self._run_time * 1000, 1) if self._run_time is not None else None,
+        }
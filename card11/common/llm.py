@@ -0,0 +1,253 @@
+import asyncio
+import inspect
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+
+from common import log
+
+logger = log.get_logger(__name__)
+
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "openai/gpt-4o")
+# "on" liga a execução com LLM nos agentes de voos, hospedagem e atividades
+LLM_MODE = os.getenv("LLM_MODE", "off").lower() == "on"
+# Prazo de cada resposta com LLM (inclui a espera por vaga e o reparo); estourou, vale o catálogo/mock
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))
+# Chamadas simultâneas ao modelo no processo
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# "request": sessão descartável por requisição; "user": uma sessão por user_id do payload
+LLM_SESSION_SCOPE = os.getenv("LLM_SESSION_SCOPE", "request")
+LLM_MAX_SESSIONS = int(os.getenv("LLM_MAX_SESSIONS", "1000"))
+LLM_SESSION_IDLE = float(os.getenv("LLM_SESSION_IDLE", "900"))
+
+REPAIR_PROMPT = (
+    "Sua resposta anterior não era JSON válido. Responda APENAS com o JSON corrigido, "
+    "sem texto extra nem blocos de código, no formato {{\"{key}\": [...]}}. Resposta anterior:\n{text}"
+)
+
+_model_slots = None
+
+
+def require_api_key():
+    if not os.getenv("OPENAI_API_KEY"):
+        raise ValueError("OPENAI_API_KEY não encontrada! Configure o arquivo .env")
+
+
+def _slots():
+    # Criado no primeiro uso (dentro do event loop do worker)
+    global _model_slots
+    if _model_slots is None:
+        _model_slots = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _model_slots
+
+
+async def _maybe_await(value):
+    # O InMemorySessionService é síncrono em versões antigas do ADK e assíncrono nas novas
+    return await value if inspect.isawaitable(value) else value
+
+
+async def _delete_session(service, app_name, user_id, session_id):
+    try:
+        await _maybe_await(service.delete_session(app_name=app_name, user_id=user_id, session_id=session_id))
+    except Exception:
+        logger.warning("Falha ao apagar a sessão %s", session_id)
+
+
+def parse_json_output(text, key):
+    """Extrai {"<key>": [...]} da resposta do modelo; ValueError se não for exatamente isso."""
+    text = (text or "").strip()
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", text, re.S)
+    if fenced:
+        text = fenced.group(1)
+    data = json.loads(text)
+    if not isinstance(data, dict) or not isinstance(data.get(key), list):
+        raise ValueError(f"JSON sem a lista '{key}'")
+    if not all(isinstance(item, dict) for item in data[key]):
+        raise ValueError(f"Itens de '{key}' precisam ser objetos")
+    return data[key]
+
+
+class SessionPool:
+    """Sessões ADK limitadas: expiram após `idle_ttl` sem uso e as mais antigas saem acima de `maxsize`.
+
+    As sessões removidas também são apagadas do session service, então a
+    memória do InMemorySessionService não cresce sem limite.
+    """
+
+    def __init__(self, maxsize=1000, idle_ttl=900.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self._clock = clock
+        # user -> [session_id, último uso, lock]
+        self._sessions = OrderedDict()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    async def _evict(self, service, app_name):
+        now = self._clock()
+        while self._sessions:
+            user_id, (session_id, last_used, lock) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.maxsize and now - last_used < self.idle_ttl:
+                break
+            if lock.locked():
+                # Em uso: volta para o fim da fila em vez de apagar no meio da chamada
+                self._sessions.move_to_end(user_id)
+                if all(entry[2].locked() for entry in self._sessions.values()):
+                    break
+                continue
+            del self._sessions[user_id]
+            self.evicted += 1
+            await _delete_session(service, app_name, user_id, session_id)
+
+    async def acquire(self, service, app_name, user_id):
+        """Devolve (session_id, lock) da sessão do usuário, criando se preciso."""
+        entry = self._sessions.get(user_id)
+        if entry is None:
+            session_id = uuid.uuid4().hex
+            await _maybe_await(service.create_session(app_name=app_name, user_id=user_id, session_id=session_id))
+            entry = self._sessions[user_id] = [session_id, self._clock(), asyncio.Lock()]
+            self.created += 1
+        entry[1] = self._clock()
+        self._sessions.move_to_end(user_id)
+        await self._evict(service, app_name)
+        return entry[0], entry[2]
+
+
+class LazyLlmAgent:
+    """Agente ADK (Agent + Runner + sessões) criado só no primeiro uso com LLM.
+
+    Importar o módulo do agente não carrega google.adk/LiteLLM nem exige
+    OPENAI_API_KEY: as respostas mock/catálogo não precisam de nada disso.
+    """
+
+    def __init__(self, name, description, instruction, app_name, user_id, session_id, model=None):
+        self.name = name
+        self.description = description
+        self.instruction = instruction
+        self.app_name = app_name
+        # Usuário/sessão padrão quando a requisição não traz user_id
+        self.user_id = user_id
+        self.session_id = session_id
+        self.model = model or DEFAULT_MODEL
+        self.sessions = SessionPool(LLM_MAX_SESSIONS, LLM_SESSION_IDLE)
+        self.counters = {"calls": 0, "ok": 0, "repaired": 0, "invalid": 0, "timeouts": 0, "errors": 0}
+        self._agent = None
+        self._runner = None
+        self._session_service = None
+
+    @property
+    def ready(self):
+        return self._runner is not None
+
+    def _build(self):
+        require_api_key()
+        from google.adk.agents import Agent
+        from google.adk.models.lite_llm import LiteLlm
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+
+        agent = Agent(
+            name=self.name,
+            model=LiteLlm(self.model),
+            description=self.description,
+            instruction=self.instruction,
+        )
+        session_service = InMemorySessionService()
+        self._runner = Runner(agent=agent, app_name=self.app_name, session_service=session_service)
+        self._agent, self._session_service = agent, session_service
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            self._build()
+        return self._agent
+
+    @property
+    def runner(self):
+        if self._runner is None:
+            self._build()
+        return self._runner
+
+    @property
+    def session_service(self):
+        if self._session_service is None:
+            self._build()
+        return self._session_service
+
+    async def _send(self, prompt, user_id, session_id):
+        from google.genai import types
+
+        message = types.Content(role="user", parts=[types.Part(text=prompt)])
+        text = None
+        async for event in self.runner.run_async(user_id=user_id, session_id=session_id, new_message=message):
+            if event.is_final_response() and event.content and event.content.parts:
+                text = "".join(part.text or "" for part in event.content.parts)
+        return text
+
+    async def _ask(self, prompt, key, user):
+        service = self.session_service
+        if LLM_SESSION_SCOPE == "user" and user:
+            user_id = str(user)
+            session_id, lock = await self.sessions.acquire(service, self.app_name, user_id)
+            async with lock:
+                return await self._converse(prompt, key, user_id, session_id)
+
+        # Sessão descartável: nada fica no session service depois da resposta
+        user_id, session_id = self.user_id, f"{self.session_id}-{uuid.uuid4().hex}"
+        await _maybe_await(service.create_session(app_name=self.app_name, user_id=user_id, session_id=session_id))
+        try:
+            return await self._converse(prompt, key, user_id, session_id)
+        finally:
+            await _delete_session(service, self.app_name, user_id, session_id)
+
+    async def _converse(self, prompt, key, user_id, session_id):
+        async with _slots():
+            text = await self._send(prompt, user_id, session_id)
+        try:
+            return parse_json_output(text, key)
+        except ValueError:
+            pass
+        # Um único reparo barato: devolve o texto ao modelo pedindo só o JSON
+        self.counters["repaired"] += 1
+        async with _slots():
+            text = await self._send(REPAIR_PROMPT.format(key=key, text=(text or "")[:4000]), user_id, session_id)
+        return parse_json_output(text, key)
+
+    async def ask_json(self, prompt, key, user=None, timeout=None):
+        """Lista `key` da resposta do modelo, ou None (timeout, JSON inválido, sem chave...)."""
+        self.counters["calls"] += 1
+        try:
+            result = await asyncio.wait_for(self._ask(prompt, key, user), timeout or LLM_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            logger.warning("LLM sem resposta em %.0fs; usando catálogo/mock", timeout or LLM_TIMEOUT)
+            return None
+        except ValueError as e:
+            # JSON inválido mesmo após o reparo, ou OPENAI_API_KEY ausente
+            self.counters["invalid"] += 1
+            logger.warning("Resposta do LLM descartada: %s", e)
+            return None
+        except Exception:
+            self.counters["errors"] += 1
+            logger.exception("Falha na chamada ao LLM")
+            return None
+        self.counters["ok"] += 1
+        log.event(logger, logging.INFO, "Resposta do LLM", agent=self.name, items=len(result))
+        return result
+
+    def stats(self):
+        return {
+            "mode": "on" if LLM_MODE else "off",
+            "ready": self.ready,
+            "sessions": len(self.sessions),
+            "sessions_created": self.sessions.created,
+            "sessions_evicted": self.sessions.evicted,
+            **self.counters,
+        }
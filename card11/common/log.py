@@ -0,0 +1,224 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+
+from common import serialization
+
+# Propagado entre agentes pelo header X-Request-ID (ver a2a_server e a2a_client)
+REQUEST_ID_HEADER = "X-Request-ID"
+request_id = contextvars.ContextVar("request_id", default=None)
+
+# Só os loggers do projeto passam pela fila; bibliotecas (httpx, uvicorn) ficam como estão
+NAMESPACES = ("agents", "common")
+MAX_ITEMS = int(os.getenv("LOG_MAX_ITEMS", "3"))
+MAX_CHARS = int(os.getenv("LOG_MAX_CHARS", "200"))
+
+
+def new_request_id():
+    return uuid.uuid4().hex[:16]
+
+
+def summarize(value, max_items=MAX_ITEMS, max_chars=MAX_CHARS, depth=0):
+    """Versão curta de payloads/listas de ofertas para o log (nunca o objeto inteiro)."""
+    if isinstance(value, dict):
+        if depth >= 2:
+            return f"{{{len(value)} campos}}"
+        items = list(value.items())
+        summary = {str(k): summarize(v, max_items, max_chars, depth + 1) for k, v in items[:max_items * 4]}
+        if len(items) > max_items * 4:
+            summary["…"] = f"+{len(items) - max_items * 4} campos"
+        return summary
+    if isinstance(value, (list, tuple)):
+        if depth >= 1:
+            return f"[{len(value)} itens]"
+        head = [summarize(v, max_items, max_chars, depth + 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            head.append(f"+{len(value) - max_items} itens")
+        return head
+    if isinstance(value, str) and len(value) > max_chars:
+        return value[:max_chars] + f"… (+{len(value) - max_chars})"
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return summarize(str(value), max_items, max_chars, depth)
+
+
+class Sampler:
+    """Amostragem por nível: LOG_SAMPLE_INFO=0.1 mantém ~10% dos INFO.
+
+    WARNING e acima nunca são descartados.
+    """
+
+    def __init__(self, rates=None, rng=None):
+        self.rates = rates or {}
+        self._random = (rng or random.Random()).random
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls):
+        rates = {}
+        for name in ("DEBUG", "INFO"):
+            value = os.getenv(f"LOG_SAMPLE_{name}")
+            if value is not None:
+                rates[logging.getLevelName(name)] = float(value)
+        return cls(rates)
+
+    def keep(self, level):
+        rate = self.rates.get(level, 1.0) if level < logging.WARNING else 1.0
+        if rate >= 1.0 or self._random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, sampler):
+        super().__init__()
+        self.sampler = sampler
+
+    def filter(self, record):
+        # Registros de event() já foram amostrados antes de montar os campos
+        return getattr(record, "sampled", False) or self.sampler.keep(record.levelno)
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record):
+        record.request_id = request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return serialization.dumps(entry).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        text = f"{time.strftime('%H:%M:%S', time.localtime(record.created))} {record.levelname:<7} "
+        if getattr(record, "request_id", None):
+            text += f"[{record.request_id}] "
+        text += record.getMessage()
+        for key, value in (getattr(record, "fields", None) or {}).items():
+            text += f" {key}={value}"
+        if record.exc_info:
+            text += "\n" + self.formatException(record.exc_info)
+        elif record.exc_text:
+            text += "\n" + record.exc_text
+        return text
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler com fila limitada: se a fila enche, descarta em vez de bloquear a requisição."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Só resolve a mensagem e o traceback; a formatação fica na thread do listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+sampler = Sampler.from_env()
+_state = {"handler": None, "listener": None}
+
+
+def _build_output():
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if os.getenv("LOG_FORMAT", "json") == "json" else TextFormatter())
+    return output
+
+
+def setup_logging():
+    """Liga a fila de logs (idempotente). Chamado pelo create_app de cada agente."""
+    if _state["handler"] is not None:
+        return
+    handler = DroppingQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+    handler.addFilter(SamplingFilter(sampler))
+    handler.addFilter(ContextFilter())
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    for namespace in NAMESPACES:
+        logger = logging.getLogger(namespace)
+        logger.setLevel(level)
+        logger.addHandler(handler)
+        logger.propagate = False
+    listener = logging.handlers.QueueListener(handler.queue, _build_output(), respect_handler_level=True)
+    listener.start()
+    _state.update(handler=handler, listener=listener)
+
+
+def shutdown_logging():
+    # Esvazia a fila antes de sair
+    listener = _state["listener"]
+    if listener is not None:
+        listener.stop()
+        _state["listener"] = None
+    handler = _state["handler"]
+    if handler is not None:
+        for namespace in NAMESPACES:
+            logging.getLogger(namespace).removeHandler(handler)
+        _state["handler"] = None
+
+
+def _after_fork():
+    # A thread do listener não sobrevive ao fork (ex.: workers do launcher): recria no filho
+    if _state["handler"] is not None:
+        for namespace in NAMESPACES:
+            logging.getLogger(namespace).removeHandler(_state["handler"])
+        _state.update(handler=None, listener=None)
+        setup_logging()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+atexit.register(shutdown_logging)
+
+
+def get_logger(name):
+    return logging.getLogger(name)
+
+
+def event(logger, level, message, **fields):
+    """Loga `message` com campos resumidos; amostragem e nível são checados antes de resumir."""
+    if not logger.isEnabledFor(level) or not sampler.keep(level):
+        return
+    logger.log(level, message, extra={"fields": {k: summarize(v) for k, v in fields.items()}, "sampled": True})
+
+
+def stats():
+    handler = _state["handler"]
+    return {
+        "sampled_out": sampler.dropped,
+        "queue_dropped": handler.dropped if handler is not None else 0,
+        "queue_size": handler.queue.qsize() if handler is not None else 0,
+    }
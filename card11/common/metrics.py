@@ -0,0 +1,207 @@
+import bisect
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Formato de exposição texto do Prometheus
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Etapas da requisição atual (parse, execute, a2a:localhost:8001...) -> segundos acumulados
+_stages = contextvars.ContextVar("stages", default=None)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self):
+        lines = self.header()
+        for key, value in self._values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1.0, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, seconds, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # contagem por bucket (não cumulativa), soma, total
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        state[1] += seconds
+        state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self):
+        lines = self.header()
+        bucket_names = self.labelnames + ("le",)
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_labels(bucket_names, key + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _get(self, cls, name, documentation, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("a2a_requests_total", "Requisições HTTP recebidas", ("route", "status"))
+REQUEST_LATENCY = REGISTRY.histogram("a2a_request_duration_seconds", "Latência das requisições por rota", ("route",))
+IN_FLIGHT = REGISTRY.gauge("a2a_requests_in_flight", "Requisições em andamento por rota", ("route",))
+STAGE_LATENCY = REGISTRY.histogram("a2a_stage_duration_seconds", "Tempo por etapa da requisição", ("stage",))
+DOWNSTREAM_LATENCY = REGISTRY.histogram(
+    "a2a_downstream_duration_seconds", "Latência das chamadas a outros agentes", ("target", "outcome")
+)
+DOWNSTREAM_IN_FLIGHT = REGISTRY.gauge("a2a_downstream_in_flight", "Chamadas a outros agentes em andamento", ("target",))
+ADMISSION_ACTIVE = REGISTRY.gauge("a2a_admission_active", "Execuções admitidas em andamento")
+ADMISSION_QUEUE = REGISTRY.gauge("a2a_admission_queue_depth", "Requisições esperando vaga na admissão")
+ADMISSION_WAIT = REGISTRY.histogram("a2a_admission_wait_seconds", "Espera na fila de admissão")
+ADMISSION_REJECTED = REGISTRY.counter("a2a_admission_rejected_total", "Requisições recusadas com 503", ("reason",))
+JOBS = REGISTRY.counter("a2a_jobs_total", "Jobs assíncronos por resultado", ("status",))
+JOB_QUEUE = REGISTRY.gauge("a2a_jobs_queue_depth", "Jobs esperando um worker")
+JOBS_RUNNING = REGISTRY.gauge("a2a_jobs_running", "Jobs em execução")
+JOB_WAIT = REGISTRY.histogram("a2a_job_wait_seconds", "Espera do job na fila até um worker pegar")
+JOB_RUN = REGISTRY.histogram("a2a_job_run_seconds", "Tempo de execução do job", ("status",))
+
+
+def begin_stages():
+    """Abre o registro de etapas da requisição atual (chamado pelo middleware)."""
+    stages = {}
+    return stages, _stages.set(stages)
+
+
+def end_stages(token):
+    _stages.reset(token)
+
+
+def record_stage(name, seconds, observe=True):
+    stages = _stages.get()
+    if stages is not None:
+        stages[name] = stages.get(name, 0.0) + seconds
+    if observe:
+        STAGE_LATENCY.observe(seconds, stage=name)
+
+
+@contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def merge_remote(prefix, header):
+    """Incorpora o Server-Timing de um sub-agente como etapas `<prefix>.<etapa>`."""
+    if not header:
+        return
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name and name != "total":
+                try:
+                    record_stage(f"{prefix}.{name}", float(value) / 1000, observe=False)
+                except ValueError:
+                    pass
+
+
+def server_timing(stages, total=None):
+    # "parse;dur=0.4, execute;dur=120.3, total;dur=121.0" (milissegundos)
+    parts = [f"{_token(name)};dur={seconds * 1000:.1f}" for name, seconds in stages.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def _token(name):
+    # Server-Timing só aceita "token" no nome da métrica
+    return "".join(char if char.isalnum() or char in "-_.!#$%&'*+^`|~" else "_" for char in name)
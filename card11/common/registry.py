@@ -0,0 +1,227 @@
+import asyncio
+import json
+import os
+import random
+import time
+from urllib.parse import urlsplit
+
+import httpx
+
+AGENTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "agents")
+# O nome padrão é .well-known; a pasta deste repositório se chama .well-know
+CARD_DIRS = (".well-known", ".well-know")
+STRATEGIES = ("p2c", "least_outstanding")
+
+
+def load_card(path):
+    """Lê um agent.json; devolve None se o arquivo estiver vazio ou inválido."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            text = f.read().strip()
+        return json.loads(text) if text else None
+    except (OSError, ValueError):
+        return None
+
+
+def discover(agents_dir=AGENTS_DIR):
+    """Cartões dos agentes em agents/<agente>/.well-known/agent.json, por nome da pasta."""
+    cards = {}
+    if not os.path.isdir(agents_dir):
+        return cards
+    for agent_name in sorted(os.listdir(agents_dir)):
+        for card_dir in CARD_DIRS:
+            card = load_card(os.path.join(agents_dir, agent_name, card_dir, "agent.json"))
+            if card is not None:
+                cards[agent_name] = card
+                break
+    return cards
+
+
+def _env_urls(agent_name):
+    # FLIGHT_AGENT_URLS="http://a:8001/run,http://b:8001/run" substitui as URLs do cartão
+    value = os.getenv(f"{agent_name.upper()}_URLS", "")
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def health_url(url):
+    # O health check do create_app fica em GET / do mesmo servidor
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+class Replica:
+    def __init__(self, url):
+        self.url = url
+        self.outstanding = 0
+        self.healthy = True
+        self.requests = 0
+        self.failures = 0
+        self.last_probe = None
+        self.probe_ms = None
+
+    def snapshot(self):
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "probe_ms": self.probe_ms,
+        }
+
+
+class _Lease:
+    # Conta a requisição como "em andamento" na réplica enquanto o bloco executa
+    def __init__(self, replica):
+        self.replica = replica
+
+    def __enter__(self):
+        self.replica.outstanding += 1
+        self.replica.requests += 1
+        return self.replica
+
+    def __exit__(self, exc_type, exc, tb):
+        self.replica.outstanding -= 1
+        if exc_type is not None and not issubclass(exc_type, asyncio.CancelledError):
+            self.replica.failures += 1
+        return False
+
+
+class AgentRegistry:
+    """Registro de agentes e réplicas descobertos pelos cartões agent.json.
+
+    Cada cartão pode trazer `url` e `replicas`; `<AGENTE>_URLS` no ambiente
+    substitui a lista. A escolha da réplica usa p2c (sorteia duas, fica com a
+    de menos requisições em andamento) ou least_outstanding, sempre entre as
+    réplicas saudáveis segundo o health check em segundo plano.
+    """
+
+    def __init__(self, cards=None, strategy="p2c", probe_interval=10.0, probe_timeout=2.0, rng=None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estratégia desconhecida: {strategy} (opções: {', '.join(STRATEGIES)})")
+        self.strategy = strategy
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._rng = rng or random.Random()
+        self._cards = {}
+        self._replicas = {}
+        # Agentes com <AGENTE>_URLS no ambiente: o registro vale sobre qualquer url recebida
+        self._pinned = set()
+        self._probe_task = None
+        for agent_name, card in (cards or {}).items():
+            urls = [card["url"]] if card.get("url") else []
+            self.register(agent_name, urls + list(card.get("replicas", [])), card=card)
+
+    @classmethod
+    def from_env(cls):
+        cards = discover(os.getenv("A2A_AGENTS_DIR", AGENTS_DIR))
+        registry = cls(
+            cards,
+            strategy=os.getenv("A2A_BALANCER", "p2c"),
+            probe_interval=float(os.getenv("A2A_PROBE_INTERVAL", "10")),
+            probe_timeout=float(os.getenv("A2A_PROBE_TIMEOUT", "2")),
+        )
+        for agent_name in list(registry.agents()):
+            urls = _env_urls(agent_name)
+            if urls:
+                registry.register(agent_name, urls, card=registry.card(agent_name))
+                registry._pinned.add(agent_name)
+        return registry
+
+    def register(self, agent_name, urls, card=None):
+        current = {replica.url: replica for replica in self._replicas.get(agent_name, [])}
+        # Mantém contadores das réplicas que continuam na lista
+        self._replicas[agent_name] = [current.get(url) or Replica(url) for url in dict.fromkeys(urls)]
+        self._cards[agent_name] = card or self._cards.get(agent_name) or {"name": agent_name}
+
+    def agents(self):
+        return self._replicas.keys()
+
+    def card(self, agent_name):
+        return self._cards.get(agent_name)
+
+    def replicas(self, agent_name):
+        return list(self._replicas.get(agent_name, []))
+
+    def routes(self, agent_name, url):
+        """True se a chamada a `url` deve ser balanceada pelo registro.
+
+        Com <AGENTE>_URLS definido, sempre; senão, só quando `url` é uma das
+        réplicas conhecidas do agente (uma url de fora vale como override).
+        """
+        if agent_name in self._pinned:
+            return True
+        replicas = self._replicas.get(agent_name, [])
+        return bool(replicas) and (url is None or any(replica.url == url for replica in replicas))
+
+    def _candidates(self, agent_name):
+        replicas = self._replicas.get(agent_name, [])
+        healthy = [replica for replica in replicas if replica.healthy]
+        # Se todas estiverem fora, tenta assim mesmo (melhor que falhar sem chamar)
+        return healthy or replicas
+
+    def pick(self, agent_name):
+        candidates = self._candidates(agent_name)
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == "p2c":
+            first, second = self._rng.sample(candidates, 2)
+            return first if first.outstanding <= second.outstanding else second
+        fewest = min(replica.outstanding for replica in candidates)
+        return self._rng.choice([replica for replica in candidates if replica.outstanding == fewest])
+
+    def endpoints(self, agent_name):
+        """Réplica escolhida e as demais saudáveis (para failover), ou (None, [])."""
+        chosen = self.pick(agent_name)
+        if chosen is None:
+            return None, []
+        others = sorted(
+            (replica for replica in self._candidates(agent_name) if replica is not chosen),
+            key=lambda replica: replica.outstanding,
+        )
+        return chosen, [replica.url for replica in others]
+
+    def lease(self, replica):
+        return _Lease(replica)
+
+    async def probe(self, client):
+        async def check(replica):
+            started = time.perf_counter()
+            try:
+                response = await client.get(health_url(replica.url), timeout=self.probe_timeout)
+                replica.healthy = response.status_code == 200
+            except Exception:
+                replica.healthy = False
+            replica.last_probe = time.time()
+            replica.probe_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        await asyncio.gather(*(check(replica) for replicas in self._replicas.values() for replica in replicas))
+
+    async def _probe_loop(self):
+        async with httpx.AsyncClient() as client:
+            while True:
+                await self.probe(client)
+                await asyncio.sleep(self.probe_interval)
+
+    async def start(self):
+        if self._probe_task is None and self.probe_interval > 0 and self._replicas:
+            self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+
+    def snapshot(self):
+        return {
+            "strategy": self.strategy,
+            "agents": {
+                agent_name: {replica.url: replica.snapshot() for replica in replicas}
+                for agent_name, replicas in self._replicas.items()
+            },
+        }
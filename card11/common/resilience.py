@@ -0,0 +1,276 @@
+import asyncio
+import os
+import time
+from collections import deque
+
+
+class CircuitOpenError(Exception):
+    """O circuito do destino está aberto: a chamada nem foi feita."""
+
+
+class OverloadedError(Exception):
+    """O destino respondeu 503 (ou ainda está dentro do Retry-After): tente de novo mais tarde."""
+
+    def __init__(self, target, retry_after):
+        super().__init__(f"{target} sobrecarregado; tente de novo em {retry_after:g}s")
+        self.target = target
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Abre após `failure_threshold` falhas seguidas e tenta de novo após `reset_timeout`.
+
+    Em meio-aberto (half_open) deixa passar uma única chamada de teste: sucesso
+    fecha o circuito, falha reabre.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._opened_at = None
+        self._probing = False
+        self.consecutive_failures = 0
+        self.opens = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.short_circuited += 1
+        return False
+
+    def release(self):
+        # Chamada de teste cancelada antes de concluir
+        self._probing = False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._probing or self.consecutive_failures >= self.failure_threshold:
+            if self._opened_at is None or self._probing:
+                self.opens += 1
+            self._opened_at = self._clock()
+        self._probing = False
+
+
+class LatencyTracker:
+    """Janela deslizante das últimas latências de sucesso de um destino."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self.calls = 0
+        self.failures = 0
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def quantile(self, q):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class ResilientCaller:
+    """Camada de resiliência do cliente A2A.
+
+    Por destino: latência em janela deslizante e circuit breaker. Quando há
+    réplicas e o hedging está ligado, dispara uma cópia da requisição para a
+    próxima réplica se a primeira não responder dentro do p95 observado; vale
+    a primeira resposta bem-sucedida.
+
+    Um 503 com Retry-After não conta como falha no breaker (o destino está
+    vivo, só cheio): o destino fica fora da escolha até o prazo passar e a
+    chamada segue para outra réplica, ou falha na hora com OverloadedError.
+    """
+
+    def __init__(
+        self,
+        failure_threshold=5,
+        reset_timeout=30.0,
+        hedge=False,
+        hedge_quantile=0.95,
+        hedge_min_delay=0.05,
+        hedge_min_samples=20,
+        window=200,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self._clock = clock
+        self._breakers = {}
+        self._latency = {}
+        # destino -> instante (monotônico) até quando respeitar o Retry-After
+        self._backoff = {}
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.overloaded = 0
+        self.deferred = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            failure_threshold=int(os.getenv("A2A_BREAKER_FAILURES", "5")),
+            reset_timeout=float(os.getenv("A2A_BREAKER_RESET", "30")),
+            hedge=os.getenv("A2A_HEDGE", "false").lower() == "true",
+            hedge_quantile=float(os.getenv("A2A_HEDGE_QUANTILE", "0.95")),
+            hedge_min_delay=float(os.getenv("A2A_HEDGE_MIN_DELAY", "0.05")),
+            hedge_min_samples=int(os.getenv("A2A_HEDGE_MIN_SAMPLES", "20")),
+        )
+
+    def breaker(self, target):
+        breaker = self._breakers.get(target)
+        if breaker is None:
+            breaker = self._breakers[target] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return breaker
+
+    def latency(self, target):
+        tracker = self._latency.get(target)
+        if tracker is None:
+            tracker = self._latency[target] = LatencyTracker(self.window)
+        return tracker
+
+    def hedge_delay(self, target):
+        tracker = self.latency(target)
+        if len(tracker) < self.hedge_min_samples:
+            return None
+        return max(tracker.quantile(self.hedge_quantile), self.hedge_min_delay)
+
+    async def _attempt(self, target, send, timeout):
+        breaker, tracker = self.breaker(target), self.latency(target)
+        tracker.calls += 1
+        started = time.perf_counter()
+        try:
+            if timeout is not None:
+                result = await asyncio.wait_for(send(target), timeout)
+            else:
+                result = await send(target)
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except OverloadedError as e:
+            breaker.release()
+            self.overloaded += 1
+            self._backoff[target] = self._clock() + e.retry_after
+            raise
+        except Exception:
+            tracker.failures += 1
+            breaker.record_failure()
+            raise
+        tracker.record(time.perf_counter() - started)
+        breaker.record_success()
+        return result
+
+    def retry_in(self, target):
+        # Segundos restantes do Retry-After do destino (0 se liberado)
+        until = self._backoff.get(target)
+        if until is None:
+            return 0.0
+        remaining = until - self._clock()
+        if remaining <= 0:
+            del self._backoff[target]
+            return 0.0
+        return remaining
+
+    def _next_target(self, targets):
+        while targets:
+            target = targets.pop(0)
+            if self.retry_in(target) > 0:
+                self.deferred += 1
+                continue
+            if self.breaker(target).allow():
+                return target
+        return None
+
+    async def call(self, url, send, replicas=(), timeout=None):
+        """Executa `send(target)` no primeiro destino disponível, com hedging opcional."""
+        targets = [url] + [replica for replica in replicas if replica != url]
+        waits = [self.retry_in(target) for target in targets]
+        primary = self._next_target(targets)
+        if primary is None:
+            if any(waits):
+                raise OverloadedError(url, min(wait for wait in waits if wait))
+            raise CircuitOpenError(f"Circuito aberto para {url}")
+
+        tasks = {asyncio.create_task(self._attempt(primary, send, timeout)): primary}
+        try:
+            delay = self.hedge_delay(primary) if self.hedge and targets else None
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    hedge_target = self._next_target(targets)
+                    if hedge_target is not None:
+                        self.hedges_sent += 1
+                        tasks[asyncio.create_task(self._attempt(hedge_target, send, timeout))] = hedge_target
+
+            last_error = None
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if tasks[task] != primary:
+                            self.hedges_won += 1
+                        return task.result()
+                    last_error = task.exception()
+                # Sem hedge em andamento: tenta a próxima réplica disponível (failover)
+                if not pending:
+                    failover = self._next_target(targets)
+                    if failover is not None:
+                        task = asyncio.create_task(self._attempt(failover, send, timeout))
+                        tasks[task] = failover
+                        pending = {task}
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def snapshot(self):
+        targets = {}
+        for target in set(self._breakers) | set(self._latency):
+            breaker, tracker = self.breaker(target), self.latency(target)
+            p50, p95 = tracker.quantile(0.5), tracker.quantile(0.95)
+            targets[target] = {
+                "state": breaker.state,
+                "consecutive_failures": breaker.consecutive_failures,
+                "opens": breaker.opens,
+                "short_circuited": breaker.short_circuited,
+                "calls": tracker.calls,
+                "failures": tracker.failures,
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+        for target in list(self._backoff):
+            if target in targets:
+                targets[target]["retry_in_s"] = round(self.retry_in(target), 1)
+        return {
+            "targets": targets,
+            "hedges": {"enabled": self.hedge, "sent": self.hedges_sent, "won": self.hedges_won},
+            "overload": {"responses": self.overloaded, "deferred": self.deferred},
+        }
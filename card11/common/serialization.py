@@ -0,0 +1,89 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+NDJSON = "application/x-ndjson"
+
+# Aliases aceitos em Content-Type/Accept
+_ALIASES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+def _default(obj):
+    # Tipos fora do JSON (datas, Decimal, modelos Pydantic...) viram algo serializável
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json", exclude_unset=True)
+    if hasattr(obj, "dict"):
+        return obj.dict()
+    return str(obj)
+
+
+def supported_types():
+    return [JSON, MSGPACK] if msgpack is not None else [JSON]
+
+
+def normalize(content_type):
+    if not content_type:
+        return JSON
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return _ALIASES.get(media_type, media_type)
+
+
+def negotiate(accept):
+    """Escolhe o formato de resposta a partir do header Accept (JSON por padrão)."""
+    if not accept:
+        return JSON
+    best, best_q = JSON, -1.0
+    for part in accept.split(","):
+        media_type, _, params = part.partition(";")
+        media_type = normalize(media_type)
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type == "*/*":
+            media_type = JSON
+        if media_type in supported_types() and q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def dumps(obj, content_type=JSON):
+    if normalize(content_type) == MSGPACK and msgpack is not None:
+        return msgpack.packb(obj, default=_default, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data, content_type=JSON):
+    if normalize(content_type) == MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack não está instalado")
+        return msgpack.unpackb(data, raw=False)
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_line(obj):
+    # Uma linha NDJSON (usada em /run/stream)
+    return dumps(obj, JSON) + b"\n"
@@ -0,0 +1,186 @@
+import importlib.util
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from collections import namedtuple
+
+import uvicorn
+
+from common import log
+
+logger = log.get_logger(__name__)
+
+# nome, app ASGI (já importado), porta, número de workers
+Service = namedtuple("Service", "name app port workers")
+
+# Crash logo após subir conta como "crash loop" e aumenta a espera antes de reiniciar
+FAST_CRASH_SECONDS = 5.0
+
+
+def best_loop():
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def best_http():
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def bind_socket(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _serve(app, sock, loop, http, graceful_timeout, log_level):
+    # Roda dentro do processo filho; o uvicorn trata SIGTERM/SIGINT parando de
+    # aceitar conexões e esperando as requisições em andamento (até graceful_timeout)
+    config = uvicorn.Config(
+        app,
+        loop=loop,
+        http=http,
+        timeout_graceful_shutdown=graceful_timeout,
+        log_level=log_level,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class _Worker:
+    def __init__(self, service, slot):
+        self.service = service
+        self.slot = slot
+        self.process = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.fast_crashes = 0
+        self.next_start = 0.0
+
+
+class Supervisor:
+    """Sobe N workers uvicorn por serviço compartilhando o mesmo socket.
+
+    Os apps são importados no processo pai antes do fork, então cada worker
+    nasce com os módulos (e catálogos) já carregados. Workers que morrem são
+    reiniciados com espera crescente; no desligamento cada worker recebe
+    SIGTERM, drena as conexões e só é morto se passar do prazo.
+    """
+
+    def __init__(self, services, host="127.0.0.1", graceful_timeout=30.0, max_restart_delay=30.0, log_level="info"):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("O supervisor precisa de fork (Linux/macOS); use o __main__.py de cada agente")
+        self.services = list(services)
+        self.host = host
+        self.graceful_timeout = graceful_timeout
+        self.max_restart_delay = max_restart_delay
+        self.log_level = log_level
+        self.loop = best_loop()
+        self.http = best_http()
+        self._context = multiprocessing.get_context("fork")
+        self._sockets = {}
+        self._workers = []
+        self._stopping = False
+
+    def _spawn(self, worker):
+        service = worker.service
+        worker.process = self._context.Process(
+            target=_serve,
+            args=(service.app, self._sockets[service.name], self.loop, self.http, self.graceful_timeout, self.log_level),
+            name=f"{service.name}-{worker.slot}",
+            daemon=False,
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+
+    def start(self):
+        for service in self.services:
+            self._sockets[service.name] = bind_socket(self.host, service.port)
+            for slot in range(max(service.workers, 1)):
+                worker = _Worker(service, slot)
+                self._spawn(worker)
+                self._workers.append(worker)
+            log.event(
+                logger,
+                logging.INFO,
+                "Serviço no ar",
+                service=service.name,
+                workers=max(service.workers, 1),
+                url=f"http://{self.host}:{service.port}",
+                loop=self.loop,
+                http=self.http,
+            )
+
+    def poll(self):
+        """Reinicia workers que morreram (chamado periodicamente pelo run)."""
+        now = time.monotonic()
+        for worker in self._workers:
+            process = worker.process
+            if self._stopping or process is None or process.is_alive():
+                continue
+            if worker.next_start == 0.0:
+                uptime = now - worker.started_at
+                worker.fast_crashes = worker.fast_crashes + 1 if uptime < FAST_CRASH_SECONDS else 0
+                delay = min(2 ** worker.fast_crashes - 1, self.max_restart_delay)
+                worker.next_start = now + delay
+                log.event(logger, logging.WARNING, "Worker saiu", worker=process.name, exitcode=process.exitcode, restart_in_s=delay)
+            if now >= worker.next_start:
+                worker.restarts += 1
+                worker.next_start = 0.0
+                self._spawn(worker)
+                log.event(logger, logging.INFO, "Worker reiniciado", worker=worker.process.name, restarts=worker.restarts)
+
+    def stop(self):
+        self._stopping = True
+        for worker in self._workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            worker.process.join(max(deadline - time.monotonic(), 0))
+            if worker.process.is_alive():
+                log.event(logger, logging.WARNING, "Worker não encerrou no prazo; forçando", worker=worker.process.name)
+                worker.process.kill()
+                worker.process.join()
+        for sock in self._sockets.values():
+            sock.close()
+        self._sockets.clear()
+
+    def stats(self):
+        return {
+            f"{worker.service.name}-{worker.slot}": {
+                "pid": worker.process.pid if worker.process else None,
+                "alive": bool(worker.process and worker.process.is_alive()),
+                "restarts": worker.restarts,
+            }
+            for worker in self._workers
+        }
+
+    def run(self, poll_interval=0.5):
+        """Sobe tudo e supervisiona até SIGINT/SIGTERM."""
+        received = []
+
+        def handle(signum, frame):
+            received.append(signum)
+
+        previous = {sig: signal.signal(sig, handle) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            self.start()
+            while not received:
+                self.poll()
+                time.sleep(poll_interval)
+            log.event(logger, logging.INFO, "Encerrando workers (drenando conexões)", workers=len(self._workers))
+        finally:
+            self.stop()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+
+def workers_from_env(name, default):
+    # FLIGHT_AGENT_WORKERS=4 sobrepõe o padrão só para aquele agente
+    return int(os.getenv(f"{name.upper()}_WORKERS", default))
@@ -0,0 +1,127 @@
+import asyncio
+import importlib
+
+from common.a2a_client import call_agent
+from common.registry import AgentRegistry
+from shared.schemas import ActivityResponse, FlightResponse, StayResponse
+
+
+class HttpTransport:
+    """Chama o sub-agente pela rede (implantação distribuída).
+
+    Agentes presentes no registro (cartões agent.json / <AGENTE>_URLS) são
+    balanceados entre as réplicas; os demais usam a `url` recebida.
+    Precedência: <AGENTE>_URLS no ambiente vale sobre a `url`; sem ele, uma
+    `url` que não é réplica do cartão (ex.: benchmarks em portas livres) é
+    chamada diretamente.
+    """
+
+    name = "http"
+
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else AgentRegistry.from_env()
+
+    def preload(self):
+        pass
+
+    async def start(self):
+        await self.registry.start()
+
+    async def stop(self):
+        await self.registry.stop()
+
+    def stats(self):
+        return self.registry.snapshot()
+
+    async def call(self, agent_name, url, payload, timeout=None, replicas=()):
+        replica, others = self.registry.endpoints(agent_name) if self.registry.routes(agent_name, url) else (None, [])
+        if replica is None:
+            return await call_agent(url, payload, timeout=timeout, replicas=replicas)
+        with self.registry.lease(replica):
+            return await call_agent(replica.url, payload, timeout=timeout, replicas=tuple(others) + tuple(replicas))
+
+
+# Agentes disponíveis para o modo em processo: nome -> "módulo:função"
+IN_PROCESS_AGENTS = {
+    "flight_agent": "agents.flight_agent.task_manager:run",
+    "stay_agent": "agents.stay_agent.task_manager:run",
+    "activities_agent": "agents.activities_agent.task_manager:run",
+}
+
+# Mesmos modelos de resposta do /run de cada agente (preços numéricos nos dois transportes)
+RESPONSE_MODELS = {
+    "flight_agent": FlightResponse,
+    "stay_agent": StayResponse,
+    "activities_agent": ActivityResponse,
+}
+
+
+class InProcessTransport:
+    """Chama o `execute` do sub-agente diretamente, sem HTTP nem serialização.
+
+    Para quando host e sub-agentes rodam no mesmo processo. Os módulos dos
+    agentes só são importados na primeira chamada.
+    """
+
+    name = "inprocess"
+
+    def __init__(self, registry=None):
+        self._registry = dict(IN_PROCESS_AGENTS if registry is None else registry)
+        self._resolved = {}
+
+    def register(self, agent_name, execute):
+        self._resolved[agent_name] = execute
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def stats(self):
+        return {"agents": sorted(self._registry)}
+
+    def preload(self):
+        # Importa todos os agentes antes da primeira requisição
+        for agent_name in self._registry:
+            self.resolve(agent_name)
+
+    def resolve(self, agent_name):
+        execute = self._resolved.get(agent_name)
+        if execute is None:
+            target = self._registry.get(agent_name)
+            if target is None:
+                raise KeyError(f"Agente '{agent_name}' não registrado no transporte em processo")
+            module_name, _, attr = target.partition(":")
+            execute = getattr(importlib.import_module(module_name), attr)
+            self._resolved[agent_name] = execute
+        return execute
+
+    async def call(self, agent_name, url, payload, timeout=None, replicas=()):
+        # Mesmo contrato do /run: payload e resposta validados, erros devolvidos como dict
+        from common.a2a_server import parse_payload, typed_result
+
+        execute = self.resolve(agent_name)
+        try:
+            # Mesmo prazo que o HTTP aplica; o estouro sobe como TimeoutError (status "timeout" no host)
+            response = await asyncio.wait_for(execute(parse_payload(dict(payload))), timeout)
+            result = typed_result(RESPONSE_MODELS.get(agent_name), response)
+        except asyncio.TimeoutError:
+            raise
+        except Exception as e:
+            return {"error": str(e), "type": type(e).__name__}
+        # mode="json": datas/Decimal saem como no HTTP
+        return result.model_dump(mode="json", exclude_unset=True) if hasattr(result, "model_dump") else result
+
+
+TRANSPORTS = {
+    HttpTransport.name: HttpTransport,
+    InProcessTransport.name: InProcessTransport,
+}
+
+
+def get_transport(name):
+    try:
+        return TRANSPORTS[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Transporte desconhecido: {name} (opções: {', '.join(TRANSPORTS)})")
@@ -0,0 +1,49 @@
+# Sobe host, voos, hospedagem e atividades de uma vez, com vários workers por agente
+# Uso (dentro de card11/): python launcher.py --workers 2 --set flight_agent=4
+import argparse
+import importlib
+import os
+
+from common.supervisor import Service, Supervisor, workers_from_env
+
+# agente -> (módulo com o `app`, porta)
+AGENTS = {
+    "host_agent": ("agents.host_agent.__main__", 8000),
+    "flight_agent": ("agents.flight_agent.__main__", 8001),
+    "stay_agent": ("agents.stay_agent.__main__", 8002),
+    "activities_agent": ("agents.activities_agent.__main__", 8003),
+}
+
+
+def build_services(names, default_workers, overrides):
+    services = []
+    for name in names:
+        module_name, port = AGENTS[name]
+        # Importa antes do fork: os workers herdam módulos e catálogos já carregados
+        app = importlib.import_module(module_name).app
+        workers = overrides.get(name, workers_from_env(name, default_workers))
+        services.append(Service(name, app, port, workers))
+    return services
+
+
+def parse_overrides(values):
+    overrides = {}
+    for value in values:
+        name, _, workers = value.partition("=")
+        if name not in AGENTS or not workers.isdigit():
+            raise SystemExit(f"--set espera agente=N com agente em: {', '.join(AGENTS)}")
+        overrides[name] = int(workers)
+    return overrides
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MESH_WORKERS", "1")))
+    parser.add_argument("--set", action="append", default=[], metavar="AGENTE=N")
+    parser.add_argument("--agents", nargs="+", choices=list(AGENTS), default=list(AGENTS))
+    parser.add_argument("--bind", default=os.getenv("MESH_HOST", "127.0.0.1"))
+    parser.add_argument("--graceful-timeout", type=float, default=float(os.getenv("MESH_GRACEFUL_TIMEOUT", "30")))
+    args = parser.parse_args()
+
+    services = build_services(args.agents, args.workers, parse_overrides(args.set))
+    Supervisor(services, host=args.bind, graceful_timeout=args.graceful_timeout).run()
@@ -1,6 +1,210 @@
-from pydantic import BaseModel
+import re
+from datetime import date
+from typing import Annotated, Dict, List, Optional, Union
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, field_validator
+
+
+def parse_price(value):
+    """'R$ 1.650,50' / 'R$ 1650' / 1650 -> 1650.5; None se não houver número."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = re.sub(r"[^\d,.]", "", str(value or ""))
+    if not text:
+        return None
+    if "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    elif text.count(".") > 1 or re.search(r"\.\d{3}$", text):
+        text = text.replace(".", "")
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+# Preço numérico, na moeda do campo "moeda" da oferta; aceita também o texto antigo ("R$ 1.650")
+Price = Annotated[Optional[float], BeforeValidator(parse_price)]
+
+
+class Leg(BaseModel):
+    origin: str
+    destination: str
+    date: date
+
+
 class TravelRequest(BaseModel):
+    # Campos extras continuam aceitos (repassados ao agente como vieram)
+    model_config = ConfigDict(extra="allow")
+
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    budget: Optional[float] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    sort_by: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1)
+    user_id: Optional[str] = None
+    # Moeda das ofertas na resposta (código ISO, ex.: "BRL", "EUR"); o orçamento segue em USD
+    currency: Optional[str] = Field(default=None, pattern=r"^[A-Za-z]{3}$")
+    # Modo flexível: ± dias na ida e na volta (volta usa flex_days se omitido)
+    flex_days: Optional[int] = Field(default=None, ge=0)
+    flex_return_days: Optional[int] = Field(default=None, ge=0)
+    # Roteiro com vários trechos (São Paulo → Lisboa → Paris → São Paulo); substitui origin/destination/datas
+    legs: Optional[List[Leg]] = Field(default=None, min_length=1)
+
+    @field_validator("currency")
+    @classmethod
+    def _known_currency(cls, currency):
+        # Import tardio: common.fx importa este módulo
+        from common import fx
+
+        if currency is not None and not fx.rates.known(currency):
+            raise ValueError(f"Moeda sem cotação: {currency.upper()} (disponíveis: {', '.join(sorted(fx.rates.rates))})")
+        return currency
+
+    @field_validator("legs")
+    @classmethod
+    def _legs_in_order(cls, legs):
+        if legs and any(later.date < earlier.date for earlier, later in zip(legs, legs[1:])):
+            raise ValueError("Os trechos precisam estar em ordem de data")
+        return legs
+
+
+class Offer(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    moeda: Optional[str] = None
+
+
+class Flight(Offer):
+    tipo: Optional[str] = None
+    companhia: Optional[str] = None
+    partida: Optional[str] = None
+    chegada: Optional[str] = None
+    duracao: Optional[str] = None
+    preco: Price = None
+    rota: Optional[str] = None
+    link_compra: Optional[str] = None
+    codigo_voo: Optional[str] = None
+    classe: Optional[str] = None
+
+
+class Stay(Offer):
+    nome: Optional[str] = None
+    localizacao: Optional[str] = None
+    tipo_quarto: Optional[str] = None
+    preco_noite: Price = None
+    preco_total: Price = None
+    avaliacao: Optional[str] = None
+    link_reserva: Optional[str] = None
+    comodidades: List[str] = []
+
+
+class Activity(Offer):
+    nome: Optional[str] = None
+    descricao: Optional[str] = None
+    preco: Price = None
+    duracao: Optional[str] = None
+    categoria: Optional[str] = None
+    horario: Optional[str] = None
+    inclui: List[str] = []
+    link_reserva: Optional[str] = None
+    avaliacao: Optional[str] = None
+    local_encontro: Optional[str] = None
+
+
+# Uma seção é a lista de ofertas ou uma mensagem (sem resultados/erro do agente)
+class FlightResponse(BaseModel):
+    flights: Union[List[Flight], str]
+
+
+class StayResponse(BaseModel):
+    stays: Union[List[Stay], str]
+
+
+class ActivityResponse(BaseModel):
+    activities: Union[List[Activity], str]
+
+
+class Bundle(BaseModel):
+    rank: int
+    score: float
+    total: float
+    sobra: float
+    ida: Flight
+    volta: Flight
+    hospedagem: Stay
+    atividades: List[Activity] = []
+
+
+class SectionStatus(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    status: str
+    error: Optional[str] = None
+    elapsed_ms: Optional[float] = None
+    stale: Optional[bool] = None
+    retry_after: Optional[float] = None
+
+
+class BestDates(BaseModel):
+    start_date: date
+    end_date: date
+    total: float
+
+
+class PriceMatrix(BaseModel):
+    # totals[i][j]: menor total (ida + volta + hospedagem) saindo em departure_dates[i]
+    # e voltando em return_dates[j]; null quando não há oferta ou o par é inválido
+    departure_dates: List[date]
+    return_dates: List[date]
+    totals: List[List[Optional[float]]]
+    best: Optional[BestDates] = None
+    evaluated: int
+    pairs: int
+    moeda: Optional[str] = None
+
+
+class LegPlan(BaseModel):
+    origin: str
     destination: str
-    start_date: str
-    end_date: str
-    budget: float
\ No newline at end of file
+    date: date
+    flights: Union[List[Flight], str]
+    status: SectionStatus
+    cheapest: Optional[float] = None
+
+
+class StopPlan(BaseModel):
+    city: str
+    check_in: date
+    check_out: date
+    stays: Union[List[Stay], str]
+    activities: Union[List[Activity], str]
+    sections: Dict[str, SectionStatus] = {}
+    cheapest_stay: Optional[float] = None
+
+
+class Itinerary(BaseModel):
+    legs: List[LegPlan]
+    stops: List[StopPlan] = []
+    # menor voo de cada trecho + menor hospedagem de cada parada; None se faltar algum
+    total: Optional[float] = None
+    moeda: Optional[str] = None
+    subqueries: int
+    unique_subqueries: int
+
+
+class Plan(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    flights: Union[List[Flight], str]
+    stays: Union[List[Stay], str]
+    activities: Union[List[Activity], str]
+    bundles: List[Bundle] = []
+    sections: Dict[str, SectionStatus] = {}
+    partial: bool = False
+    moeda: Optional[str] = None
+    flex: Optional[PriceMatrix] = None
+    itinerary: Optional[Itinerary] = None
@@ -0,0 +1,53 @@
+# Controle de admissão: fila com prazo sem perder vagas e /run/batch ocupando uma vaga por item (user-023)
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from common.a2a_server import create_app
+from common.admission import AdmissionController, Overloaded
+
+PAYLOAD = {"origin": "São Paulo", "destination": "Paris", "start_date": "2025-01-15", "end_date": "2025-01-22"}
+
+
+def test_queue_timeout_and_cancel_do_not_leak_slots():
+    async def main():
+        admission = AdmissionController(max_concurrency=1, max_queue=10, max_wait=0.05)
+        admitted_at = await admission.acquire()
+        with pytest.raises(Overloaded):
+            await admission.acquire()
+
+        # A vaga é liberada e o pedido em espera é cancelado no mesmo instante
+        waiting = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.01)
+        admission.release(admitted_at)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        assert admission.active == 0 and admission.waiting == 0
+        await asyncio.wait_for(admission.acquire(), 1)  # a vaga continua disponível
+
+    asyncio.run(main())
+
+
+def test_batch_items_count_against_the_concurrency_limit():
+    running = peak = 0
+
+    async def execute(payload):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+        return {"flights": []}
+
+    agent = type("Agent", (), {"execute": staticmethod(execute)})
+    admission = AdmissionController(max_concurrency=2, max_queue=100, max_wait=5)
+    with TestClient(create_app(agent=agent, admission=admission)) as client:
+        response = client.post("/run/batch", json=[PAYLOAD] * 8)
+
+    assert response.status_code == 200
+    assert all(item["ok"] for item in response.json()["results"])
+    assert peak == 2
+    assert admission.admitted == 8
@@ -0,0 +1,145 @@
+# TTLCache: expiração, LRU e single-flight (user-004)
+# Uso (dentro de card11/): python -m pytest -q tests
+import asyncio
+
+import pytest
+
+from common.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entry_expires_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5.0, clock=clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+    assert len(cache) == 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" passa a ser o menos usado
+    cache.set("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_concurrent_requests_share_one_compute():
+    cache = TTLCache()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"plan": calls}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert all(result == {"plan": 1} for result in results)
+    assert cache.coalesced == 9
+    assert cache.peek("k") == {"plan": 1}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    cache = TTLCache()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert "k" not in cache
+    assert cache.stats()["inflight"] == 0
+
+
+def test_not_cacheable_result_is_shared_but_not_stored():
+    cache = TTLCache()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return {"partial": True}
+
+    async def main():
+        return await asyncio.gather(
+            *(cache.get_or_compute("k", compute, cacheable=lambda r: not r["partial"]) for _ in range(3))
+        )
+
+    assert asyncio.run(main()) == [{"partial": True}] * 3
+    assert "k" not in cache
+
+
+def test_refresh_recomputes_a_valid_entry():
+    cache = TTLCache()
+    cache.set("k", "velho")
+
+    async def compute():
+        return "novo"
+
+    assert asyncio.run(cache.get_or_compute("k", compute, refresh=True)) == "novo"
+    assert cache.peek("k") == "novo"
+
+
+def test_waiters_join_a_computation_opened_with_begin():
+    # Caminho do /run/stream: o cálculo é aberto com begin e fechado com settle
+    cache = TTLCache()
+
+    async def compute():
+        raise AssertionError("quem espera não deveria recalcular")
+
+    async def main():
+        future = cache.begin("k")
+        assert cache.begin("k") is None
+        waiter = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        cache.settle("k", future, "plano")
+        return await waiter
+
+    assert asyncio.run(main()) == "plano"
+    assert cache.peek("k") == "plano"
+
+
+def test_waiters_recompute_when_the_computation_is_cancelled():
+    cache = TTLCache()
+
+    async def compute():
+        return "recalculado"
+
+    async def main():
+        future = cache.begin("k")
+        waiter = asyncio.create_task(cache.get_or_compute("k", compute))
+        await asyncio.sleep(0)
+        # Ex.: o cliente do stream desconectou no meio
+        cache.settle("k", future, error=GeneratorExit())
+        return await waiter
+
+    assert asyncio.run(main()) == "recalculado"
+
+
+@pytest.mark.parametrize("maxsize", [1, 3])
+def test_size_never_exceeds_maxsize(maxsize):
+    cache = TTLCache(maxsize=maxsize)
+    for i in range(10):
+        cache.set(i, i)
+    assert len(cache) == maxsize
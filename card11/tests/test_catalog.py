@@ -0,0 +1,42 @@
+# Catálogo colunar: busca por chave, datas, preço, ordenação e limite (user-008)
+from common.catalog import OfferCatalog
+
+RECORDS = [
+    {"origin": "São Paulo", "destination": "Paris", "date": "2025-01-15", "price": 900, "companhia": "A"},
+    {"origin": "Sao Paulo", "destination": "paris", "date": "2025-01-15", "price": 700, "companhia": "B"},
+    {"origin": "São Paulo", "destination": "Paris", "date": "2025-01-16", "price": 500, "companhia": "C"},
+    {"origin": "São Paulo", "destination": "Paris", "date": "", "price": 1200, "companhia": "D"},  # qualquer data
+    {"origin": "São Paulo", "destination": "Roma", "date": "2025-01-15", "price": 100, "companhia": "E"},
+]
+
+
+def catalog():
+    return OfferCatalog.from_records(RECORDS, ("origin", "destination"))
+
+
+def names(offers):
+    return [offer["companhia"] for offer in offers]
+
+
+def test_key_is_normalized_and_scoped():
+    found = catalog().find(("  sao   PAULO", "Paris"))
+    assert names(found) == ["C", "B", "A", "D"]
+    assert catalog().find(("São Paulo", "Lisboa")) == []
+
+
+def test_date_range_keeps_undated_offers():
+    found = catalog().find(("São Paulo", "Paris"), date_from="2025-01-15", date_to="2025-01-15")
+    assert names(found) == ["B", "A", "D"]
+
+
+def test_price_filter_sort_and_limit():
+    cat = catalog()
+    assert names(cat.find(("São Paulo", "Paris"), min_price=600, max_price=1000)) == ["B", "A"]
+    assert names(cat.find(("São Paulo", "Paris"), sort_by="price", descending=True, limit=2)) == ["D", "A"]
+    assert names(cat.find(("São Paulo", "Paris"), limit=1)) == ["C"]
+
+
+def test_records_drop_empty_fields_and_return_floats():
+    offer = catalog().find(("São Paulo", "Roma"))[0]
+    assert offer["price"] == 100.0 and isinstance(offer["price"], float)
+    assert "duration_min" not in offer
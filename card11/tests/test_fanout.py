@@ -0,0 +1,79 @@
+# Fan-out do host: status por seção e marcação de plano parcial (user-002)
+import asyncio
+
+import pytest
+
+from agents.host_agent import task_manager
+
+PAYLOAD = {"origin": "São Paulo", "destination": "Paris", "start_date": "2025-01-15", "end_date": "2025-01-22", "currency": "BRL"}
+
+GOOD = {
+    "flight_agent": {"flights": [{"tipo": "IDA", "preco": 100.0, "moeda": "BRL"}]},
+    "stay_agent": {"stays": [{"preco_noite": 50.0, "preco_total": 350.0, "moeda": "BRL"}]},
+    "activities_agent": {"activities": []},
+}
+
+
+@pytest.fixture(autouse=True)
+def clean_caches():
+    for cache in (task_manager.plan_cache, task_manager.section_cache):
+        cache.clear()
+    yield
+    for cache in (task_manager.plan_cache, task_manager.section_cache):
+        cache.clear()
+
+
+def fake_transport(monkeypatch, responses):
+    async def call(agent, url, payload, timeout=None, replicas=()):
+        response = responses[agent]
+        if isinstance(response, Exception):
+            raise response
+        if response == "slow":
+            await asyncio.sleep(10)
+        return response
+
+    monkeypatch.setattr(task_manager.transport, "call", call)
+
+
+def test_complete_plan_is_cached(monkeypatch):
+    fake_transport(monkeypatch, GOOD)
+    result = asyncio.run(task_manager.cached_plan(PAYLOAD))
+    assert not result["partial"]
+    assert {status["status"] for status in result["sections"].values()} == {"ok"}
+    assert task_manager.plan_cache_key(PAYLOAD) in task_manager.plan_cache
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        {"flights": "Erro: catálogo indisponível"},  # falha reportada como texto pelo sub-agente
+        {"flights": [], "error": "LLM fora do ar"},
+        {"outra_chave": []},
+        {"flights": ["não é uma oferta"]},
+    ],
+)
+def test_bad_section_marks_the_plan_partial(monkeypatch, response):
+    fake_transport(monkeypatch, dict(GOOD, flight_agent=response))
+    result = asyncio.run(task_manager.cached_plan(PAYLOAD))
+    assert result["partial"]
+    assert result["sections"]["flights"]["status"] == "error"
+    assert result["flights"] == task_manager.AGENTS_BY_SECTION["flights"].fallback
+    # Nem o plano nem a seção ruim entram no cache
+    assert task_manager.plan_cache_key(PAYLOAD) not in task_manager.plan_cache
+    assert ("flights", task_manager.plan_cache_key(PAYLOAD)) not in task_manager.section_cache
+    assert ("stays", task_manager.plan_cache_key(PAYLOAD)) in task_manager.section_cache
+
+
+def test_exceptions_and_deadlines_get_their_own_status(monkeypatch):
+    fake_transport(monkeypatch, dict(GOOD, flight_agent=ConnectionError("recusada"), activities_agent="slow"))
+    sections = {}
+
+    async def main():
+        async for section, value, status in task_manager.iter_sections(PAYLOAD, budget=0.2):
+            sections[section] = status
+
+    asyncio.run(main())
+    assert sections["flights"]["status"] == "error"
+    assert "ConnectionError" in sections["flights"]["error"]
+    assert sections["activities"]["status"] == "timeout"
+    assert sections["stays"]["status"] == "ok"
@@ -0,0 +1,52 @@
+# Matriz de datas flexíveis: menor total por célula via np.minimum.at (user-019)
+import math
+from datetime import date
+
+from agents.host_agent import flexible
+
+
+def plan(outbound, inbound, stays):
+    flights = [{"tipo": "IDA", "preco": price} for price in outbound] + [{"tipo": "VOLTA", "preco": price} for price in inbound]
+    return {"flights": flights, "stays": [{"preco_total": price} for price in stays]}
+
+
+def test_each_cell_is_the_sum_of_the_cheapest_offers():
+    plans = {
+        (0, 0): plan([500, 300, 400], [200, 250], [900, 700]),
+        (0, 1): plan([310], [190, 180], [650]),
+        # Várias ofertas caindo na mesma célula: o mínimo de cada componente, não a última
+        (1, 1): plan([450, 120, 130], [300, 100], [1000, 400, 800]),
+    }
+    matrix = flexible.price_matrix(plans, (2, 2))
+    assert matrix[0, 0] == 300 + 200 + 700
+    assert matrix[0, 1] == 310 + 180 + 650
+    assert matrix[1, 1] == 120 + 100 + 400
+    assert math.isnan(matrix[1, 0])  # par não avaliado
+    assert flexible.best_cell(matrix) == (1, 1)
+
+
+def test_cell_without_a_component_is_empty():
+    plans = {
+        (0, 0): plan([300], [], [700]),  # sem voo de volta
+        (0, 1): {"flights": "Nenhum voo retornado.", "stays": [{"preco_total": 500}]},
+    }
+    matrix = flexible.price_matrix(plans, (1, 2))
+    assert all(math.isnan(value) for value in matrix.ravel())
+    assert flexible.best_cell(matrix) is None
+    assert flexible.to_rows(matrix) == [[None, None]]
+
+
+def test_date_pairs_skip_returns_before_departure():
+    departures, returns = flexible.date_axes("2025-01-15", "2025-01-16", 1, 1)
+    assert departures[0] == date(2025, 1, 14) and returns[-1] == date(2025, 1, 17)
+    pairs = flexible.date_pairs(departures, returns)
+    assert all(returns[j] >= departures[i] for i, j in pairs)
+    assert (2, 0) not in pairs  # ida 16/01, volta 15/01
+
+
+def test_window_is_capped():
+    assert flexible.window({"start_date": "2025-01-15", "end_date": "2025-01-22"}) is None
+    assert flexible.window({"start_date": "2025-01-15", "end_date": "2025-01-22", "flex_days": 99}) == (
+        flexible.MAX_FLEX_DAYS,
+        flexible.MAX_FLEX_DAYS,
+    )
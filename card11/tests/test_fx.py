@@ -0,0 +1,74 @@
+# Tabela de câmbio: conversão, releitura por TTL + mtime e fallback na leitura ruim (user-020)
+import json
+import os
+
+import pytest
+
+from common.fx import FxTable, split_price
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def write_rates(path, rates, mtime):
+    path.write_text(json.dumps({"base": "USD", "rates": rates}), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_reload_only_after_ttl_and_mtime_change(tmp_path):
+    path = tmp_path / "fx.json"
+    write_rates(path, {"BRL": 5.0}, 1000)
+    clock = FakeClock()
+    table = FxTable(str(path), ttl=60.0, clock=clock)
+    assert table.convert(10, "USD", "BRL") == 50.0
+
+    write_rates(path, {"BRL": 6.0}, 2000)
+    clock.now = 59.0
+    assert table.convert(10, "USD", "BRL") == 50.0  # TTL ainda não venceu
+    clock.now = 60.0
+    assert table.convert(10, "USD", "BRL") == 60.0
+    assert table.reloads == 2
+
+
+def test_bad_file_keeps_the_last_good_table(tmp_path):
+    path = tmp_path / "fx.json"
+    write_rates(path, {"BRL": 5.0}, 1000)
+    clock = FakeClock()
+    table = FxTable(str(path), ttl=1.0, clock=clock)
+
+    path.write_text("{quebrado", encoding="utf-8")
+    os.utime(path, (2000, 2000))
+    clock.now = 1.0
+    assert table.convert(10, "USD", "BRL") == 50.0
+    assert table.failures == 1
+
+
+def test_convert_offers_mixes_currencies(tmp_path):
+    path = tmp_path / "fx.json"
+    write_rates(path, {"BRL": 5.0, "EUR": 0.5}, 1000)
+    table = FxTable(str(path))
+    offers = [{"preco": 100, "moeda": "USD"}, {"preco": "€ 10"}, {"preco": "sem preço"}, {"preco": 7, "moeda": "JPY"}]
+    converted = table.convert_offers(offers, ("preco",), "BRL", default="USD")
+    assert [offer["preco"] for offer in converted] == [500.0, 100.0, None, None]
+    assert {offer["moeda"] for offer in converted} == {"BRL"}
+    assert offers[0]["preco"] == 100  # as ofertas originais não mudam
+
+
+def test_unknown_currency_raises(tmp_path):
+    path = tmp_path / "fx.json"
+    write_rates(path, {"BRL": 5.0}, 1000)
+    table = FxTable(str(path))
+    assert not table.known("JPY")
+    with pytest.raises(KeyError):
+        table.rate("USD", "JPY")
+
+
+def test_split_price():
+    assert split_price("R$ 1.650") == (1650.0, "BRL")
+    assert split_price("USD 500") == (500.0, "USD")
+    assert split_price(80, "EUR") == (80.0, "EUR")
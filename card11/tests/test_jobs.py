@@ -0,0 +1,100 @@
+# JobManager: fila, resultado parcial via stream, admissão compartilhada e desligamento (user-024)
+import asyncio
+
+import pytest
+
+from common.admission import AdmissionController
+from common.jobs import JobManager, JobQueueFull
+
+
+async def wait_status(jobs, job_id, *statuses):
+    for _ in range(200):
+        job = jobs.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"job ficou em {job['status']}")
+
+
+def test_stream_job_accumulates_sections():
+    async def stream(payload):
+        yield {"event": "section", "section": "flights", "data": [1], "status": {"status": "ok"}}
+        yield {"event": "summary", "sections": {"flights": {"status": "ok"}}, "partial": False}
+
+    async def main():
+        jobs = JobManager(None, stream, workers=1)
+        await jobs.start()
+        job = jobs.submit({"origin": "A"})
+        assert job["status"] == "queued"
+        done = await wait_status(jobs, job["id"], "done")
+        await jobs.stop()
+        return done
+
+    done = asyncio.run(main())
+    assert done["result"]["flights"] == [1]
+    assert done["result"]["partial"] is False
+    assert "_payload" not in done
+
+
+def test_failed_execute_marks_the_job_as_error():
+    async def execute(payload):
+        raise RuntimeError("boom")
+
+    async def main():
+        jobs = JobManager(execute, workers=1)
+        await jobs.start()
+        job = await wait_status(jobs, jobs.submit({})["id"], "error")
+        await jobs.stop()
+        return job
+
+    assert asyncio.run(main())["error"] == "RuntimeError: boom"
+
+
+def test_full_queue_rejects_with_retry_after():
+    release = None
+
+    async def execute(payload):
+        await release.wait()
+        return {}
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        jobs = JobManager(execute, workers=1, max_queue=1)
+        await jobs.start()
+        jobs.submit({})
+        await asyncio.sleep(0.01)  # o primeiro já saiu da fila e está rodando
+        jobs.submit({})
+        with pytest.raises(JobQueueFull) as error:
+            jobs.submit({})
+        release.set()
+        await jobs.stop()
+        return error.value, jobs.rejected
+
+    error, rejected = asyncio.run(main())
+    assert error.retry_after >= 1
+    assert rejected == 1
+
+
+def test_jobs_take_admission_slots_and_stop_cancels():
+    admission = AdmissionController(max_concurrency=1, max_queue=10, max_wait=0.05)
+
+    async def execute(payload):
+        await asyncio.sleep(10)
+
+    async def main():
+        jobs = JobManager(execute, workers=2)
+        await jobs.start(admission)
+        first = jobs.submit({})["id"]
+        second = jobs.submit({})["id"]
+        await wait_status(jobs, first, "running")
+        await asyncio.sleep(0.1)
+        # Uma vaga só: o segundo job espera a admissão em vez de rodar junto
+        assert admission.active == 1
+        assert jobs.get(second)["status"] == "queued"
+        await jobs.stop()
+        return jobs.get(first), jobs.get(second)
+
+    first, second = asyncio.run(main())
+    assert first["status"] == "cancelled" and second["status"] == "cancelled"
+    assert admission.active == 0
@@ -0,0 +1,84 @@
+# Otimizador de combinações: poda de Pareto + mochila contra força bruta em entradas pequenas (user-009)
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from agents.host_agent.optimizer import MAX_ACTIVITIES, SAVINGS_WEIGHT, _prune, optimize, parse_duration, parse_rating
+
+
+def random_offers(rng):
+    # Preços inteiros e orçamento <= 2000: a mochila trabalha em unidades de 1, sem arredondamento
+    def flight(tipo):
+        return {"tipo": tipo, "preco": rng.randint(100, 600), "duracao": f"{rng.randint(8, 16)}h{rng.choice([0, 30])}m"}
+
+    flights = [flight("IDA") for _ in range(rng.randint(1, 4))] + [flight("VOLTA") for _ in range(rng.randint(1, 4))]
+    stays = [
+        {"preco_total": rng.randint(200, 900), "avaliacao": f"{rng.randint(30, 50) / 10}/5"}
+        for _ in range(rng.randint(1, 4))
+    ]
+    activities = [
+        {"preco": rng.randint(0, 300), "avaliacao": f"{rng.randint(10, 50) / 10}/5"}
+        for _ in range(rng.randint(0, 6))
+    ]
+    return flights, stays, activities
+
+
+def flight_quality(flights):
+    durations = [parse_duration(f["duracao"]) for f in flights]
+    return [min(durations) / d for d in durations]
+
+
+def brute_force(flights, stays, activities, budget):
+    # Melhor score entre todas as combinações ida x volta x hospedagem x subconjunto de atividades
+    outbound = [f for f in flights if f["tipo"] == "IDA"]
+    inbound = [f for f in flights if f["tipo"] == "VOLTA"]
+    out_q, in_q = flight_quality(outbound), flight_quality(inbound)
+    best = None
+    for (o, oq), (i, iq), s in itertools.product(zip(outbound, out_q), zip(inbound, in_q), stays):
+        core = o["preco"] + i["preco"] + s["preco_total"]
+        quality = oq + iq + parse_rating(s["avaliacao"])
+        for size in range(MAX_ACTIVITIES + 1):
+            for chosen in itertools.combinations(activities, size):
+                total = core + sum(a["preco"] for a in chosen)
+                if total > budget:
+                    continue
+                score = quality + sum(parse_rating(a["avaliacao"]) for a in chosen) + SAVINGS_WEIGHT * (budget - total) / budget
+                best = score if best is None else max(best, score)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_best_bundle_matches_brute_force(seed):
+    rng = random.Random(seed)
+    flights, stays, activities = random_offers(rng)
+    budget = rng.randint(800, 2000)
+
+    bundles = optimize(flights, stays, activities, budget, top_k=3)
+    expected = brute_force(flights, stays, activities, budget)
+
+    if expected is None:
+        assert bundles == []
+        return
+    assert bundles[0]["score"] == pytest.approx(expected, abs=1e-3)
+    for bundle in bundles:
+        assert bundle["total"] <= budget
+        assert bundle["sobra"] == pytest.approx(budget - bundle["total"])
+        assert len(bundle["atividades"]) <= MAX_ACTIVITIES
+    assert [bundle["score"] for bundle in bundles] == sorted((bundle["score"] for bundle in bundles), reverse=True)
+
+
+def test_prune_keeps_only_the_pareto_frontier():
+    prices = np.array([100.0, 200.0, 150.0, 300.0])
+    qualities = np.array([0.5, 0.9, 0.4, 0.8])
+    # 150 é mais caro e pior que 100; 300 é mais caro e pior que 200
+    assert sorted(_prune(prices, qualities).tolist()) == [0, 1]
+
+
+def test_no_bundle_when_budget_is_missing_or_too_small():
+    flights = [{"tipo": "IDA", "preco": 500}, {"tipo": "VOLTA", "preco": 500}]
+    stays = [{"preco_total": 500}]
+    assert optimize(flights, stays, [], 0) == []
+    assert optimize(flights, stays, [], 1499) == []
+    assert len(optimize(flights, stays, [], 1500)) == 1
@@ -0,0 +1,104 @@
+# Circuit breaker, hedging e failover do ResilientCaller (user-010)
+import asyncio
+
+import pytest
+
+from common.resilience import CircuitBreaker, CircuitOpenError, OverloadedError, ResilientCaller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_probes_once():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10.0, clock=clock)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now = 10.0
+    assert breaker.state == "half_open"
+    assert breaker.allow()  # uma única chamada de teste
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 5.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opens == 2
+
+
+def test_open_circuit_short_circuits_without_calling():
+    caller = ResilientCaller(failure_threshold=2)
+    calls = []
+
+    async def send(target):
+        calls.append(target)
+        raise ConnectionError("fora do ar")
+
+    async def main():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await caller.call("http://a", send)
+        with pytest.raises(CircuitOpenError):
+            await caller.call("http://a", send)
+
+    asyncio.run(main())
+    assert calls == ["http://a", "http://a"]
+
+
+def test_failover_to_replica():
+    caller = ResilientCaller()
+
+    async def send(target):
+        if target == "http://a":
+            raise ConnectionError("fora do ar")
+        return target
+
+    assert asyncio.run(caller.call("http://a", send, replicas=("http://b",))) == "http://b"
+
+
+def test_hedge_wins_when_primary_is_slow():
+    caller = ResilientCaller(hedge=True, hedge_min_samples=1, hedge_min_delay=0.01)
+    caller.latency("http://a").record(0.01)
+
+    async def send(target):
+        await asyncio.sleep(1.0 if target == "http://a" else 0.0)
+        return target
+
+    assert asyncio.run(caller.call("http://a", send, replicas=("http://b",))) == "http://b"
+    assert caller.hedges_sent == 1
+    assert caller.hedges_won == 1
+
+
+def test_overloaded_does_not_trip_the_breaker():
+    caller = ResilientCaller(failure_threshold=1)
+
+    async def send(target):
+        raise OverloadedError(target, 30)
+
+    async def main():
+        with pytest.raises(OverloadedError):
+            await caller.call("http://a", send)
+        # Ainda dentro do Retry-After: recusa sem chamar, mas o circuito segue fechado
+        with pytest.raises(OverloadedError):
+            await caller.call("http://a", send)
+
+    asyncio.run(main())
+    assert caller.breaker("http://a").state == "closed"
+    assert caller.deferred == 1
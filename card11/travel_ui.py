@@ -1,6 +1,309 @@
 import streamlit as st
 import requests
 import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import altair as alt
+import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from common.cache import TTLCache
+
+
+AGENTS_BASE_URL = os.getenv("AGENTS_BASE_URL", "http://localhost")
+HOST_STREAM_URL = f"{AGENTS_BASE_URL}:8000/run/stream"
+AGENTES = (("Host Agent", 8000), ("Flight Agent", 8001), ("Stay Agent", 8002), ("Activities Agent", 8003))
+# Prazo de cada verificação de status e por quanto tempo o resultado vale (s)
+HEALTH_TIMEOUT = float(os.getenv("UI_HEALTH_TIMEOUT", "1"))
+HEALTH_TTL = float(os.getenv("UI_HEALTH_TTL", "5"))
+# Planos completos ficam guardados por conjunto de campos do formulário
+PLAN_CACHE_TTL = float(os.getenv("UI_CACHE_TTL", "300"))
+PLAN_CACHE_SIZE = int(os.getenv("UI_CACHE_SIZE", "256"))
+
+SECTION_TITLES = {
+    "flights": "✈️ Voos Disponíveis",
+    "stays": "🏨 Hospedagens Disponíveis",
+    "activities": "🗺️ Atividades Sugeridas",
+}
+
+
+SIMBOLOS_MOEDA = {"BRL": "R$", "USD": "US$", "EUR": "€", "GBP": "£"}
+
+
+def formatar_preco(valor, moeda=None, padrao="Preço não disponível"):
+    # Os agentes devolvem valores numéricos + código da moeda; a formatação só acontece aqui
+    if isinstance(valor, (int, float)):
+        moeda = (moeda or "BRL").upper()
+        return f"{SIMBOLOS_MOEDA.get(moeda, moeda)} " + f"{valor:,.0f}".replace(",", ".")
+    return valor or padrao
+
+
+def render_flights(flights):
+    if isinstance(flights, list):
+        # Separar voos de ida e volta
+        voos_ida = [flight for flight in flights if flight.get('tipo') == 'IDA']
+        voos_volta = [flight for flight in flights if flight.get('tipo') == 'VOLTA']
+
+        for titulo, voos, rotulo in (
+            ("### 🛫 **VOOS DE IDA**", voos_ida, "IDA"),
+            ("### 🛬 **VOOS DE VOLTA**", voos_volta, "VOLTA"),
+        ):
+            st.markdown(titulo)
+            for flight in voos:
+                with st.expander(f"✈️ {flight.get('companhia', 'Companhia')} - {formatar_preco(flight.get('preco'), flight.get('moeda'))}"):
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        st.write(f"**🛫 Partida:** {flight.get('partida', 'N/A')}")
+                        st.write(f"**🛬 Chegada:** {flight.get('chegada', 'N/A')}")
+                        st.write(f"**⏱️ Duração:** {flight.get('duracao', 'N/A')}")
+                        if flight.get('promocao'):
+                            st.warning(flight['promocao'])
+
+                    with col2:
+                        st.write(f"**🎫 Código:** {flight.get('codigo_voo', 'N/A')}")
+                        st.write(f"**💺 Classe:** {flight.get('classe', 'N/A')}")
+                        st.write(f"**🗺️ Rota:** {flight.get('rota', 'N/A')}")
+
+                    # Botão de compra
+                    if flight.get('link_compra'):
+                        st.markdown(f"### 🛒 [COMPRAR PASSAGEM DE {rotulo}]({flight['link_compra']})")
+
+                    st.divider()
+    else:
+        st.info(str(flights or "Nenhum voo disponível"))
+
+
+def render_stays(stays):
+    if isinstance(stays, list):
+        for stay in stays:
+            with st.expander(f"🏨 {stay.get('nome', 'Hotel')} - {formatar_preco(stay.get('preco_total'), stay.get('moeda'))}"):
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.write(f"**📍 Localização:** {stay.get('localizacao', 'N/A')}")
+                    st.write(f"**🛏️ Quarto:** {stay.get('tipo_quarto', 'N/A')}")
+                    st.write(f"**💰 Por noite:** {formatar_preco(stay.get('preco_noite'), stay.get('moeda'), 'N/A')}")
+                    st.write(f"**⭐ Avaliação:** {stay.get('avaliacao', 'N/A')}")
+                    if stay.get('promocao'):
+                        st.success(stay['promocao'])
+
+                with col2:
+                    st.write(f"**💳 Total:** {formatar_preco(stay.get('preco_total'), stay.get('moeda'), 'N/A')}")
+                    st.write(f"**❌ Cancelamento:** {stay.get('cancelamento', 'Consulte o hotel')}")
+
+                    if stay.get('comodidades'):
+                        st.write("**🎯 Comodidades:**")
+                        for comodidade in stay['comodidades']:
+                            st.write(f"• {comodidade}")
+
+                # Botão de reserva
+                if stay.get('link_reserva'):
+                    st.markdown(f"### 🏨 [RESERVAR HOTEL]({stay['link_reserva']})")
+                    st.markdown(f"**Link direto:** {stay['link_reserva']}")
+
+                st.divider()
+    else:
+        st.info(str(stays or "Nenhuma hospedagem disponível"))
+
+
+def render_activities(activities):
+    if isinstance(activities, list):
+        for activity in activities:
+            with st.expander(f"🗺️ {activity.get('nome', 'Atividade')} - {formatar_preco(activity.get('preco'), activity.get('moeda'))}"):
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.write(f"**📝 Descrição:** {activity.get('descricao', 'N/A')}")
+                    st.write(f"**⏰ Duração:** {activity.get('duracao', 'N/A')}")
+                    st.write(f"**🕐 Horário:** {activity.get('horario', 'Consulte disponibilidade')}")
+                    st.write(f"**🏷️ Categoria:** {activity.get('categoria', 'N/A')}")
+                    if activity.get('promocao'):
+                        st.warning(activity['promocao'])
+
+                with col2:
+                    st.write(f"**💰 Preço:** {formatar_preco(activity.get('preco'), activity.get('moeda'), 'N/A')}")
+                    st.write(f"**⭐ Avaliação:** {activity.get('avaliacao', 'N/A')}")
+                    st.write(f"**📍 Encontro:** {activity.get('local_encontro', 'A definir')}")
+
+                    if activity.get('inclui'):
+                        st.write("**✅ Inclui:**")
+                        for item in activity['inclui']:
+                            st.write(f"• {item}")
+
+                # Botão de reserva
+                if activity.get('link_reserva'):
+                    st.markdown(f"### 🎫 [RESERVAR ATIVIDADE]({activity['link_reserva']})")
+
+                st.divider()
+    else:
+        st.info(str(activities or "Nenhuma atividade encontrada"))
+
+
+RENDERERS = {
+    "flights": render_flights,
+    "stays": render_stays,
+    "activities": render_activities,
+}
+
+
+def render_matrix(placeholder, matrix):
+    # Heatmap do menor total por par de datas (ida x volta); células vazias ficam de fora
+    rows = [
+        {"Ida": ida, "Volta": volta, "Total": total}
+        for ida, linha in zip(matrix["departure_dates"], matrix["totals"])
+        for volta, total in zip(matrix["return_dates"], linha)
+        if total is not None
+    ]
+    with placeholder.container():
+        st.subheader("📅 Preços por data (ida x volta)")
+        if not rows:
+            st.info("Nenhuma combinação de datas com voos e hospedagem disponíveis.")
+            return
+        tabela = pd.DataFrame(rows)
+        tabela["Preço"] = tabela["Total"].map(lambda total: formatar_preco(total, matrix.get("moeda")))
+        base = alt.Chart(tabela).encode(
+            x=alt.X("Volta:O", title="Volta"),
+            y=alt.Y("Ida:O", title="Ida"),
+        )
+        mapa = base.mark_rect().encode(
+            color=alt.Color("Total:Q", scale=alt.Scale(scheme="redyellowgreen", reverse=True), title=f"Total ({matrix.get('moeda') or 'BRL'})"),
+            tooltip=["Ida", "Volta", "Preço"],
+        )
+        rotulos = base.mark_text(fontSize=10).encode(text="Preço")
+        st.altair_chart(mapa + rotulos, use_container_width=True)
+        melhor = matrix.get("best")
+        if melhor:
+            st.success(
+                f"💡 Melhor combinação: ida {melhor['start_date']}, volta {melhor['end_date']} "
+                f"por {formatar_preco(melhor['total'], matrix.get('moeda'))} (planos abaixo)"
+            )
+        if matrix.get("evaluated", 0) < matrix.get("pairs", 0):
+            st.caption(f"⚠️ {matrix['evaluated']} de {matrix['pairs']} combinações avaliadas a tempo")
+
+
+def render_bundles(placeholder, bundles, moeda):
+    # Combinações ranqueadas pelo otimizador do host (ida + volta + hospedagem + atividades)
+    with placeholder.container():
+        st.subheader("🏆 Melhores Pacotes")
+        if not bundles:
+            st.info("Nenhuma combinação cabe no orçamento.")
+            return
+        for posicao, bundle in enumerate(bundles, 1):
+            titulo = f"#{posicao} · {formatar_preco(bundle.get('total'), moeda)} (sobra {formatar_preco(bundle.get('sobra'), moeda)})"
+            with st.expander(titulo, expanded=posicao == 1):
+                ida, volta, hospedagem = bundle.get("ida") or {}, bundle.get("volta") or {}, bundle.get("hospedagem") or {}
+                st.write(f"**🛫 Ida:** {ida.get('companhia', 'N/A')} · {formatar_preco(ida.get('preco'), moeda)}")
+                st.write(f"**🛬 Volta:** {volta.get('companhia', 'N/A')} · {formatar_preco(volta.get('preco'), moeda)}")
+                st.write(f"**🏨 Hospedagem:** {hospedagem.get('nome', 'N/A')} · {formatar_preco(hospedagem.get('preco_total'), moeda)}")
+                for atividade in bundle.get("atividades") or []:
+                    st.write(f"• 🎫 {atividade.get('nome', 'Atividade')} · {formatar_preco(atividade.get('preco'), moeda)}")
+
+
+def render_itinerary(placeholder, itinerary):
+    # Visão por trecho e parada do roteiro com vários trechos
+    moeda = itinerary.get("moeda")
+    with placeholder.container():
+        st.subheader("🧭 Roteiro")
+        for numero, leg in enumerate(itinerary.get("legs", []), 1):
+            status = leg.get("status", {}).get("status")
+            aviso = "" if status == "ok" else f" ⚠️ {status}"
+            st.write(
+                f"**Trecho {numero}:** {leg['origin']} → {leg['destination']} em {leg['date']} · "
+                f"voo a partir de {formatar_preco(leg.get('cheapest'), moeda, 'sem voos')}{aviso}"
+            )
+        for stop in itinerary.get("stops", []):
+            st.write(
+                f"📍 **{stop['city']}** ({stop['check_in']} a {stop['check_out']}) · "
+                f"hospedagem a partir de {formatar_preco(stop.get('cheapest_stay'), moeda, 'sem hospedagem')}"
+            )
+        if itinerary.get("total") is not None:
+            st.success(f"💡 Roteiro mais barato: {formatar_preco(itinerary['total'], moeda)} (voos + hospedagens)")
+
+
+def parse_legs(texto):
+    # Uma linha por trecho: "Origem > Destino > AAAA-MM-DD"
+    legs = []
+    for linha in texto.splitlines():
+        partes = [parte.strip() for parte in linha.split(">")]
+        if len(partes) == 3 and all(partes):
+            legs.append({"origin": partes[0], "destination": partes[1], "date": partes[2]})
+    return legs
+
+
+def render_section(placeholder, section, data, status):
+    with placeholder.container():
+        st.subheader(SECTION_TITLES[section])
+        if status.get("status") != "ok":
+            st.warning(f"⚠️ Seção incompleta ({status.get('status')}): {status.get('error', '')}")
+        RENDERERS[section](data)
+
+
+@st.cache_resource
+def http_session():
+    # Uma sessão (com keep-alive) para todas as execuções do script e sessões do Streamlit
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(AGENTES), pool_maxsize=32)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def plan_cache():
+    # Compartilhado entre reruns e usuários; o lock protege o acesso das threads do Streamlit
+    return TTLCache(maxsize=PLAN_CACHE_SIZE, ttl=PLAN_CACHE_TTL), threading.Lock()
+
+
+def verificar_agente(agente):
+    nome, porta = agente
+    try:
+        response = http_session().get(f"{AGENTS_BASE_URL}:{porta}/", timeout=HEALTH_TIMEOUT)
+        online = response.ok and response.json().get("status") == "online"
+        return nome, porta, online, response.elapsed.total_seconds() * 1000
+    except (requests.RequestException, ValueError):
+        return nome, porta, False, None
+
+
+@st.cache_data(ttl=HEALTH_TTL, show_spinner=False)
+def verificar_agentes():
+    # Todos ao mesmo tempo: um agente fora do ar custa um timeout, não um por agente
+    with ThreadPoolExecutor(max_workers=len(AGENTES)) as pool:
+        return list(pool.map(verificar_agente, AGENTES))
+
+
+def stream_plan(payload):
+    # Lê o NDJSON do host linha a linha, entregando cada evento assim que chega
+    with http_session().post(HOST_STREAM_URL, json=payload, stream=True, timeout=(5, 120)) as response:
+        if not response.ok:
+            raise requests.HTTPError(f"Código {response.status_code}: {response.text}", response=response)
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                yield json.loads(line)
+
+
+def plan_events(payload):
+    """Eventos do plano; o mesmo formulário dentro do TTL é servido da memória sem chamar o host."""
+    key = json.dumps(payload, sort_keys=True)
+    cache, lock = plan_cache()
+    with lock:
+        cached = cache.get(key)
+    if cached is not None:
+        for event in cached:
+            yield dict(event, ui_cached=True) if event.get("event") == "summary" else event
+        return
+
+    events = []
+    for event in stream_plan(payload):
+        events.append(event)
+        yield event
+    # Só planos completos: parciais e erros são buscados de novo no próximo envio
+    summary = events[-1] if events else {}
+    if summary.get("event") == "summary" and not summary.get("partial"):
+        with lock:
+            cache.set(key, events)
 
 
 st.set_page_config(page_title="Planejador de Viagens com IA", page_icon="✈️")
@@ -11,195 +314,106 @@ with st.sidebar:
     
     # Só verifica status quando o usuário clicar no botão
     if st.button("🔄 Verificar Status"):
-        def verificar_agente(nome, porta):
-            try:
-                response = requests.get(f"http://localhost:{porta}/docs", timeout=2)
-                return "🟢" if response.status_code == 200 else "🔴"
-            except:
-                return "🔴"
-        
-        st.write(f"{verificar_agente('Host', 8000)} Host Agent (8000)")
-        st.write(f"{verificar_agente('Voos', 8001)} Flight Agent (8001)")
-        st.write(f"{verificar_agente('Hospedagem', 8002)} Stay Agent (8002)")
-        st.write(f"{verificar_agente('Atividades', 8003)} Activities Agent (8003)")
-        
+        for nome, porta, online, ms in verificar_agentes():
+            tempo = f" · {ms:.0f} ms" if ms is not None else ""
+            st.write(f"{'🟢' if online else '🔴'} {nome} ({porta}){tempo}")
+
         st.markdown("---")
         st.caption("🟢 Online | 🔴 Offline")
     else:
         st.info("Clique para verificar se os agentes estão online")
         st.caption("Host: 8000 | Voos: 8001 | Hospedagem: 8002 | Atividades: 8003")
 
+
 # Formulário principal
 origin = st.text_input("🛫 De onde você está saindo?", placeholder="Ex: São Paulo")
 destination = st.text_input("🛬 Para onde você vai?", placeholder="Ex: Paris")
 start_date = st.date_input("📅 Data de ida")
 end_date = st.date_input("📅 Data de volta")
 budget = st.number_input("💰 Orçamento (em USD)", min_value=100, step=50, value=1000)
+moeda = st.selectbox("💱 Moeda dos preços", list(SIMBOLOS_MOEDA), index=0)
+flex_days = st.slider("↔️ Datas flexíveis (± dias)", min_value=0, max_value=3, value=0)
+with st.expander("🧭 Roteiro com vários trechos (opcional)"):
+    roteiro = st.text_area(
+        "Um trecho por linha: Origem > Destino > AAAA-MM-DD",
+        placeholder="São Paulo > Lisboa > 2025-03-01\nLisboa > Paris > 2025-03-05\nParis > São Paulo > 2025-03-10",
+    )
+legs = parse_legs(roteiro)
 
 if st.button("🚀 Planejar Minha Viagem"):
-    if not all([origin, destination, start_date, end_date, budget]):
+    if not legs and not all([origin, destination, start_date, end_date, budget]):
         st.warning("⚠️ Por favor, preencha todos os campos.")
     else:
-        with st.spinner("🔄 Planejando sua viagem... Isso pode levar alguns segundos."):
+        if legs:
+            # Vários trechos substituem origem/destino/datas do formulário
+            payload = {"legs": legs, "budget": budget, "currency": moeda}
+        else:
             payload = {
                 "origin": origin,
                 "destination": destination,
                 "start_date": str(start_date),
                 "end_date": str(end_date),
-                "budget": budget
+                "budget": budget,
+                "currency": moeda,
             }
-            
-            try:
-                response = requests.post(
-                    "http://localhost:8000/run", 
-                    json=payload, 
-                    timeout=120
-                )
-                
-                if response.ok:
-                    data = response.json()
-                    
-                    st.success("✅ Plano de viagem gerado com sucesso!")
-                    
-                    # Exibir Voos
-                    st.subheader("✈️ Voos Disponíveis")
-                    if isinstance(data.get("flights"), list):
-                        # Separar voos de ida e volta
-                        voos_ida = [flight for flight in data["flights"] if flight.get('tipo') == 'IDA']
-                        voos_volta = [flight for flight in data["flights"] if flight.get('tipo') == 'VOLTA']
-                        
-                        # Voos de IDA
-                        st.markdown("### 🛫 **VOOS DE IDA**")
-                        for i, flight in enumerate(voos_ida, 1):
-                            with st.expander(f"✈️ {flight.get('companhia', 'Companhia')} - {flight.get('preco', 'Preço não disponível')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**🛫 Partida:** {flight.get('partida', 'N/A')}")
-                                    st.write(f"**🛬 Chegada:** {flight.get('chegada', 'N/A')}")
-                                    st.write(f"**⏱️ Duração:** {flight.get('duracao', 'N/A')}")
-                                    if flight.get('promocao'):
-                                        st.warning(flight['promocao'])
-                                
-                                with col2:
-                                    st.write(f"**🎫 Código:** {flight.get('codigo_voo', 'N/A')}")
-                                    st.write(f"**💺 Classe:** {flight.get('classe', 'N/A')}")
-                                    st.write(f"**🗺️ Rota:** {flight.get('rota', 'N/A')}")
-                                
-                                # Botão de compra
-                                if flight.get('link_compra'):
-                                    st.markdown(f"### 🛒 [COMPRAR PASSAGEM DE IDA]({flight['link_compra']})")
-                                
-                                st.divider()
-                        
-                        # Voos de VOLTA
-                        st.markdown("### 🛬 **VOOS DE VOLTA**")
-                        for i, flight in enumerate(voos_volta, 1):
-                            with st.expander(f"✈️ {flight.get('companhia', 'Companhia')} - {flight.get('preco', 'Preço não disponível')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**🛫 Partida:** {flight.get('partida', 'N/A')}")
-                                    st.write(f"**🛬 Chegada:** {flight.get('chegada', 'N/A')}")
-                                    st.write(f"**⏱️ Duração:** {flight.get('duracao', 'N/A')}")
-                                    if flight.get('promocao'):
-                                        st.warning(flight['promocao'])
-                                
-                                with col2:
-                                    st.write(f"**🎫 Código:** {flight.get('codigo_voo', 'N/A')}")
-                                    st.write(f"**💺 Classe:** {flight.get('classe', 'N/A')}")
-                                    st.write(f"**🗺️ Rota:** {flight.get('rota', 'N/A')}")
-                                
-                                # Botão de compra
-                                if flight.get('link_compra'):
-                                    st.markdown(f"### 🛒 [COMPRAR PASSAGEM DE VOLTA]({flight['link_compra']})")
-                                
-                                st.divider()
-                    else:
-                        st.info(str(data.get("flights", "Nenhum voo disponível")))
-                    
-                    # Exibir Hospedagens
-                    st.subheader("🏨 Hospedagens Disponíveis")
-                    if isinstance(data.get("stays"), list):
-                        for i, stay in enumerate(data["stays"], 1):
-                            with st.expander(f"🏨 {stay.get('nome', 'Hotel')} - {stay.get('preco_total', 'Preço não disponível')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**📍 Localização:** {stay.get('localizacao', 'N/A')}")
-                                    st.write(f"**🛏️ Quarto:** {stay.get('tipo_quarto', 'N/A')}")
-                                    st.write(f"**💰 Por noite:** {stay.get('preco_noite', 'N/A')}")
-                                    st.write(f"**⭐ Avaliação:** {stay.get('avaliacao', 'N/A')}")
-                                    if stay.get('promocao'):
-                                        st.success(stay['promocao'])
-                                
-                                with col2:
-                                    st.write(f"**💳 Total:** {stay.get('preco_total', 'N/A')}")
-                                    st.write(f"**❌ Cancelamento:** {stay.get('cancelamento', 'Consulte o hotel')}")
-                                    
-                                    if stay.get('comodidades'):
-                                        st.write("**🎯 Comodidades:**")
-                                        for comodidade in stay['comodidades']:
-                                            st.write(f"• {comodidade}")
-                                
-                                # Botão de reserva
-                                if stay.get('link_reserva'):
-                                    st.markdown(f"### 🏨 [RESERVAR HOTEL]({stay['link_reserva']})")
-                                    st.markdown(f"**Link direto:** {stay['link_reserva']}")
-                                
-                                st.divider()
-                    else:
-                        st.info(str(data.get("stays", "Nenhuma hospedagem disponível")))
-                    
-                    # Exibir Atividades
-                    st.subheader("🗺️ Atividades Sugeridas")
-                    if isinstance(data.get("activities"), list):
-                        for i, activity in enumerate(data["activities"], 1):
-                            with st.expander(f"🗺️ {activity.get('nome', 'Atividade')} - {activity.get('preco', 'Preço não disponível')}"):
-                                col1, col2 = st.columns(2)
-                                
-                                with col1:
-                                    st.write(f"**📝 Descrição:** {activity.get('descricao', 'N/A')}")
-                                    st.write(f"**⏰ Duração:** {activity.get('duracao', 'N/A')}")
-                                    st.write(f"**🕐 Horário:** {activity.get('horario', 'Consulte disponibilidade')}")
-                                    st.write(f"**🏷️ Categoria:** {activity.get('categoria', 'N/A')}")
-                                    if activity.get('promocao'):
-                                        st.warning(activity['promocao'])
-                                
-                                with col2:
-                                    st.write(f"**💰 Preço:** {activity.get('preco', 'N/A')}")
-                                    st.write(f"**⭐ Avaliação:** {activity.get('avaliacao', 'N/A')}")
-                                    st.write(f"**📍 Encontro:** {activity.get('local_encontro', 'A definir')}")
-                                    
-                                    if activity.get('inclui'):
-                                        st.write("**✅ Inclui:**")
-                                        for item in activity['inclui']:
-                                            st.write(f"• {item}")
-                                
-                                # Botão de reserva
-                                if activity.get('link_reserva'):
-                                    st.markdown(f"### 🎫 [RESERVAR ATIVIDADE]({activity['link_reserva']})")
-                                
-                                st.divider()
+        if flex_days and not legs:
+            payload["flex_days"] = flex_days
+
+        # Um espaço reservado por seção, preenchido conforme os agentes respondem
+        status_box = st.empty()
+        status_box.info("🔄 Planejando sua viagem... As seções aparecem assim que ficam prontas.")
+        matrix_box = st.empty()
+        itinerary_box = st.empty()
+        bundles_box = st.empty()
+        placeholders = {}
+        for section, title in SECTION_TITLES.items():
+            placeholders[section] = st.empty()
+            with placeholders[section].container():
+                st.subheader(title)
+                st.caption("⏳ Aguardando agente...")
+
+        data = {}
+        try:
+            for event in plan_events(payload):
+                if event.get("event") == "section":
+                    data[event["section"]] = event["data"]
+                    render_section(placeholders[event["section"]], event["section"], event["data"], event.get("status", {}))
+                elif event.get("event") == "matrix":
+                    data["flex"] = event["data"]
+                    render_matrix(matrix_box, event["data"])
+                elif event.get("event") == "bundles":
+                    data["bundles"] = event["data"]
+                    render_bundles(bundles_box, event["data"], moeda)
+                elif event.get("event") == "itinerary":
+                    data["itinerary"] = event["data"]
+                    render_itinerary(itinerary_box, event["data"])
+                elif event.get("event") == "summary":
+                    data["sections"] = event.get("sections", {})
+                    if event.get("partial"):
+                        status_box.warning("⚠️ Plano gerado parcialmente: alguns agentes não responderam a tempo.")
+                    elif event.get("ui_cached"):
+                        status_box.success("✅ Plano de viagem (mesma busca há pouco, servida da memória)")
                     else:
-                        st.info(str(data.get("activities", "Nenhuma atividade encontrada")))
-                    
-                    # Resposta completa (debug)
-                    with st.expander("📄 Ver resposta completa (JSON)"):
-                        st.json(data)
-                        
-                else:
-                    st.error(f"❌ Falha ao buscar plano de viagem. Código: {response.status_code}")
-                    st.error(f"Detalhes: {response.text}")
-                    
-            except requests.exceptions.ConnectionError:
-                st.error("❌ **Erro de Conexão!**")
-                st.warning("⚠️ Os agentes não estão rodando.")
-                
-            except requests.exceptions.Timeout:
-                st.error("⏱️ **Timeout!**")
-                st.warning("A requisição demorou muito tempo. Tente novamente.")
-                
-            except Exception as e:
-                st.error(f"❌ **Erro inesperado:** {str(e)}")
-                st.exception(e)
\ No newline at end of file
+                        status_box.success("✅ Plano de viagem gerado com sucesso!")
+                elif event.get("event") == "error":
+                    status_box.error(f"❌ Falha ao buscar plano de viagem: {event.get('error')}")
+
+            # Resposta completa (debug)
+            with st.expander("📄 Ver resposta completa (JSON)"):
+                st.json(data)
+
+        except requests.exceptions.ConnectionError:
+            status_box.error("❌ **Erro de Conexão!**")
+            st.warning("⚠️ Os agentes não estão rodando.")
+
+        except requests.exceptions.Timeout:
+            status_box.error("⏱️ **Timeout!**")
+            st.warning("A requisição demorou muito tempo. Tente novamente.")
+
+        except requests.exceptions.HTTPError as e:
+            status_box.error("❌ Falha ao buscar plano de viagem.")
+            st.error(f"Detalhes: {e}")
+
+        except Exception as e:
+            st.error(f"❌ **Erro inesperado:** {str(e)}")
+            st.exception(e)